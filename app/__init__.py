@@ -1,38 +1,111 @@
+import os
+import threading
+import time
+
 from flask import Flask
 from dotenv import load_dotenv
-import os
 
-try:
-    from pymongo import MongoClient
-except Exception:
-    MongoClient = None
+from .db import Conexao
+
+def aquecer(app, conexao, inicio):
+    """
+    Preparação em segundo plano: conecta ao banco (aguardando o circuit breaker
+    se ele estiver fora), garante índices e campos derivados e carrega o
+    snapshot, o matcher e o índice de candidatos. Marca app.config['PRONTO'] ao terminar.
+    """
+    etapas = app.config['INICIALIZACAO']['etapas']
+
+    def medir(nome, funcao):
+        t = time.perf_counter()
+        resultado = funcao()
+        etapas[nome] = round(time.perf_counter() - t, 4)
+        return resultado
+
+    t = time.perf_counter()
+    while True:
+        db, erro = conexao.obter()
+        if db is not None:
+            break
+        app.config['DB_ERROR'] = erro
+        if not conexao.uri:
+            app.config['PRONTO'].set()
+            return
+        time.sleep(max(conexao.situacao()['reabre_em_s'] or 0, 0.5))
+    etapas['conexao'] = round(time.perf_counter() - t, 4)
+    app.config['DB'] = db
+    app.config['DB_ERROR'] = None
+
+    try:
+        from . import indexes
+        from .nlp import taxonomia
+        from .recommendation.recommender import SkillMatcher
+        if os.getenv('TALENTFLOW_TAXONOMIA', '').lower() == 'mongo':
+            carregada = medir('taxonomia', lambda: taxonomia.carregar_mongo(db))
+            if carregada is not None:
+                taxonomia.definir_taxonomia(carregada)
+        medir('indices', lambda: indexes.garantir_indices(db))
+        app.config['INICIALIZACAO']['email_unico'] = indexes.email_unico(db)
+        matcher = SkillMatcher(db.listar('vagas'))
+        if not medir('migracao_taxonomia', lambda: indexes.migrar_taxonomia(db, matcher)):
+            medir('campos_derivados', lambda: indexes.preencher_campos_derivados(db, matcher))
+        snapshot = medir('snapshot', lambda: app.config['CACHE'].obter(db))
+        medir('matcher', lambda: snapshot.matcher)
+        medir('indice_candidatos', lambda: snapshot.candidatos)
+        app.config['INICIALIZACAO']['matcher'] = snapshot.origem_matcher
+        app.config['INICIALIZACAO']['indice_candidatos'] = snapshot.origem_candidatos
+    except Exception as e:
+        app.config['DB_ERROR'] = str(e)
+
+    app.config['INICIALIZACAO']['pronto_s'] = round(time.perf_counter() - inicio, 4)
+    app.logger.info('TalentFlow pronto em %.3fs: %s', app.config['INICIALIZACAO']['pronto_s'], etapas)
+    app.config['PRONTO'].set()
 
-def create_app():
+def create_app(conexao=None):
+    inicio = time.perf_counter()
     app = Flask(__name__)
     load_dotenv()
-    uri = os.getenv('MONGODB_URI')
-    db_name = os.getenv('MONGODB_DB', 'talentflow')
-    if uri and MongoClient:
-        try:
-            kwargs = {'serverSelectionTimeoutMS': 5000}
-            try:
-                import certifi
-                kwargs['tlsCAFile'] = certifi.where()
-                kwargs['tls'] = True
-            except Exception:
-                pass
-            client = MongoClient(uri, **kwargs)
-            client.admin.command('ping')
-            app.config['DB'] = client[db_name]
-            app.config['DB_ERROR'] = None
-        except Exception as e:
-            app.config['DB'] = None
-            app.config['DB_ERROR'] = str(e)
-    else:
-        app.config['DB'] = None
-        app.config['DB_ERROR'] = 'MONGODB_URI ausente no .env.'
+    from . import metrics
+    metrics.instalar(app)
+    conexao = conexao or Conexao.from_env()
+    app.config['CONEXAO'] = conexao
+    app.config['DB'] = None
+    app.config['DB_ERROR'] = None
+    app.config['PRONTO'] = threading.Event()
+    app.config['INICIALIZACAO'] = {'create_app_s': None, 'pronto_s': None, 'etapas': {}, 'matcher': None, 'indice_candidatos': None, 'email_unico': None}
+
+    caminho_taxonomia = os.getenv('TALENTFLOW_TAXONOMIA', '')
+    if caminho_taxonomia and caminho_taxonomia.lower() != 'mongo':
+        from .nlp import taxonomia
+        taxonomia.definir_taxonomia(taxonomia.carregar_json(caminho_taxonomia))
+
+    from .cache import SnapshotCache, CacheRespostas
+    app.config['CACHE'] = SnapshotCache.from_env()
+    app.config['RESPOSTAS'] = CacheRespostas.from_env()
+
+    from .coverage import IndiceCobertura
+    app.config['COBERTURA'] = IndiceCobertura()
+
+    from .busca import IndiceBusca
+    app.config['BUSCA'] = IndiceBusca()
+
+    from .recommendation.recommender import IndiceSemantico
+    app.config['SEMANTICO'] = IndiceSemantico()
+
+    from .jobs import GeradorPlanos
+    app.config['PLANOS'] = GeradorPlanos.from_env()
 
     from .routes import main as main_blueprint
     app.register_blueprint(main_blueprint)
 
+    from .api import api as api_blueprint
+    app.register_blueprint(api_blueprint)
+
+    # A conexão com o banco e o aquecimento não bloqueiam a inicialização;
+    # /healthz responde 503 até terminarem. TALENTFLOW_BOOT_SINCRONO=1 espera.
+    aquecimento = threading.Thread(target=aquecer, args=(app, conexao, inicio), name='aquecimento', daemon=True)
+    aquecimento.start()
+    if os.getenv('TALENTFLOW_BOOT_SINCRONO', '').lower() in ('1', 'true', 'sim'):
+        aquecimento.join()
+
+    app.config['INICIALIZACAO']['create_app_s'] = round(time.perf_counter() - inicio, 4)
     return app
@@ -0,0 +1,168 @@
+import argparse
+import json
+import time
+
+from .nlp.extractor import normalizar_skill
+from .recommendation.recommender import SkillMatcher, FAIXAS_LABELS, faixa_compatibilidade
+
+# Agregados materializados do dashboard/gráficos, um documento por contador:
+#   {_id: 'total', tipo: 'total', count}
+#   {_id: 'skill:<chave>', tipo: 'skill', chave, display, count, ordem}
+#   {_id: 'area:<area>', tipo: 'area', chave, count, ordem}
+#   {_id: 'faixa:<i>', tipo: 'faixa', indice, count}
+# O índice (tipo, count, ordem) é criado por Repositorio.garantir_indices.
+COLECAO = 'agregados'
+
+def contribuicao(funcionario, matcher):
+    """O que um funcionário soma nos agregados: skills (com repetição), área e faixa da melhor vaga."""
+    skills = {}
+    display = {}
+    habilidades_declaradas = list(funcionario.get('habilidades_declaradas', []))
+    habilidades_descobertas = [h['skill'] for h in funcionario.get('habilidades_descobertas', [])]
+    for s in habilidades_declaradas + habilidades_descobertas:
+        k = normalizar_skill(s)
+        if k:
+            skills[k] = skills.get(k, 0) + 1
+            display.setdefault(k, s)
+    melhor, area = matcher.melhor_compatibilidade(funcionario)
+    return {'skills': skills, 'display': display, 'area': area, 'faixa': faixa_compatibilidade(melhor)}
+
+def _somar(deltas, displays, contrib, sinal):
+    deltas['total'] = deltas.get('total', 0) + sinal
+    for k, n in contrib['skills'].items():
+        deltas['skill:' + k] = deltas.get('skill:' + k, 0) + sinal * n
+        displays.setdefault('skill:' + k, contrib['display'][k])
+    if contrib['area']:
+        chave = 'area:' + contrib['area']
+        deltas[chave] = deltas.get(chave, 0) + sinal
+        displays.setdefault(chave, contrib['area'])
+    chave = 'faixa:%d' % contrib['faixa']
+    deltas[chave] = deltas.get(chave, 0) + sinal
+
+def registrar_alteracoes(db, pares, matcher):
+    """
+    Aplica incrementalmente a diferença entre versões de funcionários.
+    `pares` é uma lista de (antes, depois); use None em `antes` para inclusões.
+    """
+    if db.agregado_total() is None:
+        # Ainda não materializados: a primeira leitura faz a reconstrução completa.
+        return 0
+    deltas = {}
+    displays = {}
+    for antes, depois in pares:
+        if antes is not None:
+            _somar(deltas, displays, contribuicao(antes, matcher), -1)
+        if depois is not None:
+            _somar(deltas, displays, contribuicao(depois, matcher), 1)
+
+    ordem = time.time_ns()
+    alterados = {}
+    definicoes = {}
+    for _id, delta in deltas.items():
+        if not delta:
+            continue
+        tipo, _, chave = _id.partition(':')
+        definir = {'tipo': tipo}
+        if tipo == 'skill':
+            definir.update({'chave': chave, 'display': displays[_id], 'ordem': ordem})
+        elif tipo == 'area':
+            definir.update({'chave': chave, 'ordem': ordem})
+        elif tipo == 'faixa':
+            definir['indice'] = int(chave)
+        alterados[_id] = delta
+        definicoes[_id] = definir
+    if alterados:
+        db.incrementar_agregados(alterados, definicoes)
+    return len(alterados)
+
+def registrar_inclusao(db, funcionarios, matcher):
+    return registrar_alteracoes(db, [(None, f) for f in funcionarios], matcher)
+
+def calcular(funcionarios, matcher):
+    """Agregados completos a partir da lista de funcionários (mesma ordem de desempate das rotas)."""
+    contagem = {}
+    display_map = {}
+    for f in funcionarios:
+        habilidades_declaradas = list(f.get('habilidades_declaradas', []))
+        habilidades_descobertas = [h['skill'] for h in f.get('habilidades_descobertas', [])]
+        for s in habilidades_declaradas + habilidades_descobertas:
+            k = normalizar_skill(s)
+            if k:
+                contagem[k] = contagem.get(k, 0) + 1
+                if k not in display_map:
+                    display_map[k] = s
+    resumo = matcher.resumo_em_lote(funcionarios)
+    return {
+        'total': len(funcionarios),
+        'skills': [{'chave': k, 'skill': display_map[k], 'count': c} for k, c in contagem.items()],
+        'areas': resumo['area_counts'],
+        'distribuicao': resumo['distribuicao']
+    }
+
+def reconstruir(db, funcionarios=None, vagas=None):
+    """Recalcula todos os agregados do zero (reparo ou após mudanças nas vagas)."""
+    if funcionarios is None:
+        funcionarios = db.listar('funcionarios')
+    if vagas is None:
+        vagas = db.listar('vagas')
+    dados = calcular(funcionarios, SkillMatcher(vagas))
+    docs = [{'_id': 'total', 'tipo': 'total', 'count': dados['total']}]
+    for i, item in enumerate(dados['skills']):
+        docs.append({'_id': 'skill:' + item['chave'], 'tipo': 'skill', 'chave': item['chave'],
+                     'display': item['skill'], 'count': item['count'], 'ordem': i})
+    for i, (area, n) in enumerate(dados['areas'].items()):
+        docs.append({'_id': 'area:' + area, 'tipo': 'area', 'chave': area, 'count': n, 'ordem': i})
+    for i, n in enumerate(dados['distribuicao']):
+        docs.append({'_id': 'faixa:%d' % i, 'tipo': 'faixa', 'indice': i, 'count': n})
+    db.substituir_agregados(docs)
+    return dados
+
+def ler(db, top=10):
+    """
+    Lê os agregados materializados: total, top skills, contagem por área e
+    distribuição por faixa. Retorna None se ainda não foram construídos.
+    """
+    total = db.agregado_total()
+    if total is None:
+        return None
+    skills = db.agregados('skill', top, por_contagem=True)
+    areas = db.agregados('area')
+    distribuicao = [0] * len(FAIXAS_LABELS)
+    for doc in db.agregados('faixa'):
+        distribuicao[doc['indice']] = doc['count']
+    return {
+        'total': total,
+        'skills': [{'chave': d['chave'], 'skill': d['display'], 'count': d['count']} for d in skills],
+        'areas': {d['chave']: d['count'] for d in areas},
+        'distribuicao': distribuicao
+    }
+
+def vocabulario(db):
+    """
+    Todas as skills conhecidas dos funcionários: {chave normalizada: texto de
+    exibição}, na ordem em que apareceram pela primeira vez.
+    """
+    docs = db.agregados('skill')
+    return {d['chave']: d['display'] for d in docs}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Agregados materializados do dashboard.')
+    parser.add_argument('--reconstruir', action='store_true', help='recalcula todos os agregados a partir das coleções')
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    from .db import conectar
+    load_dotenv()
+    db, erro = conectar()
+    if db is None:
+        print(f"Erro de conexão com MongoDB: {erro}")
+        return 1
+    if args.reconstruir:
+        from .cache import incrementar_versao
+        reconstruir(db)
+        incrementar_versao(db)
+    print(json.dumps(ler(db), indent=4, ensure_ascii=False))
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,119 @@
+"""
+API JSON somente leitura sobre os mesmos dados do dashboard e dos gráficos.
+
+Cada resposta leva um ETag forte derivado da versão dos dados (a mesma do
+cache de snapshot), do caminho e dos argumentos da requisição. Um cliente que
+reenvia o ETag em If-None-Match recebe 304 sem que nada seja recalculado ou
+serializado. Corpos grandes são comprimidos com gzip quando o cliente aceita.
+"""
+from flask import Blueprint, Response, request, abort
+import gzip
+import hashlib
+import json
+
+from .routes import load_snapshot, load_vocabulario, load_busca, recomendar, dados_dashboard, dados_graficos, resumo_dashboard, get_db, COMPATIBILIDADE_LIMIAR
+
+api = Blueprint('api', __name__, url_prefix='/api')
+
+COMPRESSAO_MINIMA = 1024
+
+def calcular_etag(versao):
+    """ETag da requisição atual para a versão de dados informada (None quando não há versão)."""
+    if versao is None:
+        return None
+    argumentos = sorted(request.args.items(multi=True))
+    base = json.dumps([versao, request.path, argumentos], separators=(',', ':'), default=str)
+    return hashlib.sha1(base.encode('utf-8')).hexdigest()
+
+def aceita_gzip():
+    return 'gzip' in request.headers.get('Accept-Encoding', '').lower()
+
+def resposta_json(gerar):
+    """
+    Responde com o JSON produzido por gerar(), respeitando If-None-Match.
+    gerar só é chamado quando o cliente não tem a versão atual.
+    """
+    etag = calcular_etag(load_snapshot().versao)
+    comprimir = aceita_gzip()
+    if etag is not None and comprimir:
+        etag += '-gz'
+
+    if etag is not None and etag in request.if_none_match:
+        resposta = Response(status=304)
+    else:
+        corpo = json.dumps(gerar(), ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+        resposta = Response(corpo, mimetype='application/json')
+        if comprimir and len(corpo) >= COMPRESSAO_MINIMA:
+            resposta.set_data(gzip.compress(corpo, compresslevel=6))
+            resposta.headers['Content-Encoding'] = 'gzip'
+
+    if etag is not None:
+        resposta.set_etag(etag)
+    resposta.headers['Cache-Control'] = 'no-cache'
+    resposta.vary.add('Accept-Encoding')
+    return resposta
+
+@api.route('/funcionarios')
+def funcionarios():
+    """Mesma lista paginada do dashboard (aceita busca_habilidade, area, cargo, ordem, pagina, por_pagina)."""
+    def gerar():
+        dados = dados_dashboard(request.args)
+        return {
+            'funcionarios': dados['funcionarios'],
+            'pagina': dados['pagina'],
+            'por_pagina': dados['por_pagina'],
+            'total_paginas': dados['total_paginas'],
+            'total_resultados': dados['total_resultados'],
+            'total_colaboradores': dados['total_colaboradores'],
+            'erro': dados['db_error'],
+        }
+    return resposta_json(gerar)
+
+@api.route('/top_skills')
+def top_skills():
+    """Skills mais frequentes, opcionalmente filtradas por busca_habilidade e cargo."""
+    def gerar():
+        db = get_db()
+        if db is None:
+            return {'total_colaboradores': 0, 'top_skills': [], 'erro': 'Erro de conexão com MongoDB.'}
+        limite = min(max(request.args.get('limite', default=5, type=int), 1), 100)
+        _, _, total, top = resumo_dashboard(
+            load_snapshot(), db,
+            request.args.get('busca_habilidade', ''), request.args.get('cargo', ''), top=limite,
+        )
+        return {'total_colaboradores': total, 'top_skills': top, 'erro': None}
+    return resposta_json(gerar)
+
+@api.route('/skills/sugestoes')
+def sugestoes_skills():
+    """Busca enquanto se digita: skills parecidas com `q` (tolera erros) e quantos funcionários casam com a busca."""
+    def gerar():
+        snapshot = load_snapshot()
+        busca = request.args.get('q', '')
+        limite = min(max(request.args.get('limite', default=10, type=int), 1), 50)
+        indice = load_busca(snapshot)
+        vocabulario = load_vocabulario(snapshot)
+        ultimo_termo = busca.rsplit(',', 1)[-1]
+        sugestoes = [dict(s, skill=vocabulario.get(s['chave'], s['chave'])) for s in indice.sugerir(ultimo_termo, limite)]
+        return {'q': busca, 'sugestoes': sugestoes, 'total_funcionarios': len(indice.funcionarios(busca))}
+    return resposta_json(gerar)
+
+@api.route('/graficos')
+def graficos():
+    """Séries usadas pela página de gráficos."""
+    return resposta_json(dados_graficos)
+
+@api.route('/perfil/<int:id>/recomendacoes')
+def recomendacoes(id):
+    snapshot = load_snapshot()
+    funcionario = snapshot.funcionario(id)
+    if funcionario is None:
+        abort(404)
+    modo = request.args.get('modo', '')
+    limiar = request.args.get('limiar', default=None if modo == 'semantico' else COMPATIBILIDADE_LIMIAR, type=int)
+    return resposta_json(lambda: {
+        'id': id,
+        'modo': modo or 'skills',
+        'limiar': limiar,
+        'recomendacoes': recomendar(snapshot, funcionario, modo, limiar),
+    })
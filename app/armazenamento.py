@@ -0,0 +1,886 @@
+"""
+Backends locais do repositório (app.repositorio): SQLite ou uma pasta de
+arquivos JSON, para rodar sem servidor MongoDB (uso offline ou na borda).
+
+- sqlite: tabelas com colunas tipadas e índices do próprio SQLite. Em
+  `funcionarios`, id, nome, cargo, email, area_top e melhor_compatibilidade
+  são colunas (o documento completo fica em `doc`) e `funcionario_skills`
+  tem uma linha por skill normalizada; consulta por id, filtros, ordenação,
+  paginação, contagens e top skills do dashboard rodam em SQL sobre esses
+  índices. O esquema, inclusive o índice único de email, fica no arquivo.
+  Modo WAL: vários workers podem abrir o mesmo arquivo.
+- json: uma pasta com um `<coleção>.json` por coleção (lista de documentos ou
+  `{coleção: lista}`, como o gravado pelo extrator), carregada em memória e
+  regravada de forma atômica a cada escrita. Os índices de funcionários (id,
+  email, skill) são montados a partir dos dados ao abrir e o estado do índice
+  único de email fica em meta.json. É de processo único: a pasta fica travada
+  (`.talentflow.lock`) enquanto aberta e um segundo processo, ou um worker
+  criado por fork, falha ao usá-la em vez de perder escritas.
+
+TALENTFLOW_BANCO escolhe o backend (`mongo`, padrão; `json`; `sqlite`) e
+TALENTFLOW_BANCO_CAMINHO a pasta (json, padrão `instance/json`) ou o arquivo
+(sqlite, padrão `instance/talentflow.sqlite3`). Os padrões ficam fora de
+app/data, que guarda só arquivos de origem.
+
+Uso (copiar as coleções de um backend para outro):
+    python -m app.armazenamento --de mongo --para sqlite --caminho instance/talentflow.sqlite3
+"""
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos
+    fcntl = None
+
+from .nlp.extractor import gravar_json_atomico
+from .repositorio import (
+    Repositorio, COLECOES_BASE, COLECAO_AGREGADOS, COLECAO_META, COLECAO_CONTADORES,
+    COLECAO_MARCAS, COLECAO_PLANOS, COLECAO_TAXONOMIA, ID_VERSAO, CAMPOS_DISTINTOS, TAMANHO_LOTE,
+    AVISO_EMAIL_REPETIDO, copiar as copiar_valor, projetar, adicionar_sem_repetir, verificar_colecoes,
+)
+
+BACKENDS = ('mongo', 'json', 'sqlite')
+PASTA_INSTANCIA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instance')
+PASTA_PADRAO = os.path.join(PASTA_INSTANCIA, 'json')
+PASTA_ORIGEM = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+ARQUIVO_SQLITE_PADRAO = os.path.join(PASTA_INSTANCIA, 'talentflow.sqlite3')
+ARQUIVO_TRAVA = '.talentflow.lock'
+ID_INDICES = 'indices'
+
+logger = logging.getLogger(__name__)
+
+_abertos = {}
+_abertos_lock = threading.Lock()
+
+def _ordem(valor):
+    """Posição de um valor na ordenação do MongoDB: ausente/None, números, textos, subdocumentos, listas e booleanos."""
+    if valor is None:
+        return (0,)
+    if isinstance(valor, bool):
+        return (5, valor)
+    if isinstance(valor, (int, float)):
+        return (1, valor)
+    if isinstance(valor, str):
+        return (2, valor)
+    return (3 if isinstance(valor, dict) else 4, json.dumps(valor, sort_keys=True, default=str))
+
+def _texto(doc, campo):
+    valor = doc.get(campo)
+    return valor if isinstance(valor, str) else None
+
+def _numero(doc, campo):
+    valor = doc.get(campo)
+    return valor if isinstance(valor, (int, float)) and not isinstance(valor, bool) else None
+
+def _skills(doc):
+    return [s for s in doc.get('skills_normalizadas') or () if isinstance(s, str)]
+
+# --- SQLite ---
+
+ESQUEMA = 1
+TABELAS = """
+CREATE TABLE IF NOT EXISTS funcionarios (
+    pos INTEGER PRIMARY KEY,
+    id INTEGER,
+    nome TEXT,
+    cargo TEXT,
+    email TEXT,
+    area_top TEXT,
+    melhor_compatibilidade REAL,
+    derivados INTEGER NOT NULL DEFAULT 0,
+    doc TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS funcionario_skills (
+    pos INTEGER NOT NULL,
+    ordem INTEGER NOT NULL,
+    skill TEXT NOT NULL,
+    PRIMARY KEY (pos, ordem)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS vagas (pos INTEGER PRIMARY KEY, id INTEGER, doc TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS projetos (pos INTEGER PRIMARY KEY, id_projeto INTEGER, doc TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS agregados (
+    id TEXT PRIMARY KEY,
+    tipo TEXT NOT NULL,
+    chave TEXT,
+    display TEXT,
+    indice INTEGER,
+    contagem INTEGER NOT NULL DEFAULT 0,
+    ordem INTEGER
+);
+CREATE TABLE IF NOT EXISTS meta (chave TEXT PRIMARY KEY, valores TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS contadores (nome TEXT PRIMARY KEY, valor INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS descoberta_projetos (chave PRIMARY KEY, hash TEXT NOT NULL, atualizado_em TEXT);
+CREATE TABLE IF NOT EXISTS planos_carreira (
+    chave TEXT PRIMARY KEY,
+    status TEXT,
+    plano TEXT,
+    erro TEXT,
+    modelo TEXT,
+    atualizado_em REAL
+);
+CREATE TABLE IF NOT EXISTS taxonomia_skills (ordem INTEGER PRIMARY KEY, chave TEXT, nome TEXT NOT NULL, aliases TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS funcionarios_id ON funcionarios (id);
+CREATE INDEX IF NOT EXISTS funcionarios_cargo ON funcionarios (cargo);
+CREATE INDEX IF NOT EXISTS funcionarios_area_top ON funcionarios (area_top);
+CREATE INDEX IF NOT EXISTS funcionarios_nome ON funcionarios (nome, id);
+CREATE INDEX IF NOT EXISTS funcionarios_compatibilidade ON funcionarios (melhor_compatibilidade DESC, id);
+CREATE INDEX IF NOT EXISTS funcionarios_sem_derivados ON funcionarios (pos) WHERE derivados = 0;
+CREATE INDEX IF NOT EXISTS funcionario_skills_skill ON funcionario_skills (skill, pos);
+CREATE INDEX IF NOT EXISTS vagas_id ON vagas (id);
+CREATE INDEX IF NOT EXISTS projetos_id ON projetos (id_projeto);
+CREATE INDEX IF NOT EXISTS agregados_tipo ON agregados (tipo, contagem DESC, ordem);
+"""
+INDICE_EMAIL_UNICO = 'funcionarios_email_unico'
+INDICE_EMAIL = 'funcionarios_email'
+ORDENACOES_SQL = {
+    'nome': 'nome, id, pos',
+    'compat': 'melhor_compatibilidade DESC, id, pos',
+}
+COLUNAS_PLANO = ('status', 'plano', 'erro', 'modelo', 'atualizado_em')
+COLUNAS_AGREGADO = ('tipo', 'chave', 'display', 'indice', 'ordem')
+EM_LISTA = '(SELECT value FROM json_each(?))'
+
+def _json(valor):
+    return json.dumps(valor, ensure_ascii=False, separators=(',', ':'), default=str)
+
+def _onde(filtro):
+    """Cláusula WHERE (e parâmetros) do filtro de funcionários; listas vão como um único parâmetro JSON."""
+    condicoes = []
+    parametros = []
+    for chaves in filtro.get('skills') or ():
+        condicoes.append(f"pos IN (SELECT pos FROM funcionario_skills WHERE skill IN {EM_LISTA})")
+        parametros.append(_json(list(chaves)))
+    for campo in ('cargo', 'area_top'):
+        if campo in filtro:
+            condicoes.append(f"{campo} IN {EM_LISTA}")
+            parametros.append(_json(list(filtro[campo])))
+    return (' WHERE ' + ' AND '.join(condicoes) if condicoes else ''), parametros
+
+class RepositorioSQLite(Repositorio):
+    """
+    Arquivo SQLite compartilhado pelas threads do processo (uma conexão,
+    protegida por trava); escritas em transações BEGIN IMMEDIATE, atômicas
+    também entre processos.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        if caminho != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self._sql = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None)
+        self._sql.execute('PRAGMA journal_mode=WAL')
+        self._sql.execute('PRAGMA synchronous=NORMAL')
+        self._sql.execute('PRAGMA busy_timeout=5000')
+        self._lock = threading.RLock()
+        self._profundidade = 0
+        self._criar_esquema()
+
+    def _criar_esquema(self):
+        versao, = self._sql.execute('PRAGMA user_version').fetchone()
+        if versao == ESQUEMA:
+            return
+        antigas = self._sql.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('_indices', 'funcionarios')").fetchall()
+        if versao or antigas:
+            raise RuntimeError(f"{self.caminho} tem um esquema antigo ({versao}); recrie o arquivo com python -m app.armazenamento --para sqlite.")
+        self._sql.executescript(TABELAS)
+        self._sql.execute(f'PRAGMA user_version = {ESQUEMA}')
+
+    @contextmanager
+    def _transacao(self):
+        with self._lock:
+            if self._profundidade == 0:
+                self._sql.execute('BEGIN IMMEDIATE')
+            self._profundidade += 1
+            try:
+                yield self._sql
+            except BaseException:
+                self._profundidade -= 1
+                if self._profundidade == 0:
+                    self._sql.execute('ROLLBACK')
+                raise
+            self._profundidade -= 1
+            if self._profundidade == 0:
+                self._sql.execute('COMMIT')
+
+    def _ler(self, consulta, parametros=()):
+        with self._lock:
+            return self._sql.execute(consulta, parametros).fetchall()
+
+    def _docs(self, consulta, parametros=(), campos=None):
+        return [projetar(json.loads(doc), campos) for doc, in self._ler(consulta, parametros)]
+
+    # Funcionários: colunas indexadas + documento, e uma linha por skill.
+
+    def _gravar_funcionario(self, sql, doc, pos=None):
+        colunas = (doc.get('id'), _texto(doc, 'nome'), _texto(doc, 'cargo'), _texto(doc, 'email'), _texto(doc, 'area_top'),
+                   _numero(doc, 'melhor_compatibilidade'), int('skills_normalizadas' in doc), _json(doc))
+        if pos is None:
+            pos = sql.execute("INSERT INTO funcionarios (id, nome, cargo, email, area_top, melhor_compatibilidade, derivados, doc) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", colunas).lastrowid
+        else:
+            sql.execute("UPDATE funcionarios SET id = ?, nome = ?, cargo = ?, email = ?, area_top = ?, melhor_compatibilidade = ?, derivados = ?, doc = ? WHERE pos = ?", colunas + (pos,))
+            sql.execute("DELETE FROM funcionario_skills WHERE pos = ?", (pos,))
+        sql.executemany("INSERT INTO funcionario_skills (pos, ordem, skill) VALUES (?, ?, ?)", [(pos, i, s) for i, s in enumerate(_skills(doc))])
+        return pos
+
+    def _alterar_funcionarios(self, pares, alterar):
+        """Aplica alterar(doc) ao primeiro funcionário de cada id (como um update_one); retorna quantos mudaram."""
+        alterados = 0
+        with self._transacao() as sql:
+            for id, argumento in pares:
+                linha = sql.execute("SELECT pos, doc FROM funcionarios WHERE id = ? ORDER BY pos LIMIT 1", (id,)).fetchone()
+                if linha is None:
+                    continue
+                doc = json.loads(linha[1])
+                if alterar(doc, argumento):
+                    self._gravar_funcionario(sql, doc, linha[0])
+                    alterados += 1
+        return alterados
+
+    def listar(self, colecao, campos=None, lote=TAMANHO_LOTE):
+        verificar_colecoes([colecao], COLECOES_BASE)
+        return self._docs(f"SELECT doc FROM {colecao} ORDER BY pos", (), campos)
+
+    def inserir(self, colecao, docs):
+        verificar_colecoes([colecao], COLECOES_BASE)
+        with self._transacao() as sql:
+            if colecao == 'funcionarios':
+                for doc in docs:
+                    self._gravar_funcionario(sql, doc)
+            else:
+                campo = 'id_projeto' if colecao == 'projetos' else 'id'
+                sql.executemany(f"INSERT INTO {colecao} ({campo}, doc) VALUES (?, ?)", [(doc.get(campo), _json(doc)) for doc in docs])
+
+    def limpar(self, *colecoes):
+        verificar_colecoes(colecoes)
+        with self._transacao() as sql:
+            for colecao in colecoes:
+                sql.execute(f"DELETE FROM {colecao}")
+                if colecao == 'funcionarios':
+                    sql.execute("DELETE FROM funcionario_skills")
+
+    def funcionario(self, id):
+        docs = self._docs("SELECT doc FROM funcionarios WHERE id = ? ORDER BY pos LIMIT 1", (id,))
+        return docs[0] if docs else None
+
+    def funcionarios_por_id(self, ids, campos=None):
+        return self._docs(f"SELECT doc FROM funcionarios WHERE id IN {EM_LISTA} ORDER BY pos", (_json(list(ids)),), campos)
+
+    def funcionarios_sem_derivados(self, campos=None):
+        return self._docs("SELECT doc FROM funcionarios WHERE derivados = 0 ORDER BY pos", (), campos)
+
+    def maior_id_funcionario(self):
+        maior, = self._ler("SELECT MAX(id) FROM funcionarios")[0]
+        return maior or 0
+
+    def emails_existentes(self, emails):
+        return {email for email, in self._ler(f"SELECT email FROM funcionarios WHERE email IN {EM_LISTA}", (_json(list(emails)),))}
+
+    def inserir_funcionarios(self, docs):
+        recusados = []
+        with self._transacao() as sql:
+            for i, doc in enumerate(docs):
+                try:
+                    self._gravar_funcionario(sql, doc)
+                except sqlite3.IntegrityError:
+                    recusados.append(i)
+        return recusados
+
+    def atualizar_funcionarios(self, alteracoes):
+        self._alterar_funcionarios(alteracoes, lambda doc, campos: doc.update(copiar_valor(campos)) or True)
+        return len(alteracoes)
+
+    def adicionar_descobertas(self, novas):
+        return self._alterar_funcionarios(novas, lambda doc, itens: adicionar_sem_repetir(doc.setdefault('habilidades_descobertas', []), itens))
+
+    def valores_distintos(self, campo):
+        if campo not in CAMPOS_DISTINTOS:
+            raise ValueError(f"Campo sem valores distintos: {campo}")
+        if campo == 'skills_normalizadas':
+            return [s for s, in self._ler("SELECT DISTINCT skill FROM funcionario_skills ORDER BY skill")]
+        return [v for v, in self._ler(f"SELECT DISTINCT {campo} FROM funcionarios WHERE {campo} IS NOT NULL ORDER BY {campo}")]
+
+    def contar_funcionarios(self, filtro):
+        onde, parametros = _onde(filtro)
+        return self._ler(f"SELECT COUNT(*) FROM funcionarios{onde}", parametros)[0][0]
+
+    def pagina_funcionarios(self, filtro, ordem='nome', pular=0, limite=0, campos=None):
+        onde, parametros = _onde(filtro)
+        return self._docs(f"SELECT doc FROM funcionarios{onde} ORDER BY {ORDENACOES_SQL.get(ordem, ORDENACOES_SQL['nome'])} LIMIT ? OFFSET ?",
+                          parametros + [limite or -1, pular], campos)
+
+    def iterar_funcionarios(self, filtro, ordem='nome', campos=None, lote=TAMANHO_LOTE):
+        # Só as posições são lidas de uma vez; os documentos vêm em lotes, sem prender a conexão durante o envio.
+        onde, parametros = _onde(filtro)
+        posicoes = [pos for pos, in self._ler(f"SELECT pos FROM funcionarios{onde} ORDER BY {ORDENACOES_SQL.get(ordem, ORDENACOES_SQL['nome'])}", parametros)]
+        for inicio in range(0, len(posicoes), lote):
+            parte = posicoes[inicio:inicio + lote]
+            docs = dict(self._ler(f"SELECT pos, doc FROM funcionarios WHERE pos IN {EM_LISTA}", (_json(parte),)))
+            for pos in parte:
+                if pos in docs:
+                    yield projetar(json.loads(docs[pos]), campos)
+
+    def contar_skills(self, filtro):
+        onde, parametros = _onde(filtro)
+        restricao = f" WHERE pos IN (SELECT pos FROM funcionarios{onde})" if onde else ''
+        return dict(self._ler(f"SELECT skill, COUNT(*) FROM funcionario_skills{restricao} GROUP BY skill", parametros))
+
+    def garantir_indices(self):
+        with self._lock:
+            try:
+                self._sql.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {INDICE_EMAIL_UNICO} ON funcionarios (email) WHERE email IS NOT NULL")
+            except sqlite3.IntegrityError as e:
+                logger.warning(AVISO_EMAIL_REPETIDO, e)
+                self._sql.execute(f"CREATE INDEX IF NOT EXISTS {INDICE_EMAIL} ON funcionarios (email, id)")
+                return
+            self._sql.execute(f"DROP INDEX IF EXISTS {INDICE_EMAIL}")
+
+    def email_unico(self):
+        return bool(self._ler("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (INDICE_EMAIL_UNICO,)))
+
+    def agregado_total(self):
+        linhas = self._ler("SELECT contagem FROM agregados WHERE id = 'total'")
+        return linhas[0][0] if linhas else None
+
+    def agregados(self, tipo, limite=0, por_contagem=False):
+        ordem = 'contagem DESC, ordem' if por_contagem else 'ordem'
+        linhas = self._ler(f"SELECT tipo, chave, display, indice, ordem, contagem FROM agregados WHERE tipo = ? AND contagem > 0 ORDER BY {ordem} LIMIT ?", (tipo, limite or -1))
+        return [dict({c: v for c, v in zip(COLUNAS_AGREGADO, linha) if v is not None}, count=linha[-1]) for linha in linhas]
+
+    def incrementar_agregados(self, deltas, definicoes):
+        with self._transacao() as sql:
+            sql.executemany(
+                "INSERT INTO agregados (id, tipo, chave, display, indice, ordem, contagem) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET contagem = contagem + excluded.contagem",
+                [(_id, *(definicoes[_id].get(c) for c in COLUNAS_AGREGADO), delta) for _id, delta in deltas.items()])
+
+    def substituir_agregados(self, docs):
+        with self._transacao() as sql:
+            sql.executemany("INSERT OR REPLACE INTO agregados (id, tipo, chave, display, indice, ordem, contagem) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            [(d['_id'], *(d.get(c) for c in COLUNAS_AGREGADO), d.get('count', 0)) for d in docs])
+            sql.execute(f"DELETE FROM agregados WHERE id NOT IN {EM_LISTA}", (_json([d['_id'] for d in docs]),))
+
+    def versao_dados(self):
+        linhas = self._ler("SELECT json_extract(valores, '$.valor') FROM meta WHERE chave = ?", (ID_VERSAO,))
+        return (linhas[0][0] or 0) if linhas else 0
+
+    def incrementar_versao(self):
+        with self._transacao() as sql:
+            sql.execute("INSERT INTO meta (chave, valores) VALUES (?, '{\"valor\":1}') "
+                        "ON CONFLICT (chave) DO UPDATE SET valores = json_set(valores, '$.valor', COALESCE(json_extract(valores, '$.valor'), 0) + 1)", (ID_VERSAO,))
+
+    def garantir_contador(self, nome, minimo):
+        with self._transacao() as sql:
+            sql.execute("INSERT INTO contadores (nome, valor) VALUES (?, ?) ON CONFLICT (nome) DO UPDATE SET valor = MAX(valor, excluded.valor)", (nome, minimo))
+
+    def incrementar_contador(self, nome, quantidade, criar=False):
+        with self._transacao() as sql:
+            if criar:
+                sql.execute("INSERT INTO contadores (nome, valor) VALUES (?, ?) ON CONFLICT (nome) DO UPDATE SET valor = valor + excluded.valor", (nome, quantidade))
+            elif not sql.execute("UPDATE contadores SET valor = valor + ? WHERE nome = ?", (quantidade, nome)).rowcount:
+                return None
+            return sql.execute("SELECT valor FROM contadores WHERE nome = ?", (nome,)).fetchone()[0]
+
+    def ler_meta(self, chave):
+        linhas = self._ler("SELECT valores FROM meta WHERE chave = ?", (chave,))
+        return json.loads(linhas[0][0]) if linhas else None
+
+    def gravar_meta(self, chave, valores):
+        with self._transacao() as sql:
+            atual = self.ler_meta(chave) or {}
+            atual.update(valores)
+            sql.execute("INSERT OR REPLACE INTO meta (chave, valores) VALUES (?, ?)", (chave, _json(atual)))
+
+    def marcas_descoberta(self):
+        return dict(self._ler("SELECT chave, hash FROM descoberta_projetos"))
+
+    def gravar_marcas_descoberta(self, marcas, data):
+        with self._transacao() as sql:
+            sql.executemany("INSERT OR REPLACE INTO descoberta_projetos (chave, hash, atualizado_em) VALUES (?, ?, ?)",
+                            [(chave, valor, data) for chave, valor in marcas.items()])
+
+    def ler_plano(self, chave):
+        linhas = self._ler(f"SELECT {', '.join(COLUNAS_PLANO)} FROM planos_carreira WHERE chave = ?", (chave,))
+        return {c: v for c, v in zip(COLUNAS_PLANO, linhas[0]) if v is not None} if linhas else None
+
+    def gravar_plano(self, chave, campos):
+        colunas = [c for c in COLUNAS_PLANO if c in campos]
+        with self._transacao() as sql:
+            sql.execute(f"INSERT INTO planos_carreira (chave, {', '.join(colunas)}) VALUES (?{', ?' * len(colunas)}) "
+                        f"ON CONFLICT (chave) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in colunas)}",
+                        (chave, *(campos[c] for c in colunas)))
+
+    def reivindicar_plano(self, chave, campos, limite):
+        colunas = [c for c in COLUNAS_PLANO if c in campos]
+        with self._transacao() as sql:
+            cursor = sql.execute(
+                f"INSERT INTO planos_carreira (chave, {', '.join(colunas)}) VALUES (?{', ?' * len(colunas)}) "
+                f"ON CONFLICT (chave) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in colunas)} "
+                "WHERE status = 'erro' OR (status = 'pendente' AND atualizado_em < ?)",
+                (chave, *(campos[c] for c in colunas), limite))
+            return cursor.rowcount == 1
+
+    def fechar(self):
+        with self._lock:
+            self._sql.close()
+
+    def ler_taxonomia(self):
+        return [{'chave': chave, 'nome': nome, 'aliases': json.loads(aliases)} for chave, nome, aliases in self._ler("SELECT chave, nome, aliases FROM taxonomia_skills ORDER BY ordem")]
+
+    def gravar_taxonomia(self, entradas):
+        with self._transacao() as sql:
+            sql.execute("DELETE FROM taxonomia_skills")
+            sql.executemany("INSERT INTO taxonomia_skills (ordem, chave, nome, aliases) VALUES (?, ?, ?, ?)",
+                            [(i, e.get('chave'), e['nome'], _json(list(e.get('aliases', [])))) for i, e in enumerate(entradas)])
+
+# --- JSON ---
+
+def _processo_unico(pasta):
+    """
+    Trava exclusiva da pasta JSON para este processo (o arquivo fica aberto
+    enquanto o repositório existir). Cada processo carrega os arquivos uma vez,
+    então dois processos sobre a mesma pasta perderiam as escritas um do outro.
+    """
+    if fcntl is None:
+        return None
+    os.makedirs(pasta, exist_ok=True)
+    trava = open(os.path.join(pasta, ARQUIVO_TRAVA), 'a')
+    try:
+        fcntl.flock(trava, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        trava.close()
+        raise RuntimeError(f"A pasta {pasta} já está aberta por outro processo: o backend json é de processo único (use sqlite ou mongo com vários workers).")
+    return trava
+
+class RepositorioJSON(Repositorio):
+    """
+    Pasta com um arquivo JSON por coleção, em memória. Coleções base são
+    listas de documentos; agregados, meta, contadores e planos, dicionários
+    por chave. Com `somente_leitura` a pasta não é travada nem alterada (ex.:
+    ler os arquivos de origem de app/data na linha de comando).
+    """
+
+    def __init__(self, pasta, somente_leitura=False):
+        self.pasta = pasta
+        self.somente_leitura = somente_leitura
+        self._lock = threading.RLock()
+        self._pid = os.getpid()
+        self._trava = None if somente_leitura else _processo_unico(pasta)
+        self._dados = {}
+        self._envelopes = {}
+        self._por_id = None
+        self._por_skill = None
+        self._emails = None
+
+    def _verificar_processo(self):
+        # Um worker criado por fork herda a trava e os dados do processo pai.
+        if os.getpid() != self._pid and not self.somente_leitura:
+            raise RuntimeError(f"A pasta {self.pasta} foi aberta no processo {self._pid}: o backend json é de processo único; abra o banco depois do fork ou use sqlite ou mongo.")
+
+    def _colecao(self, nome):
+        """Dados da coleção (carregados do arquivo na primeira vez)."""
+        self._verificar_processo()
+        if nome not in self._dados:
+            caminho = os.path.join(self.pasta, f"{nome}.json")
+            dados = None
+            if os.path.exists(caminho):
+                with open(caminho, 'r', encoding='utf-8') as f:
+                    dados = json.load(f)
+            if nome in COLECOES_BASE or nome == COLECAO_TAXONOMIA:
+                if isinstance(dados, dict):
+                    self._envelopes[nome] = nome if nome in dados else next(iter(dados), nome)
+                    dados = dados.get(self._envelopes[nome], [])
+                dados = [{k: v for k, v in d.items() if k != '_id'} for d in dados or []]
+            elif nome in (COLECAO_AGREGADOS, COLECAO_MARCAS):
+                dados = {d['_id']: {k: v for k, v in d.items() if k != '_id'} for d in dados or []}
+            else:
+                dados = dados or {}
+            self._dados[nome] = dados
+        return self._dados[nome]
+
+    def _gravar(self, *nomes):
+        if self.somente_leitura:
+            raise RuntimeError(f"A pasta {self.pasta} foi aberta somente para leitura.")
+        os.makedirs(self.pasta, exist_ok=True)
+        for nome in nomes:
+            dados = self._colecao(nome)
+            if nome in (COLECAO_AGREGADOS, COLECAO_MARCAS):
+                dados = [dict(doc, _id=_id) for _id, doc in dados.items()]
+            elif nome in self._envelopes:
+                dados = {self._envelopes[nome]: dados}
+            gravar_json_atomico(os.path.join(self.pasta, f"{nome}.json"), dados)
+
+    # Índices dos funcionários, montados a partir dos dados: id -> posições, skill -> posições, email -> quantidade.
+
+    def _funcionarios(self):
+        docs = self._colecao('funcionarios')
+        if self._por_id is None:
+            self._por_id, self._por_skill, self._emails = {}, {}, Counter()
+            for pos, doc in enumerate(docs):
+                self._indexar(pos, doc, 1)
+        return docs
+
+    def _indexar(self, pos, doc, sinal):
+        id = doc.get('id')
+        if isinstance(id, (int, str)):
+            posicoes = self._por_id.setdefault(id, [])
+            if sinal > 0:
+                posicoes.append(pos)
+                posicoes.sort()
+            else:
+                posicoes.remove(pos)
+                if not posicoes:
+                    del self._por_id[id]
+        for skill in set(_skills(doc)):
+            if sinal > 0:
+                self._por_skill.setdefault(skill, set()).add(pos)
+            else:
+                self._por_skill[skill].discard(pos)
+        email = _texto(doc, 'email')
+        if email is not None:
+            self._emails[email] += sinal
+
+    def _anexar_funcionario(self, doc):
+        docs = self._funcionarios()
+        docs.append(copiar_valor(doc))
+        self._indexar(len(docs) - 1, docs[-1], 1)
+
+    def _alterar_funcionarios(self, pares, alterar):
+        with self._lock:
+            docs = self._funcionarios()
+            alterados = 0
+            for id, argumento in pares:
+                posicoes = self._por_id.get(id) if isinstance(id, (int, str)) else None
+                if not posicoes:
+                    continue
+                pos = posicoes[0]
+                novo = copiar_valor(docs[pos])
+                if alterar(novo, argumento):
+                    self._indexar(pos, docs[pos], -1)
+                    docs[pos] = novo
+                    self._indexar(pos, novo, 1)
+                    alterados += 1
+            if pares:
+                self._gravar('funcionarios')
+            return alterados
+
+    def _filtrados(self, filtro):
+        docs = self._funcionarios()
+        posicoes = None
+        for chaves in filtro.get('skills') or ():
+            encontrados = set()
+            for chave in chaves:
+                encontrados |= self._por_skill.get(chave, set())
+            posicoes = encontrados if posicoes is None else posicoes & encontrados
+        selecionados = docs if posicoes is None else [docs[pos] for pos in sorted(posicoes)]
+        for campo in ('cargo', 'area_top'):
+            if campo in filtro:
+                aceitos = {v for v in filtro[campo] if isinstance(v, str)}
+                selecionados = [d for d in selecionados if _texto(d, campo) in aceitos]
+        return selecionados
+
+    def _ordenados(self, filtro, ordem):
+        docs = list(self._filtrados(filtro))
+        docs.sort(key=lambda d: _ordem(d.get('id')))
+        if ordem == 'compat':
+            docs.sort(key=lambda d: _ordem(d.get('melhor_compatibilidade')), reverse=True)
+        else:
+            docs.sort(key=lambda d: _ordem(d.get('nome')))
+        return docs
+
+    def listar(self, colecao, campos=None, lote=TAMANHO_LOTE):
+        verificar_colecoes([colecao], COLECOES_BASE)
+        with self._lock:
+            return [projetar(d, campos) for d in self._colecao(colecao)]
+
+    def inserir(self, colecao, docs):
+        verificar_colecoes([colecao], COLECOES_BASE)
+        with self._lock:
+            for doc in docs:
+                if colecao == 'funcionarios':
+                    self._anexar_funcionario(doc)
+                else:
+                    self._colecao(colecao).append(projetar(doc))
+            self._gravar(colecao)
+
+    def limpar(self, *colecoes):
+        verificar_colecoes(colecoes)
+        with self._lock:
+            for colecao in colecoes:
+                self._dados[colecao] = [] if colecao in COLECOES_BASE or colecao == COLECAO_TAXONOMIA else {}
+                if colecao == 'funcionarios':
+                    self._por_id = None
+            self._gravar(*colecoes)
+
+    def funcionario(self, id):
+        with self._lock:
+            docs = self._funcionarios()
+            posicoes = self._por_id.get(id) if isinstance(id, (int, str)) else None
+            return projetar(docs[posicoes[0]]) if posicoes else None
+
+    def funcionarios_por_id(self, ids, campos=None):
+        with self._lock:
+            docs = self._funcionarios()
+            posicoes = sorted(pos for id in set(ids) if isinstance(id, (int, str)) for pos in self._por_id.get(id, ()))
+            return [projetar(docs[pos], campos) for pos in posicoes]
+
+    def funcionarios_sem_derivados(self, campos=None):
+        with self._lock:
+            return [projetar(d, campos) for d in self._funcionarios() if 'skills_normalizadas' not in d]
+
+    def maior_id_funcionario(self):
+        with self._lock:
+            self._funcionarios()
+            return max((id for id in self._por_id if isinstance(id, int) and not isinstance(id, bool)), default=0)
+
+    def emails_existentes(self, emails):
+        with self._lock:
+            self._funcionarios()
+            return {e for e in emails if self._emails.get(e, 0) > 0}
+
+    def inserir_funcionarios(self, docs):
+        with self._lock:
+            self._funcionarios()
+            unico = self.email_unico()
+            recusados = []
+            for i, doc in enumerate(docs):
+                email = _texto(doc, 'email')
+                if unico and email is not None and self._emails.get(email, 0) > 0:
+                    recusados.append(i)
+                    continue
+                self._anexar_funcionario(doc)
+            if len(recusados) < len(docs):
+                self._gravar('funcionarios')
+            return recusados
+
+    def atualizar_funcionarios(self, alteracoes):
+        self._alterar_funcionarios(alteracoes, lambda doc, campos: doc.update(copiar_valor(campos)) or True)
+        return len(alteracoes)
+
+    def adicionar_descobertas(self, novas):
+        return self._alterar_funcionarios(novas, lambda doc, itens: adicionar_sem_repetir(doc.setdefault('habilidades_descobertas', []), itens))
+
+    def valores_distintos(self, campo):
+        if campo not in CAMPOS_DISTINTOS:
+            raise ValueError(f"Campo sem valores distintos: {campo}")
+        with self._lock:
+            docs = self._funcionarios()
+            if campo == 'skills_normalizadas':
+                return sorted(skill for skill, posicoes in self._por_skill.items() if posicoes)
+            return sorted({_texto(d, campo) for d in docs} - {None})
+
+    def contar_funcionarios(self, filtro):
+        with self._lock:
+            return len(self._filtrados(filtro))
+
+    def pagina_funcionarios(self, filtro, ordem='nome', pular=0, limite=0, campos=None):
+        with self._lock:
+            docs = self._ordenados(filtro, ordem)
+            docs = docs[pular:pular + limite] if limite else docs[pular:]
+            return [projetar(d, campos) for d in docs]
+
+    def iterar_funcionarios(self, filtro, ordem='nome', campos=None, lote=TAMANHO_LOTE):
+        with self._lock:
+            docs = self._ordenados(filtro, ordem)
+        return (projetar(d, campos) for d in docs)
+
+    def contar_skills(self, filtro):
+        with self._lock:
+            contagem = Counter()
+            for doc in self._filtrados(filtro):
+                contagem.update(_skills(doc))
+            return dict(contagem)
+
+    def garantir_indices(self):
+        with self._lock:
+            self._funcionarios()
+            repetidos = [email for email, n in self._emails.items() if n > 1]
+            if repetidos:
+                logger.warning(AVISO_EMAIL_REPETIDO, f"{len(repetidos)} emails repetidos, ex.: {repetidos[0]}")
+            if self.email_unico() != (not repetidos):
+                self.gravar_meta(ID_INDICES, {'email_unico': not repetidos})
+
+    def email_unico(self):
+        with self._lock:
+            return bool((self.ler_meta(ID_INDICES) or {}).get('email_unico'))
+
+    def agregado_total(self):
+        with self._lock:
+            total = self._colecao(COLECAO_AGREGADOS).get('total')
+            return None if total is None else total.get('count', 0)
+
+    def agregados(self, tipo, limite=0, por_contagem=False):
+        with self._lock:
+            docs = [copiar_valor(d) for d in self._colecao(COLECAO_AGREGADOS).values() if d.get('tipo') == tipo and (d.get('count') or 0) > 0]
+        docs.sort(key=lambda d: _ordem(d.get('ordem')))
+        if por_contagem:
+            docs.sort(key=lambda d: d['count'], reverse=True)
+        return docs[:limite] if limite else docs
+
+    def incrementar_agregados(self, deltas, definicoes):
+        with self._lock:
+            agregados = self._colecao(COLECAO_AGREGADOS)
+            for _id, delta in deltas.items():
+                doc = agregados.setdefault(_id, dict(copiar_valor(definicoes[_id]), count=0))
+                doc['count'] = doc.get('count', 0) + delta
+            self._gravar(COLECAO_AGREGADOS)
+
+    def substituir_agregados(self, docs):
+        with self._lock:
+            self._dados[COLECAO_AGREGADOS] = {d['_id']: {k: copiar_valor(v) for k, v in d.items() if k != '_id'} for d in docs}
+            self._gravar(COLECAO_AGREGADOS)
+
+    def versao_dados(self):
+        with self._lock:
+            return self._colecao(COLECAO_META).get(ID_VERSAO, {}).get('valor', 0)
+
+    def incrementar_versao(self):
+        with self._lock:
+            meta = self._colecao(COLECAO_META)
+            meta[ID_VERSAO] = {'valor': self.versao_dados() + 1}
+            self._gravar(COLECAO_META)
+
+    def garantir_contador(self, nome, minimo):
+        with self._lock:
+            contadores = self._colecao(COLECAO_CONTADORES)
+            contadores[nome] = max(contadores.get(nome, minimo), minimo)
+            self._gravar(COLECAO_CONTADORES)
+
+    def incrementar_contador(self, nome, quantidade, criar=False):
+        with self._lock:
+            contadores = self._colecao(COLECAO_CONTADORES)
+            if nome not in contadores and not criar:
+                return None
+            contadores[nome] = contadores.get(nome, 0) + quantidade
+            self._gravar(COLECAO_CONTADORES)
+            return contadores[nome]
+
+    def ler_meta(self, chave):
+        with self._lock:
+            valores = self._colecao(COLECAO_META).get(chave)
+            return copiar_valor(valores) if valores is not None else None
+
+    def gravar_meta(self, chave, valores):
+        with self._lock:
+            self._colecao(COLECAO_META).setdefault(chave, {}).update(copiar_valor(valores))
+            self._gravar(COLECAO_META)
+
+    def marcas_descoberta(self):
+        with self._lock:
+            return {chave: doc.get('hash') for chave, doc in self._colecao(COLECAO_MARCAS).items()}
+
+    def gravar_marcas_descoberta(self, marcas, data):
+        with self._lock:
+            self._colecao(COLECAO_MARCAS).update({chave: {'hash': valor, 'atualizado_em': data} for chave, valor in marcas.items()})
+            self._gravar(COLECAO_MARCAS)
+
+    def ler_plano(self, chave):
+        with self._lock:
+            plano = self._colecao(COLECAO_PLANOS).get(chave)
+            return dict(plano) if plano is not None else None
+
+    def gravar_plano(self, chave, campos):
+        with self._lock:
+            self._colecao(COLECAO_PLANOS).setdefault(chave, {}).update(campos)
+            self._gravar(COLECAO_PLANOS)
+
+    def reivindicar_plano(self, chave, campos, limite):
+        with self._lock:
+            atual = self._colecao(COLECAO_PLANOS).get(chave)
+            if atual is not None and not (atual.get('status') == 'erro' or (atual.get('status') == 'pendente' and (atual.get('atualizado_em') or 0) < limite)):
+                return False
+            self.gravar_plano(chave, campos)
+            return True
+
+    def ler_taxonomia(self):
+        with self._lock:
+            return copiar_valor(self._colecao(COLECAO_TAXONOMIA))
+
+    def fechar(self):
+        with self._lock:
+            if self._trava is not None:
+                self._trava.close()
+                self._trava = None
+
+    def gravar_taxonomia(self, entradas):
+        with self._lock:
+            self._dados[COLECAO_TAXONOMIA] = [copiar_valor(dict(e)) for e in entradas]
+            self._gravar(COLECAO_TAXONOMIA)
+
+# --- configuração ---
+
+def backend_configurado():
+    """(backend, caminho) de TALENTFLOW_BANCO e TALENTFLOW_BANCO_CAMINHO."""
+    backend = (os.getenv('TALENTFLOW_BANCO') or 'mongo').strip().lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"TALENTFLOW_BANCO inválido: {backend} (use {', '.join(BACKENDS)})")
+    return backend, os.getenv('TALENTFLOW_BANCO_CAMINHO') or None
+
+def abrir(backend, caminho=None, somente_leitura=False):
+    """Repositório local (json ou sqlite); a mesma pasta ou arquivo devolve a mesma instância no processo."""
+    if backend == 'json':
+        caminho = os.path.abspath(caminho or PASTA_PADRAO)
+        if somente_leitura:
+            return RepositorioJSON(caminho, somente_leitura=True)
+        fabrica = RepositorioJSON
+    elif backend == 'sqlite':
+        caminho = caminho if caminho == ':memory:' else os.path.abspath(caminho or ARQUIVO_SQLITE_PADRAO)
+        fabrica = RepositorioSQLite
+    else:
+        raise ValueError(f"Backend local desconhecido: {backend}")
+    with _abertos_lock:
+        repositorio = _abertos.get((backend, caminho))
+        if repositorio is None or caminho == ':memory:':
+            repositorio = _abertos[(backend, caminho)] = fabrica(caminho)
+        return repositorio
+
+def copiar(origem, destino, colecoes=COLECOES_BASE, lote=1000):
+    """Substitui as coleções de `destino` pelas de `origem`; retorna {coleção: documentos copiados}."""
+    copiados = {}
+    for nome in colecoes:
+        docs = origem.listar(nome, lote=lote)
+        destino.limpar(nome)
+        for inicio in range(0, len(docs), lote):
+            destino.inserir(nome, docs[inicio:inicio + lote])
+        copiados[nome] = len(docs)
+    return copiados
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Copia funcionarios, vagas e projetos entre backends de armazenamento.')
+    parser.add_argument('--de', choices=BACKENDS, required=True, help='backend de origem (mongo usa MONGODB_URI/MONGODB_DB)')
+    parser.add_argument('--de-caminho', help='pasta ou arquivo da origem (json/sqlite); uma pasta json de origem é só lida')
+    parser.add_argument('--para', choices=BACKENDS, required=True, help='backend de destino')
+    parser.add_argument('--caminho', help='pasta ou arquivo do destino (json/sqlite)')
+    parser.add_argument('--colecoes', nargs='+', default=list(COLECOES_BASE), choices=COLECOES_BASE)
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    from .db import conectar
+    load_dotenv()
+
+    def obter(backend, caminho, somente_leitura=False):
+        if backend == 'mongo':
+            return conectar(backend='mongo')
+        try:
+            return abrir(backend, caminho, somente_leitura), None
+        except (OSError, RuntimeError) as e:
+            return None, str(e)
+
+    origem, erro = obter(args.de, args.de_caminho, somente_leitura=True)
+    destino, erro_destino = obter(args.para, args.caminho)
+    if origem is None or destino is None:
+        print(f"Erro ao abrir o banco: {erro or erro_destino}")
+        return 1
+    copiados = copiar(origem, destino, args.colecoes)
+    destino.incrementar_versao()
+    print(json.dumps(copiados, ensure_ascii=False))
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,241 @@
+"""
+Benchmark das rotas e do recomendador sobre a massa sintética de app.data.gerador.
+
+Para cada escala o banco é semeado do zero e são medidos:
+- rotas (dashboard, perfil, gráficos, candidatos, API) a frio, logo após
+  invalidar os caches, e a quente, com e sem o cache de páginas;
+- /atualizar_skills (primeira descoberta e rodada incremental) e /upload_usuarios;
+- funções do recomendador e do extrator, chamadas diretamente.
+
+O banco padrão é um SQLite em memória (app.armazenamento), sem dependências
+além da biblioteca padrão; `--banco mongo` mede contra um MongoDB real.
+Os resultados vão para um JSON (com commit e data) que pode ser comparado
+com o de outra versão.
+
+Uso:
+    python -m app.benchmark --escalas p m --saida benchmarks/atual.json
+    python -m app.benchmark --banco mongo --escalas g      # usa MONGODB_URI e MONGODB_DB_BENCH
+    python -m app.benchmark --comparar benchmarks/antes.json benchmarks/atual.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+
+from .data.gerador import gerar_dados, semear, salvar_xlsx
+
+ESCALAS = {
+    'p': (1000, 100, 200),
+    'm': (10000, 1000, 2000),
+    'g': (100000, 5000, 20000),
+}
+
+def cronometrar(funcao, repeticoes=5):
+    """Executa `funcao` `repeticoes` vezes; retorna mínimo, mediana e máximo em ms."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return {
+        'min_ms': round(min(tempos), 3),
+        'mediana_ms': round(statistics.median(tempos), 3),
+        'max_ms': round(max(tempos), 3),
+        'n': repeticoes
+    }
+
+def preparar_banco(db, dados):
+    """Semeia `db` e deixa índices, campos derivados e agregados como em produção."""
+    from . import aggregates, indexes
+    from .recommendation.recommender import SkillMatcher
+    db.limpar('agregados', 'descoberta_projetos', 'meta')
+    semear(db, dados)
+    indexes.garantir_indices(db)
+    indexes.preencher_campos_derivados(db, SkillMatcher(dados['vagas']), todos=True)
+    aggregates.reconstruir(db)
+
+def medir_rotas(app, dados, repeticoes):
+    cliente = app.test_client()
+    id_funcionario = dados['funcionarios'][len(dados['funcionarios']) // 2]['id']
+    id_vaga = dados['vagas'][0]['id']
+    urls = {
+        'dashboard': '/dashboard',
+        'dashboard_filtrado': '/dashboard?busca_habilidade=python&ordem=compat',
+        'perfil': f'/perfil/{id_funcionario}',
+        'graficos': '/graficos',
+        'candidatos': f'/vaga/{id_vaga}/candidatos',
+        'api_funcionarios': '/api/funcionarios',
+    }
+
+    def invalidar():
+        with app.app_context():
+            app.config['CACHE'].invalidar()
+            app.config['RESPOSTAS'].limpar()
+
+    resultados = {}
+    for nome, url in urls.items():
+        def frio():
+            invalidar()
+            cliente.get(url)
+
+        def sem_cache_paginas():
+            app.config['RESPOSTAS'].limpar()
+            cliente.get(url)
+
+        resultados[nome] = {
+            'frio': cronometrar(frio, repeticoes),
+            'renderizacao': cronometrar(sem_cache_paginas, repeticoes),
+            'quente': cronometrar(lambda: cliente.get(url), repeticoes),
+        }
+    return resultados
+
+def medir_escritas(app, db, dados, lote_upload):
+    cliente = app.test_client()
+    db.limpar('descoberta_projetos')
+    resultados = {
+        'atualizar_skills': cronometrar(lambda: cliente.get('/atualizar_skills'), 1),
+        'atualizar_skills_incremental': cronometrar(lambda: cliente.get('/atualizar_skills'), 3),
+    }
+
+    novos = gerar_dados(lote_upload, 0, 0, seed=len(dados['funcionarios']) + 1)['funcionarios']
+    for f in novos:
+        f['email'] = 'bench.' + f['email']
+    arquivo = io.BytesIO()
+    salvar_xlsx(novos, arquivo)
+    conteudo = arquivo.getvalue()
+
+    def upload():
+        cliente.post('/upload_usuarios', data={'arquivo': (io.BytesIO(conteudo), 'bench.xlsx')}, content_type='multipart/form-data')
+
+    resultados['upload_usuarios'] = cronometrar(upload, 1)
+    resultados['upload_usuarios']['linhas'] = lote_upload
+    return resultados
+
+def medir_recomendador(dados, repeticoes):
+    from .recommendation.recommender import SkillMatcher, IndiceCandidatos
+    from .nlp.extractor import obter_extrator
+    funcionarios = dados['funcionarios']
+    vagas = dados['vagas']
+    amostra = funcionarios[:200]
+    matcher = SkillMatcher(vagas)
+    indice = IndiceCandidatos(funcionarios)
+    extrator = obter_extrator()
+    tarefas = [t.get('descricao', '') for p in dados['projetos'] for t in p.get('tarefas', [])]
+
+    return {
+        'skill_matcher_construcao': cronometrar(lambda: SkillMatcher(vagas), repeticoes),
+        'recomendar_200_funcionarios': cronometrar(lambda: [matcher.recomendar(f) for f in amostra], repeticoes),
+        'melhores_em_lote': cronometrar(lambda: matcher.melhores_em_lote(funcionarios), repeticoes),
+        'resumo_em_lote': cronometrar(lambda: matcher.resumo_em_lote(funcionarios), repeticoes),
+        'indice_candidatos_construcao': cronometrar(lambda: IndiceCandidatos(funcionarios), repeticoes),
+        'candidatos_50_vagas': cronometrar(lambda: [indice.candidatos(v, k=10, limiar=30) for v in vagas[:50]], repeticoes),
+        'extrair_tarefas': cronometrar(lambda: extrator.extrair_lote(tarefas), repeticoes),
+    }
+
+def executar(escalas, obter_banco, repeticoes=5, seed=42):
+    """Roda o benchmark nas escalas pedidas; obter_banco() devolve um banco vazio e descartável."""
+    from . import create_app
+    from .db import Conexao
+
+    resultado = {
+        'commit': versao_codigo(),
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'escalas': {}
+    }
+    for nome in escalas:
+        n_func, n_vagas, n_proj = ESCALAS[nome]
+        inicio = time.perf_counter()
+        dados = gerar_dados(n_func, n_vagas, n_proj, seed)
+        db = obter_banco()
+        preparar_banco(db, dados)
+        preparo = time.perf_counter() - inicio
+
+        app = create_app(Conexao.de_banco(db))
+        app.config['PRONTO'].wait()
+        resultado['escalas'][nome] = {
+            'tamanho': {'funcionarios': n_func, 'vagas': n_vagas, 'projetos': n_proj},
+            'preparo_s': round(preparo, 3),
+            'recomendador': medir_recomendador(dados, repeticoes),
+            'rotas': medir_rotas(app, dados, repeticoes),
+            'escritas': medir_escritas(app, db, dados, min(1000, max(n_func // 10, 1))),
+        }
+        print(f"escala {nome}: ok ({preparo:.1f}s de preparo)")
+    return resultado
+
+def versao_codigo():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+def _medianas(resultado, prefixo=''):
+    """Achata o resultado em {caminho: mediana_ms}."""
+    saida = {}
+    for chave, valor in resultado.items():
+        if not isinstance(valor, dict):
+            continue
+        caminho = f"{prefixo}{chave}"
+        if 'mediana_ms' in valor:
+            saida[caminho] = valor['mediana_ms']
+        else:
+            saida.update(_medianas(valor, caminho + '.'))
+    return saida
+
+def comparar(antes, depois):
+    """Linhas (métrica, antes_ms, depois_ms, razão) para as métricas presentes nos dois resultados."""
+    a = _medianas(antes['escalas'])
+    d = _medianas(depois['escalas'])
+    linhas = []
+    for chave in a:
+        if chave in d:
+            razao = d[chave] / a[chave] if a[chave] else None
+            linhas.append((chave, a[chave], d[chave], razao))
+    return linhas
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark das rotas e do recomendador do TalentFlow.')
+    parser.add_argument('--escalas', nargs='+', default=['p'], choices=sorted(ESCALAS))
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--banco', choices=['sqlite', 'mongo'], default='sqlite', help='sqlite: SQLite em memória, novo a cada escala; mongo: MONGODB_URI com MONGODB_DB_BENCH')
+    parser.add_argument('--saida', default=None, help='arquivo JSON de resultados (padrão: benchmarks/<commit>.json)')
+    parser.add_argument('--comparar', nargs=2, metavar=('ANTES', 'DEPOIS'))
+    args = parser.parse_args(argv)
+
+    if args.comparar:
+        with open(args.comparar[0], encoding='utf-8') as f:
+            antes = json.load(f)
+        with open(args.comparar[1], encoding='utf-8') as f:
+            depois = json.load(f)
+        for chave, a, d, razao in comparar(antes, depois):
+            print(f"{chave:70s} {a:12.3f} {d:12.3f}  {'x%.2f' % razao if razao else '-'}")
+        return 0
+
+    if args.banco == 'mongo':
+        from dotenv import load_dotenv
+        from .db import conectar
+        load_dotenv()
+        db, erro = conectar(db_name=os.getenv('MONGODB_DB_BENCH', 'talentflow_bench'), backend='mongo')
+        if db is None:
+            print(f"Erro de conexão com MongoDB: {erro}")
+            return 1
+        obter_banco = lambda: db
+    else:
+        from .armazenamento import abrir
+        obter_banco = lambda: abrir('sqlite', ':memory:')
+
+    resultado = executar(args.escalas, obter_banco, args.repeticoes)
+    saida = args.saida or os.path.join('benchmarks', f"{resultado['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(saida) or '.', exist_ok=True)
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, indent=4, ensure_ascii=False)
+    print(saida)
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,167 @@
+"""
+Índice de trigramas para a busca de habilidades do dashboard.
+
+O vocabulário de skills (chaves canônicas) é indexado por trigramas da forma
+dobrada (sem caixa, acentos e separadores). Um termo de busca é resolvido
+primeiro contra o vocabulário — por substring, usando a interseção das listas
+de trigramas para chegar aos candidatos, e, se nada casar, por similaridade de
+trigramas (tolera erros de digitação: "pyton" -> "python"). As skills
+resolvidas levam aos funcionários pelas listas de postagem skill -> ids;
+termos separados por vírgula são combinados por interseção.
+
+O índice é do processo e é sincronizado incrementalmente a cada snapshot: só
+os funcionários cujas skills mudaram tocam as listas de postagem.
+"""
+import threading
+from collections import Counter
+
+from .nlp.taxonomia import dobrar_skill, obter_taxonomia
+
+SIMILARIDADE_MINIMA = 0.45
+MAX_APROXIMADAS = 5
+
+def trigramas(texto, bordas=True):
+    """Trigramas de `texto` já dobrado; com `bordas`, o início e o fim da palavra também contam."""
+    if bordas:
+        texto = f"  {texto} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+def termos_busca(busca):
+    """Termos da busca (separados por vírgula), dobrados e sem vazios."""
+    return [t for t in (dobrar_skill(parte) for parte in (busca or '').split(',')) if t]
+
+class IndiceBusca:
+    """Trigramas do vocabulário de skills e listas de postagem skill -> ids de funcionários."""
+
+    def __init__(self):
+        self._trigramas = {}
+        self._dobradas = {}
+        self._tamanhos = {}
+        self._postagens = {}
+        self._skills = {}
+        self._lock = threading.Lock()
+        self.alteracoes = 0
+
+    def _indexar_skill(self, chave):
+        if chave in self._dobradas:
+            return
+        dobrada = dobrar_skill(chave)
+        self._dobradas[chave] = dobrada
+        proprios = trigramas(dobrada)
+        self._tamanhos[chave] = len(proprios)
+        for trigrama in proprios:
+            self._trigramas.setdefault(trigrama, set()).add(chave)
+
+    def atualizar(self, skills_por_funcionario):
+        """
+        Sincroniza as postagens com `skills_por_funcionario` (id -> conjunto de
+        chaves). Só funcionários novos, removidos ou com skills diferentes são tocados.
+        """
+        with self._lock:
+            for id_funcionario, skills in skills_por_funcionario.items():
+                anteriores = self._skills.get(id_funcionario)
+                if anteriores == skills:
+                    continue
+                anteriores = anteriores or frozenset()
+                for chave in anteriores - skills:
+                    self._postagens[chave].discard(id_funcionario)
+                for chave in skills - anteriores:
+                    self._indexar_skill(chave)
+                    self._postagens.setdefault(chave, set()).add(id_funcionario)
+                self._skills[id_funcionario] = skills
+                self.alteracoes += 1
+            for id_funcionario in set(self._skills) - set(skills_por_funcionario):
+                for chave in self._skills.pop(id_funcionario):
+                    self._postagens[chave].discard(id_funcionario)
+                self.alteracoes += 1
+        return self
+
+    def _vocabulario(self):
+        return [k for k, ids in self._postagens.items() if ids]
+
+    def _por_substring(self, termo):
+        if len(termo) < 3:
+            candidatas = self._vocabulario()
+        else:
+            listas = sorted((self._trigramas.get(t, set()) for t in trigramas(termo, bordas=False)), key=len)
+            candidatas = set.intersection(*listas) if listas else set()
+        return [k for k in candidatas if self._postagens.get(k) and termo in self._dobradas[k]]
+
+    def _similares(self, termo):
+        """Skills com pontuação de Dice sobre os trigramas (com bordas) >= SIMILARIDADE_MINIMA, melhores primeiro."""
+        consulta = trigramas(termo)
+        comuns = Counter()
+        for trigrama in consulta:
+            comuns.update(self._trigramas.get(trigrama, ()))
+        pontuadas = []
+        for chave, n in comuns.items():
+            if not self._postagens.get(chave):
+                continue
+            pontuacao = 2 * n / (len(consulta) + self._tamanhos[chave])
+            if pontuacao >= SIMILARIDADE_MINIMA:
+                pontuadas.append((chave, pontuacao))
+        pontuadas.sort(key=lambda p: (-p[1], -len(self._postagens[p[0]]), p[0]))
+        return pontuadas
+
+    def resolver_termo(self, termo):
+        """
+        Chaves do vocabulário para um termo dobrado: as que o contêm (mais o
+        alias da taxonomia) ou, se nenhuma, as mais parecidas.
+        """
+        with self._lock:
+            chaves = self._por_substring(termo)
+            alias = obter_taxonomia().normalizar(termo)
+            if self._postagens.get(alias) and alias not in chaves:
+                chaves.append(alias)
+            if not chaves:
+                chaves = [k for k, _ in self._similares(termo)[:MAX_APROXIMADAS]]
+            return chaves
+
+    def resolver(self, busca):
+        """Uma lista de chaves por termo da busca."""
+        return [self.resolver_termo(termo) for termo in termos_busca(busca)]
+
+    def funcionarios(self, busca):
+        """Ids dos funcionários que têm, para cada termo, alguma das skills resolvidas."""
+        grupos = self.resolver(busca)
+        if not grupos:
+            return set()
+        with self._lock:
+            conjuntos = [set().union(*(self._postagens.get(k, ()) for k in chaves)) for chaves in grupos]
+        conjuntos.sort(key=len)
+        return set.intersection(*conjuntos)
+
+    def sugerir(self, termo, limite=10):
+        """
+        Skills para a busca enquanto se digita, ordenadas: exata, prefixo,
+        substring e depois por similaridade; cada uma com o número de funcionários.
+        """
+        termo = dobrar_skill(termo)
+        if not termo:
+            return []
+        with self._lock:
+            pontuadas = dict(self._similares(termo))
+            consulta = trigramas(termo)
+            for chave in self._por_substring(termo):
+                if chave not in pontuadas:
+                    pontuadas[chave] = 2 * len(consulta & trigramas(self._dobradas[chave])) / (len(consulta) + self._tamanhos[chave])
+            alias = obter_taxonomia().normalizar(termo)
+            if self._postagens.get(alias):
+                pontuadas[alias] = 1.0
+
+            def ordem(item):
+                chave, pontuacao = item
+                dobrada = self._dobradas[chave]
+                return (dobrada != termo and chave != alias, not dobrada.startswith(termo), termo not in dobrada, -pontuacao, -len(self._postagens[chave]), chave)
+
+            melhores = sorted(pontuadas.items(), key=ordem)[:limite]
+            return [{'chave': chave, 'pontuacao': round(pontuacao, 3), 'funcionarios': len(self._postagens[chave])} for chave, pontuacao in melhores]
+
+    def estatisticas(self):
+        with self._lock:
+            return {
+                'skills': len(self._vocabulario()),
+                'trigramas': len(self._trigramas),
+                'funcionarios': len(self._skills),
+                'alteracoes': self.alteracoes
+            }
@@ -0,0 +1,299 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .recommendation.recommender import SkillMatcher, IndiceCandidatos
+from .coverage import skills_funcionario
+from .leitura import ler_colecoes
+from .registros import Funcionario, Vaga, Projeto
+
+def incrementar_versao(db):
+    """
+    Avança a versão dos dados em `meta`: snapshots, páginas em cache, ETags da
+    API e índices em disco de todos os workers deixam de valer na próxima
+    verificação. Toda escrita feita fora das rotas (CLIs, migrações) deve
+    chamá-la depois de gravar.
+    """
+    db.incrementar_versao()
+
+class Snapshot:
+    """
+    Cópia em memória de funcionarios, vagas e projetos numa dada versão dos dados.
+
+    É compartilhada entre requisições: os documentos são registros somente
+    leitura (app.registros) e as rotas não devem alterar as listas. Estruturas
+    derivadas (matcher, índice de candidatos) são construídas uma vez por
+    snapshot, sob demanda.
+    """
+
+    def __init__(self, funcionarios, vagas, projetos, versao=None, pasta_indices=None):
+        self.funcionarios = funcionarios
+        self.vagas = vagas
+        self.projetos = projetos
+        self.versao = versao
+        self.pasta_indices = pasta_indices
+        self.origem_candidatos = None
+        self.origem_matcher = None
+        self.criado_em = time.monotonic()
+        self._derivados = {}
+        self._lock = threading.RLock()
+
+    def derivado(self, nome, fabrica):
+        with self._lock:
+            if nome not in self._derivados:
+                self._derivados[nome] = fabrica()
+            return self._derivados[nome]
+
+    @property
+    def matcher(self):
+        return self.derivado('matcher', self._montar_matcher)
+
+    @property
+    def candidatos(self):
+        return self.derivado('candidatos', self._montar_candidatos)
+
+    def _montar_matcher(self):
+        """Com `pasta_indices`, lê as skills normalizadas das vagas do disco (gravadas junto do índice de candidatos)."""
+        if self.pasta_indices and self.versao is not None:
+            from . import indice_disco
+            matcher = indice_disco.carregar_matcher(self.pasta_indices, self.vagas, self.versao)
+            if matcher is not None:
+                self.origem_matcher = 'disco'
+                return matcher
+        self.origem_matcher = 'construido'
+        return SkillMatcher(self.vagas)
+
+    def _montar_candidatos(self):
+        """Com `pasta_indices`, lê o índice do disco (ou o constrói e grava, com o matcher, para os próximos workers)."""
+        if not self.pasta_indices or self.versao is None:
+            self.origem_candidatos = 'construido'
+            return IndiceCandidatos(self.funcionarios)
+        from . import indice_disco
+        indice = indice_disco.carregar(self.pasta_indices, self.funcionarios, self.versao)
+        if indice is not None:
+            self.origem_candidatos = 'disco'
+            return indice
+        indice = IndiceCandidatos(self.funcionarios)
+        self.origem_candidatos = 'construido'
+        try:
+            indice_disco.salvar(self.pasta_indices, indice, self.versao, self.matcher)
+        except OSError:
+            pass
+        return indice
+
+    @property
+    def skills_por_funcionario(self):
+        return self.derivado('skills_por_funcionario', lambda: {f.get('id'): f.skills if isinstance(f, Funcionario) else skills_funcionario(f) for f in self.funcionarios})
+
+    def funcionario(self, id):
+        mapa = self.derivado('mapa_funcionarios', self._mapear_funcionarios)
+        return mapa.get(id)
+
+    def _mapear_funcionarios(self):
+        mapa = {}
+        for f in self.funcionarios:
+            mapa.setdefault(f.get('id'), f)
+        return mapa
+
+    def vaga(self, id):
+        mapa = self.derivado('mapa_vagas', self._mapear_vagas)
+        return mapa.get(id)
+
+    def _mapear_vagas(self):
+        mapa = {}
+        for v in self.vagas:
+            mapa.setdefault(v.get('id'), v)
+        return mapa
+
+class SnapshotCache:
+    """
+    Cache de processo para os dados lidos pelas rotas.
+
+    A coerência entre workers usa um contador em `meta` ({'_id': 'versao_dados'}):
+    toda escrita o incrementa via `invalidar`. Dentro de `intervalo_versao`
+    segundos o snapshot é servido sem ir ao MongoDB; depois disso uma leitura
+    do contador decide se ele ainda vale. Após `ttl` segundos o snapshot é
+    recarregado de qualquer forma. As três coleções são lidas em paralelo
+    (app.leitura) e o tempo de cada uma fica em `estatisticas()['carga_ms']`.
+    """
+
+    def __init__(self, ttl=300, intervalo_versao=2, pasta_indices=None):
+        self.ttl = ttl
+        self.intervalo_versao = intervalo_versao
+        self.pasta_indices = pasta_indices
+        self._snapshot = None
+        self._verificado_em = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.verificacoes_versao = 0
+        self.invalidacoes = 0
+        self.tempos_carga = {}
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            ttl=float(os.getenv('TALENTFLOW_CACHE_TTL', 300)),
+            intervalo_versao=float(os.getenv('TALENTFLOW_CACHE_VERSAO_INTERVALO', 2)),
+            pasta_indices=os.getenv('TALENTFLOW_INDICE_DIR') or None
+        )
+
+    def _ler_versao(self, db):
+        self.verificacoes_versao += 1
+        return db.versao_dados()
+
+    def obter(self, db):
+        with self._lock:
+            agora = time.monotonic()
+            snapshot = self._snapshot
+            versao = None
+            if snapshot is not None and agora - snapshot.criado_em < self.ttl:
+                if agora - self._verificado_em < self.intervalo_versao:
+                    self.hits += 1
+                    return snapshot
+                versao = self._ler_versao(db)
+                self._verificado_em = agora
+                if versao == snapshot.versao:
+                    self.hits += 1
+                    return snapshot
+
+            self.misses += 1
+            if versao is None:
+                versao = self._ler_versao(db)
+            colecoes, tempos = ler_colecoes(db, {
+                'funcionarios': Funcionario.campos(),
+                'vagas': Vaga.campos(),
+                'projetos': Projeto.campos(),
+            })
+            snapshot = Snapshot(
+                [Funcionario.de_documento(d) for d in colecoes['funcionarios']],
+                [Vaga.de_documento(d) for d in colecoes['vagas']],
+                [Projeto.de_documento(d) for d in colecoes['projetos']],
+                versao,
+                self.pasta_indices
+            )
+            self.tempos_carga = {nome: round(t * 1000, 2) for nome, t in tempos.items()}
+            self._snapshot = snapshot
+            self._verificado_em = time.monotonic()
+            return snapshot
+
+    def invalidar(self, db=None):
+        """Descarta o snapshot local e, com `db`, avisa os outros workers."""
+        with self._lock:
+            self._snapshot = None
+            self.invalidacoes += 1
+        if db is not None:
+            incrementar_versao(db)
+
+    def estatisticas(self):
+        snapshot = self._snapshot
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+            'verificacoes_versao': self.verificacoes_versao,
+            'invalidacoes': self.invalidacoes,
+            'versao': snapshot.versao if snapshot else None,
+            'idade_s': round(time.monotonic() - snapshot.criado_em, 3) if snapshot else None,
+            'ttl_s': self.ttl,
+            'intervalo_versao_s': self.intervalo_versao,
+            'indice_candidatos': snapshot.origem_candidatos if snapshot else None,
+            'matcher': snapshot.origem_matcher if snapshot else None,
+            'carga_ms': self.tempos_carga
+        }
+
+class CacheRespostas:
+    """
+    Cache LRU de páginas renderizadas, limitado por número de entradas e bytes.
+
+    A chave inclui a versão dos dados, então uma escrita em qualquer worker
+    torna as entradas antigas inalcançáveis; `limpar` as descarta de vez no
+    worker que fez a escrita. Requisições simultâneas pela mesma chave esperam
+    a primeira renderização em vez de renderizar de novo.
+    """
+
+    def __init__(self, max_entradas=256, max_bytes=32 * 1024 * 1024):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._entradas = OrderedDict()
+        self._em_andamento = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.limpezas = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_entradas=int(os.getenv('TALENTFLOW_RESPOSTAS_MAX', 256)),
+            max_bytes=int(os.getenv('TALENTFLOW_RESPOSTAS_MAX_BYTES', 32 * 1024 * 1024))
+        )
+
+    def obter_ou_gerar(self, chave, gerar):
+        """
+        Corpo em cache para `chave` ou o resultado de gerar(), que deve devolver
+        (corpo, armazenar). Só corpos com armazenar verdadeiro entram no cache.
+        """
+        while True:
+            with self._lock:
+                corpo = self._entradas.get(chave)
+                if corpo is not None:
+                    self._entradas.move_to_end(chave)
+                    self.hits += 1
+                    return corpo
+                evento = self._em_andamento.get(chave)
+                if evento is None:
+                    self.misses += 1
+                    evento = self._em_andamento[chave] = threading.Event()
+                    break
+            evento.wait()
+
+        try:
+            corpo, armazenar = gerar()
+            if armazenar:
+                self._guardar(chave, corpo)
+            return corpo
+        finally:
+            with self._lock:
+                self._em_andamento.pop(chave, None)
+            evento.set()
+
+    def _guardar(self, chave, corpo):
+        tamanho = len(corpo)
+        if tamanho > self.max_bytes:
+            return
+        with self._lock:
+            anterior = self._entradas.pop(chave, None)
+            if anterior is not None:
+                self._bytes -= len(anterior)
+            self._entradas[chave] = corpo
+            self._bytes += tamanho
+            while len(self._entradas) > self.max_entradas or self._bytes > self.max_bytes:
+                _, removido = self._entradas.popitem(last=False)
+                self._bytes -= len(removido)
+                self.evictions += 1
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+            self.limpezas += 1
+
+    def estatisticas(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+                'entradas': len(self._entradas),
+                'bytes': self._bytes,
+                'max_entradas': self.max_entradas,
+                'max_bytes': self.max_bytes,
+                'evictions': self.evictions,
+                'limpezas': self.limpezas
+            }
@@ -0,0 +1,101 @@
+import hashlib
+import threading
+
+from .nlp.extractor import obter_extrator, normalizar_skill
+
+def skills_funcionario(funcionario):
+    """Conjunto de skills normalizadas (declaradas + descobertas) de um funcionário."""
+    decl = {normalizar_skill(x) for x in funcionario.get('habilidades_declaradas', [])}
+    desc = {normalizar_skill(x.get('skill')) for x in funcionario.get('habilidades_descobertas', [])}
+    return frozenset(decl | desc)
+
+def _hash_tarefas(projeto):
+    texto = '\x1f'.join(t.get('descricao', '') or '' for t in projeto.get('tarefas', []))
+    return hashlib.sha1(texto.encode('utf-8')).hexdigest()
+
+class IndiceCobertura:
+    """
+    Índice de cobertura de skills por projeto.
+
+    Para cada projeto guarda as skills extraídas das tarefas e, por skill,
+    quantos participantes a possuem. Em `atualizar`, a extração só roda de novo
+    se as tarefas mudaram, e a cobertura só é recontada se as tarefas, a lista
+    de participantes ou as skills de algum participante mudaram.
+
+    As entradas são indexadas por (id_projeto, ocorrência): projetos com o
+    mesmo id, ou sem id, ficam em entradas separadas, na ordem da lista.
+    """
+
+    def __init__(self, extrator=None):
+        self.extrator = extrator or obter_extrator()
+        self._projetos = {}
+        self._ordem = []
+        self._lock = threading.Lock()
+        self.recalculos = 0
+        self.extracoes = 0
+
+    def atualizar(self, projetos, skills_por_funcionario):
+        """
+        Sincroniza o índice com a lista de projetos. `skills_por_funcionario`
+        mapeia id do funcionário -> conjunto de skills normalizadas.
+        """
+        with self._lock:
+            vistos = []
+            ocorrencias = {}
+            for proj in projetos:
+                id_projeto = proj.get('id_projeto')
+                chave = (id_projeto, ocorrencias.get(id_projeto, 0))
+                ocorrencias[id_projeto] = chave[1] + 1
+                vistos.append(chave)
+                participantes = tuple(proj.get('participantes', []))
+                skills_participantes = tuple(skills_por_funcionario.get(pid) for pid in participantes)
+                hash_tarefas = _hash_tarefas(proj)
+                atual = self._projetos.get(chave)
+                if atual is not None and atual['hash_tarefas'] == hash_tarefas:
+                    if atual['participantes'] == participantes and atual['skills_participantes'] == skills_participantes:
+                        atual['nome'] = proj.get('nome_projeto')
+                        continue
+                    skills_req = atual['skills']
+                else:
+                    self.extracoes += 1
+                    skills_req = set()
+                    for encontrados in self.extrator.extrair_lote(t.get('descricao', '') for t in proj.get('tarefas', [])):
+                        skills_req.update(encontrados)
+                    skills_req = sorted(skills_req)
+                self.recalculos += 1
+                self._projetos[chave] = {
+                    'id_projeto': id_projeto,
+                    'nome': proj.get('nome_projeto'),
+                    'hash_tarefas': hash_tarefas,
+                    'participantes': participantes,
+                    'skills_participantes': skills_participantes,
+                    'skills': skills_req,
+                    'tem': {s: sum(1 for sp in skills_participantes if sp is not None and s in sp) for s in skills_req}
+                }
+            for chave in set(self._projetos) - set(vistos):
+                del self._projetos[chave]
+            self._ordem = vistos
+            return self.resultado()
+
+    def resultado(self):
+        """Cobertura por projeto, na ordem dos projetos: percentuais por skill e média."""
+        saida = []
+        for chave in self._ordem:
+            entrada = self._projetos.get(chave)
+            if entrada is None:
+                continue
+            total = len(entrada['participantes']) or 1
+            cobertura = [
+                {"skill": s.capitalize(), "percent": round((entrada['tem'][s] / total) * 100)}
+                for s in entrada['skills']
+            ]
+            media = None
+            if entrada['skills']:
+                media = round(sum((entrada['tem'][s] / total) * 100 for s in entrada['skills']) / len(entrada['skills']))
+            saida.append({
+                "id_projeto": entrada['id_projeto'],
+                "nome": entrada['nome'],
+                "cobertura": cobertura,
+                "media": media
+            })
+        return saida
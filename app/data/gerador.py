@@ -0,0 +1,251 @@
+"""
+Gerador de massa de dados sintética (funcionarios, vagas e projetos com
+tarefas) em escala configurável, para reproduzir o volume de produção.
+
+As skills seguem uma distribuição de Zipf sobre um vocabulário com as skills
+conhecidas do extrator, skills comuns de mercado e uma cauda longa de
+ferramentas; cada cargo concentra algumas skills típicas. A mesma semente
+gera sempre os mesmos dados.
+
+Uso:
+    python -m app.data.gerador --funcionarios 100000 --vagas 5000 --projetos 20000 --json --xlsx
+    python -m app.data.gerador --funcionarios 5000 --mongo      # substitui MONGODB_URI/MONGODB_DB_BENCH
+    python -m app.data.gerador --mongo --banco talentflow --sim-apagar   # o banco da aplicação, se for mesmo a intenção
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import unicodedata
+
+from ..nlp.taxonomia import obter_taxonomia
+
+SKILLS_MERCADO = [
+    "JavaScript", "TypeScript", "React", "Node.js", "MongoDB", "PostgreSQL", "AWS", "Azure",
+    "Terraform", "Kubernetes", "CI/CD", "Git", "Linux", "Scikit-learn", "Machine Learning",
+    "Tableau", "Scrum", "Kanban", "Negociação", "Inglês", "Espanhol", "Atendimento ao Cliente",
+    "Compras", "Planejamento", "Orçamento", "Auditoria", "Tributário", "Recrutamento",
+    "Go", "C#", ".NET", "PHP", "Angular", "Vue", "CSS", "HTML", "Airflow", "Spark",
+]
+
+CARGOS = {
+    "Analista de Dados": ["Python", "SQL", "Power BI", "Pandas", "Excel"],
+    "Cientista de Dados": ["Python", "Pandas", "Scikit-learn", "Machine Learning", "SQL"],
+    "Desenvolvedor Back-end": ["Java", "Spring", "API", "REST", "Docker", "Microserviços"],
+    "Desenvolvedor Python": ["Python", "Flask", "Django", "API", "REST"],
+    "Desenvolvedora Front-end": ["React", "TypeScript", "CSS", "HTML", "JavaScript"],
+    "Engenheiro DevOps": ["AWS", "Terraform", "Docker", "Kubernetes", "CI/CD"],
+    "Analista Financeiro": ["Análise Financeira", "Contabilidade", "Excel", "Orçamento"],
+    "Analista de Logística": ["Logística", "Gestão de Estoque", "Transporte", "SAP", "Supply Chain Management"],
+    "Gerente de Projetos": ["Gestão de Projetos", "Liderança", "Comunicação", "Scrum"],
+    "Analista de RH": ["Recrutamento", "Comunicação", "Excel"],
+}
+
+AREAS = {
+    "Tecnologia": ["Analista de Dados", "Cientista de Dados", "Desenvolvedor Back-end", "Desenvolvedor Python", "Desenvolvedora Front-end", "Engenheiro DevOps"],
+    "Finanças": ["Analista Financeiro"],
+    "Operações": ["Analista de Logística"],
+    "Gestão": ["Gerente de Projetos"],
+    "Pessoas": ["Analista de RH"],
+}
+
+NIVEIS = ["", "", "", " (básico)", " (intermediário)", " (avançado)"]
+
+NOMES = ["Ana", "Bruno", "Carla", "Diego", "Eduarda", "Felipe", "Gabriela", "Heitor", "Isabela", "João",
+         "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael", "Sofia", "Tiago", "Vanessa", "Yuri"]
+SOBRENOMES = ["Souza", "Lima", "Mendes", "Alves", "Nunes", "Costa", "Pereira", "Oliveira", "Santos", "Rocha",
+              "Ferreira", "Gomes", "Ribeiro", "Carvalho", "Martins", "Barbosa", "Araújo", "Melo", "Cardoso", "Teixeira"]
+
+TAREFAS = [
+    "Implementar {0} no módulo de {1}",
+    "Revisar o uso de {0} e {1} na integração",
+    "Treinamento interno de {0}",
+    "Migrar relatórios para {0}; documentar {1}",
+    "Apoiar a equipe em {0}, {1} e {2}",
+    "Levantamento de requisitos com foco em {0}",
+]
+
+def vocabulario(tamanho_cauda=400):
+    """Skills na ordem de popularidade: conhecidas e de mercado primeiro, depois a cauda longa."""
+    vistos = set()
+    skills = []
+    taxonomia = obter_taxonomia()
+    conhecidas = (taxonomia.nome(chave) for chave in taxonomia.conhecidas)
+    for s in itertools.chain(conhecidas, SKILLS_MERCADO):
+        if s.lower() not in vistos:
+            vistos.add(s.lower())
+            skills.append(s)
+    skills.extend(f"Ferramenta {i:03d}" for i in range(1, tamanho_cauda + 1))
+    return skills
+
+def pesos_zipf(n, expoente=1.1):
+    """Pesos acumulados de Zipf para random.choices(cum_weights=...)."""
+    return list(itertools.accumulate(1.0 / (r ** expoente) for r in range(1, n + 1)))
+
+def sem_acentos(texto):
+    return ''.join(c for c in unicodedata.normalize('NFKD', texto) if not unicodedata.combining(c))
+
+def _variar(rnd, skill):
+    """Grafias diferentes da mesma skill, como aparecem em dados digitados à mão."""
+    skill = skill + rnd.choice(NIVEIS)
+    sorteio = rnd.random()
+    if sorteio < 0.05:
+        return skill.upper()
+    if sorteio < 0.15:
+        return skill.lower()
+    return skill
+
+def _sortear_skills(rnd, skills, pesos, quantidade, base=()):
+    escolhidas = list(base)
+    vistas = {s.lower() for s in escolhidas}
+    tentativas = 0
+    while len(escolhidas) < quantidade and tentativas < quantidade * 4:
+        tentativas += 1
+        s = rnd.choices(skills, cum_weights=pesos)[0]
+        if s.lower() not in vistas:
+            vistas.add(s.lower())
+            escolhidas.append(s)
+    return escolhidas
+
+def gerar_funcionarios(n, rnd, skills, pesos):
+    cargos = list(CARGOS)
+    for i in range(1, n + 1):
+        cargo = rnd.choice(cargos)
+        nucleo = rnd.sample(CARGOS[cargo], rnd.randint(1, min(4, len(CARGOS[cargo]))))
+        declaradas = _sortear_skills(rnd, skills, pesos, len(nucleo) + rnd.randint(0, 4), nucleo)
+        nome = f"{rnd.choice(NOMES)} {rnd.choice(SOBRENOMES)}"
+        yield {
+            'id': i,
+            'nome': nome,
+            'cargo': cargo,
+            'email': f"{nome.lower().replace(' ', '.')}.{i}@example.com",
+            'habilidades_declaradas': [_variar(rnd, s) for s in declaradas],
+            'habilidades_descobertas': []
+        }
+
+def gerar_vagas(n, rnd, skills, pesos):
+    areas = list(AREAS)
+    for i in range(1, n + 1):
+        area = rnd.choice(areas)
+        cargo = rnd.choice(AREAS[area])
+        nucleo = rnd.sample(CARGOS[cargo], rnd.randint(1, min(3, len(CARGOS[cargo]))))
+        yield {
+            'id': i,
+            'titulo': f"{cargo} {rnd.choice(['Jr', 'Pleno', 'Sênior'])} #{i}",
+            'area': area,
+            'habilidades_requeridas': _sortear_skills(rnd, skills, pesos, len(nucleo) + rnd.randint(1, 5), nucleo)
+        }
+
+def gerar_projetos(n, rnd, total_funcionarios):
+    conhecidas = obter_taxonomia().conhecidas
+    for i in range(1, n + 1):
+        tarefas = []
+        for _ in range(rnd.randint(2, 6)):
+            modelo = rnd.choice(TAREFAS)
+            termos = rnd.sample(conhecidas, 3)
+            if rnd.random() < 0.2:
+                termos = [sem_acentos(t) for t in termos]
+            tarefas.append({'descricao': modelo.format(*termos)})
+        participantes = rnd.sample(range(1, total_funcionarios + 1), min(rnd.randint(3, 12), total_funcionarios)) if total_funcionarios else []
+        yield {
+            'id_projeto': i,
+            'nome_projeto': f"Projeto {i:05d}",
+            'participantes': participantes,
+            'tarefas': tarefas
+        }
+
+def gerar_dados(funcionarios=1000, vagas=100, projetos=200, seed=42):
+    """Gera {'funcionarios', 'vagas', 'projetos'} (listas) de forma determinística pela semente."""
+    rnd = random.Random(seed)
+    skills = vocabulario()
+    pesos = pesos_zipf(len(skills))
+    return {
+        'funcionarios': list(gerar_funcionarios(funcionarios, rnd, skills, pesos)),
+        'vagas': list(gerar_vagas(vagas, rnd, skills, pesos)),
+        'projetos': list(gerar_projetos(projetos, rnd, funcionarios)),
+    }
+
+def salvar_json(dados, pasta):
+    """Grava funcionarios.json, vagas.json e projetos.json em `pasta`; retorna os caminhos."""
+    os.makedirs(pasta, exist_ok=True)
+    caminhos = []
+    for nome, docs in dados.items():
+        caminho = os.path.join(pasta, f"{nome}.json")
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump(docs, f, ensure_ascii=False)
+        caminhos.append(caminho)
+    return caminhos
+
+def salvar_xlsx(funcionarios, caminho):
+    """Planilha no formato aceito por /upload_usuarios (aba Funcionarios), em modo streaming. `caminho` pode ser um arquivo aberto."""
+    from openpyxl import Workbook
+    if isinstance(caminho, str):
+        os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Funcionarios')
+    ws.append(['id', 'nome', 'cargo', 'email', 'habilidades_declaradas'])
+    for f in funcionarios:
+        ws.append([None, f['nome'], f['cargo'], f['email'], ', '.join(f['habilidades_declaradas'])])
+    wb.save(caminho)
+    return caminho
+
+def semear(db, dados, limpar=True, lote=5000):
+    """Grava os dados no repositório `db` (MongoDB, json ou sqlite), em lotes."""
+    for nome, docs in dados.items():
+        if limpar:
+            db.limpar(nome)
+        for inicio in range(0, len(docs), lote):
+            db.inserir(nome, docs[inicio:inicio + lote])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Gera massa de dados sintética do TalentFlow.')
+    parser.add_argument('--funcionarios', type=int, default=1000)
+    parser.add_argument('--vagas', type=int, default=100)
+    parser.add_argument('--projetos', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--saida', default=os.path.join('app', 'data', 'sintetico'), help='pasta dos arquivos gerados')
+    parser.add_argument('--json', action='store_true', help='grava funcionarios/vagas/projetos em JSON')
+    parser.add_argument('--xlsx', action='store_true', help='grava funcionarios.xlsx no formato do upload')
+    parser.add_argument('--mongo', action='store_true', help='substitui as coleções do banco --banco pelos dados gerados')
+    parser.add_argument('--banco', help='banco do MongoDB apagado por --mongo (padrão: MONGODB_DB_BENCH)')
+    parser.add_argument('--sim-apagar', action='store_true', help='confirma apagar o banco da aplicação (MONGODB_DB, ou o json/sqlite de TALENTFLOW_BANCO)')
+    args = parser.parse_args(argv)
+
+    dados = gerar_dados(args.funcionarios, args.vagas, args.projetos, args.seed)
+    if args.json:
+        for caminho in salvar_json(dados, args.saida):
+            print(caminho)
+    if args.xlsx:
+        print(salvar_xlsx(dados['funcionarios'], os.path.join(args.saida, 'funcionarios.xlsx')))
+    if args.mongo:
+        from dotenv import load_dotenv
+        from ..db import conectar
+        from .. import aggregates, indexes
+        from ..armazenamento import backend_configurado
+        from ..cache import incrementar_versao
+        from ..recommendation.recommender import SkillMatcher
+        load_dotenv()
+        # Com json/sqlite o destino é sempre o armazenamento da própria aplicação.
+        banco = args.banco or os.getenv('MONGODB_DB_BENCH') or 'talentflow_bench'
+        backend, caminho = backend_configurado()
+        alvo = banco if backend == 'mongo' else f"{backend} {caminho or 'padrão'}"
+        da_aplicacao = backend != 'mongo' or banco == (os.getenv('MONGODB_DB') or 'talentflow')
+        if da_aplicacao and not args.sim_apagar:
+            print(f"Recusado: --mongo apagaria os dados da aplicação ({alvo}). Use --banco <nome> para outro banco ou --sim-apagar para confirmar.")
+            return 2
+        db, erro = conectar(db_name=banco)
+        if db is None:
+            print(f"Erro de conexão com MongoDB: {erro}")
+            return 1
+        semear(db, dados)
+        indexes.garantir_indices(db)
+        matcher = SkillMatcher(dados['vagas'])
+        indexes.preencher_campos_derivados(db, matcher, todos=True)
+        aggregates.reconstruir(db)
+        incrementar_versao(db)
+        print(f"{alvo}: {len(dados['funcionarios'])} funcionarios, {len(dados['vagas'])} vagas, {len(dados['projetos'])} projetos")
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,238 @@
+import os
+import threading
+import time
+from functools import wraps
+
+try:
+    from pymongo import MongoClient
+    from pymongo.errors import ConnectionFailure
+except Exception:
+    MongoClient = None
+    ConnectionFailure = None
+
+def opcoes_cliente():
+    """Opções do MongoClient: pool e timeouts configuráveis pelo .env."""
+    kwargs = {
+        'serverSelectionTimeoutMS': int(os.getenv('TALENTFLOW_MONGO_TIMEOUT_MS', 5000)),
+        'connectTimeoutMS': int(os.getenv('TALENTFLOW_MONGO_CONNECT_TIMEOUT_MS', 5000)),
+        'maxPoolSize': int(os.getenv('TALENTFLOW_MONGO_MAX_POOL', 50)),
+        'minPoolSize': int(os.getenv('TALENTFLOW_MONGO_MIN_POOL', 0)),
+        'waitQueueTimeoutMS': int(os.getenv('TALENTFLOW_MONGO_FILA_TIMEOUT_MS', 2000)),
+    }
+    from .metrics import OUVINTE_MONGO
+    if OUVINTE_MONGO is not None:
+        kwargs['event_listeners'] = [OUVINTE_MONGO]
+    socket_timeout = os.getenv('TALENTFLOW_MONGO_SOCKET_TIMEOUT_MS')
+    if socket_timeout:
+        kwargs['socketTimeoutMS'] = int(socket_timeout)
+    try:
+        import certifi
+        kwargs['tlsCAFile'] = certifi.where()
+        kwargs['tls'] = True
+    except Exception:
+        pass
+    return kwargs
+
+def conectar(uri=None, db_name=None, backend=None):
+    """
+    Abre o banco configurado: o MongoDB do .env (ou dos argumentos) ou, com
+    TALENTFLOW_BANCO=json|sqlite, o armazenamento local de app.armazenamento.
+    Retorna (db, erro): em caso de falha `db` é None e `erro` traz o motivo.
+    """
+    if backend != 'mongo' and uri is None:
+        from .armazenamento import backend_configurado, abrir
+        try:
+            configurado, caminho = backend_configurado()
+            backend = backend or configurado
+            if backend != 'mongo':
+                return abrir(backend, caminho), None
+        except Exception as e:
+            return None, str(e)
+    uri = uri or os.getenv('MONGODB_URI')
+    if not uri or MongoClient is None:
+        return None, 'MONGODB_URI ausente no .env.'
+    try:
+        client = MongoClient(uri, **opcoes_cliente())
+        client.admin.command('ping')
+        from .repositorio import RepositorioMongo
+        return RepositorioMongo(client[db_name or os.getenv('MONGODB_DB') or 'talentflow']), None
+    except Exception as e:
+        return None, str(e)
+
+def falha_de_conexao(erro):
+    """True quando a exceção indica banco inacessível (e não um erro da consulta)."""
+    return ConnectionFailure is not None and isinstance(erro, ConnectionFailure)
+
+class BancoMonitorado:
+    """
+    Repositório entregue por `Conexao.obter`: cada chamada (e a leitura dos
+    cursores que ela devolve) registra sucesso ou falha no circuit breaker,
+    então rotas e tarefas não precisam contar falhas de conexão uma a uma.
+    """
+
+    def __init__(self, db, conexao):
+        self._db = db
+        self._conexao = conexao
+
+    def __getattr__(self, nome):
+        atributo = getattr(self._db, nome)
+        if nome.startswith('_') or not callable(atributo):
+            return atributo
+
+        @wraps(atributo)
+        def chamar(*args, **kwargs):
+            try:
+                resultado = atributo(*args, **kwargs)
+            except Exception as e:
+                self._conexao.registrar_falha(e)
+                raise
+            if hasattr(resultado, '__next__'):
+                return self._acompanhar(resultado)
+            self._conexao.registrar_sucesso()
+            return resultado
+
+        # Guardado na instância: as próximas chamadas não passam por __getattr__.
+        setattr(self, nome, chamar)
+        return chamar
+
+    def _acompanhar(self, iterador):
+        try:
+            yield from iterador
+        except Exception as e:
+            self._conexao.registrar_falha(e)
+            raise
+        self._conexao.registrar_sucesso()
+
+class Conexao:
+    """
+    Um MongoClient gerenciado por processo, protegido por um circuit breaker.
+
+    Fechado: `obter` devolve o banco sem ir à rede. Após `falhas_para_abrir`
+    falhas seguidas o circuito abre e `obter` falha na hora, sem bloquear a
+    requisição. Passada a espera, uma única requisição sonda com `ping`
+    (meio-aberto); se falhar, a espera dobra até `espera_maxima`.
+
+    O banco entregue é um BancoMonitorado: as falhas de conexão de qualquer
+    consulta contam para o circuito, inclusive as de exceções não tratadas.
+    """
+
+    FECHADO = 'fechado'
+    ABERTO = 'aberto'
+    MEIO_ABERTO = 'meio_aberto'
+
+    def __init__(self, uri=None, db_name=None, falhas_para_abrir=3, espera_inicial=1.0, espera_maxima=60.0):
+        self.uri = uri
+        self.db_name = db_name
+        self.falhas_para_abrir = falhas_para_abrir
+        self.espera_inicial = espera_inicial
+        self.espera_maxima = espera_maxima
+        self.estado = self.MEIO_ABERTO
+        self.falhas = 0
+        self.aberturas = 0
+        self.ultimo_erro = None
+        self._client = None
+        self._db = None
+        self._reabrir_em = 0.0
+        self._sondando = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Conexão do backend configurado; json e sqlite (app.armazenamento) já nascem fechados, sem sondagem."""
+        from .armazenamento import backend_configurado, abrir
+        backend, caminho = backend_configurado()
+        if backend != 'mongo':
+            return cls.de_banco(abrir(backend, caminho))
+        return cls(
+            uri=os.getenv('MONGODB_URI'),
+            db_name=os.getenv('MONGODB_DB') or 'talentflow',
+            falhas_para_abrir=int(os.getenv('TALENTFLOW_DB_FALHAS', 3)),
+            espera_inicial=float(os.getenv('TALENTFLOW_DB_ESPERA', 1)),
+            espera_maxima=float(os.getenv('TALENTFLOW_DB_ESPERA_MAX', 60))
+        )
+
+    @classmethod
+    def de_banco(cls, db):
+        """Conexão já fechada sobre um repositório pronto (ex.: banco em memória do benchmark)."""
+        conexao = cls()
+        conexao._db = BancoMonitorado(db, conexao)
+        conexao.estado = cls.FECHADO
+        return conexao
+
+    def obter(self):
+        """Retorna (db, erro); com o circuito aberto retorna imediatamente (None, erro)."""
+        with self._lock:
+            if self.estado == self.FECHADO:
+                return self._db, None
+            if self.estado == self.ABERTO and time.monotonic() < self._reabrir_em:
+                return None, self.ultimo_erro
+            if self._sondando:
+                return None, self.ultimo_erro
+            self._sondando = True
+            self.estado = self.MEIO_ABERTO
+
+        try:
+            db = self._sondar()
+        except Exception as e:
+            with self._lock:
+                self._sondando = False
+            self.registrar_falha(e, sondagem=True)
+            return None, str(e)
+
+        with self._lock:
+            self._sondando = False
+            self._db = db
+            self.estado = self.FECHADO
+            self.falhas = 0
+            self.aberturas = 0
+            self.ultimo_erro = None
+        return db, None
+
+    def _sondar(self):
+        if not self.uri or MongoClient is None:
+            raise RuntimeError('MONGODB_URI ausente no .env.')
+        if self._client is None:
+            self._client = MongoClient(self.uri, **opcoes_cliente())
+        self._client.admin.command('ping')
+        from .repositorio import RepositorioMongo
+        return BancoMonitorado(RepositorioMongo(self._client[self.db_name]), self)
+
+    def registrar_falha(self, erro, sondagem=False):
+        """
+        Conta uma falha de acesso ao banco. Erros que não são de conexão
+        (ex.: consulta inválida) são ignorados, exceto na sondagem.
+        """
+        if not sondagem and not falha_de_conexao(erro):
+            return
+        with self._lock:
+            self.falhas += 1
+            self.ultimo_erro = str(erro)
+            if sondagem or self.falhas >= self.falhas_para_abrir:
+                espera = min(self.espera_inicial * (2 ** self.aberturas), self.espera_maxima)
+                self.aberturas += 1
+                self.estado = self.ABERTO
+                self._reabrir_em = time.monotonic() + espera
+
+    def registrar_sucesso(self):
+        """Zera a contagem: o circuito só abre com falhas consecutivas."""
+        if self.falhas:
+            with self._lock:
+                self.falhas = 0
+
+    def situacao(self):
+        with self._lock:
+            agora = time.monotonic()
+            opcoes = opcoes_cliente()
+            return {
+                'estado': self.estado,
+                'falhas': self.falhas,
+                'aberturas': self.aberturas,
+                'reabre_em_s': round(max(self._reabrir_em - agora, 0.0), 3) if self.estado == self.ABERTO else None,
+                'ultimo_erro': self.ultimo_erro,
+                'pool': {
+                    'max': opcoes['maxPoolSize'],
+                    'min': opcoes['minPoolSize'],
+                    'timeout_selecao_ms': opcoes['serverSelectionTimeoutMS'],
+                    'timeout_fila_ms': opcoes['waitQueueTimeoutMS']
+                }
+            }
@@ -0,0 +1,93 @@
+"""
+Exportação em fluxo da lista de colaboradores do dashboard (CSV ou XLSX).
+
+Os documentos vêm do repositório, lidos em lotes, e cada linha é
+escrita assim que chega, então a memória não cresce com o número de
+colaboradores. O CSV sai direto como gerador da resposta. O XLSX é um zip
+que só fica válido no fim: usa o modo write-only do openpyxl sobre um arquivo
+temporário em disco, enviado em blocos, e o primeiro byte só sai depois da
+última linha escrita.
+
+Textos que começam com `=`, `+`, `-`, `@`, tabulação ou CR seriam lidos como
+fórmula pelo Excel: no CSV ganham um `'` na frente; no XLSX ficam gravados
+como texto.
+
+As primeiras colunas seguem o formato aceito por /upload_usuarios.
+"""
+import csv
+import io
+import tempfile
+
+COLUNAS = ['id', 'nome', 'cargo', 'email', 'habilidades_declaradas', 'habilidades_descobertas', 'area_top', 'melhor_compatibilidade']
+TAMANHO_BLOCO = 64 * 1024
+INICIO_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+
+def parece_formula(valor):
+    return isinstance(valor, str) and valor.startswith(INICIO_FORMULA)
+
+def celula_csv(valor):
+    """Valor seguro para o CSV: texto com cara de fórmula é prefixado com `'`."""
+    return "'" + valor if parece_formula(valor) else valor
+
+def linha(funcionario):
+    """Valores de um colaborador na ordem de COLUNAS."""
+    descobertas = [h.get('skill') if isinstance(h, dict) else h for h in funcionario.get('habilidades_descobertas', [])]
+    return [
+        funcionario.get('id'),
+        funcionario.get('nome', ''),
+        funcionario.get('cargo', ''),
+        funcionario.get('email', ''),
+        ', '.join(s for s in funcionario.get('habilidades_declaradas', []) if s),
+        ', '.join(s for s in descobertas if s),
+        funcionario.get('area_top') or '',
+        funcionario.get('melhor_compatibilidade', 0),
+    ]
+
+def gerar_csv(funcionarios, linhas_por_bloco=500):
+    """Gera o CSV (UTF-8 com BOM, para abrir no Excel) em blocos de texto."""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    buffer.write('\ufeff')
+    escritor.writerow(COLUNAS)
+    for i, funcionario in enumerate(funcionarios, 1):
+        escritor.writerow([celula_csv(v) for v in linha(funcionario)])
+        if i % linhas_por_bloco == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def gerar_xlsx(funcionarios):
+    """
+    Gera a planilha (aba Funcionarios) em modo write-only num arquivo
+    temporário e devolve os bytes em blocos. Memória constante, mas nada é
+    enviado antes de todas as linhas serem escritas.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Funcionarios')
+    ws.append(COLUNAS)
+
+    def celula_xlsx(valor):
+        if not parece_formula(valor):
+            return valor
+        celula = WriteOnlyCell(ws, value=valor)
+        celula.data_type = 's'
+        return celula
+
+    for funcionario in funcionarios:
+        ws.append([celula_xlsx(v) for v in linha(funcionario)])
+    with tempfile.TemporaryFile() as arquivo:
+        wb.save(arquivo)
+        arquivo.seek(0)
+        while True:
+            bloco = arquivo.read(TAMANHO_BLOCO)
+            if not bloco:
+                break
+            yield bloco
+
+FORMATOS = {
+    'csv': (gerar_csv, 'text/csv'),
+    'xlsx': (gerar_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
@@ -0,0 +1,211 @@
+import argparse
+import json
+
+from .nlp.extractor import normalizar_skill
+from .nlp.taxonomia import obter_taxonomia, dobrar_skill
+from . import aggregates
+from .leitura import em_paralelo
+from .cache import incrementar_versao
+
+TAMANHO_LOTE = 1000
+
+def skills_normalizadas(funcionario):
+    """Skills normalizadas do funcionário na ordem declaradas + descobertas (com repetições)."""
+    habilidades_declaradas = list(funcionario.get('habilidades_declaradas', []))
+    habilidades_descobertas = [h['skill'] for h in funcionario.get('habilidades_descobertas', [])]
+    return [k for k in (normalizar_skill(s) for s in habilidades_declaradas + habilidades_descobertas) if k]
+
+def campos_derivados(funcionario, matcher):
+    """
+    Campos desnormalizados gravados no documento do funcionário para que o
+    dashboard filtre e ordene no banco: skills normalizadas (índice
+    multikey), melhor compatibilidade e área da melhor vaga.
+    """
+    melhor, area = matcher.melhor_compatibilidade(funcionario)
+    return {
+        'skills_normalizadas': skills_normalizadas(funcionario),
+        'melhor_compatibilidade': melhor,
+        'area_top': area
+    }
+
+def garantir_indices(db):
+    """Índices da aplicação (app.repositorio) e o contador de ids."""
+    db.garantir_indices()
+    inicializar_contador(db)
+
+def email_unico(db):
+    """True se o índice único de email existe (verificado por garantir_indices)."""
+    return db.email_unico()
+
+def inicializar_contador(db):
+    """Garante o contador de ids >= maior id existente (atômico e idempotente)."""
+    db.garantir_contador('funcionarios', db.maior_id_funcionario())
+
+def reservar_ids(db, quantidade=1):
+    """
+    Reserva um bloco de `quantidade` ids de funcionário num único incremento
+    atômico do contador; importações simultâneas nunca recebem o mesmo id.
+    Retorna um range. Ids de linhas que não chegarem a ser gravadas ficam
+    sem uso.
+    """
+    valor = db.incrementar_contador('funcionarios', quantidade)
+    if valor is None:
+        inicializar_contador(db)
+        valor = db.incrementar_contador('funcionarios', quantidade, criar=True)
+    fim = valor + 1
+    return range(fim - quantidade, fim)
+
+def emails_repetidos(db, docs):
+    """
+    Posições em `docs` cujo email já existe na base ou numa linha anterior do
+    lote; uma consulta sobre o índice de email. Usado quando o índice
+    único não existe.
+    """
+    emails = list({d['email'] for d in docs if isinstance(d.get('email'), str)})
+    vistos = db.emails_existentes(emails) if emails else set()
+    repetidos = set()
+    for i, doc in enumerate(docs):
+        email = doc.get('email')
+        if not isinstance(email, str):
+            continue
+        if email in vistos:
+            repetidos.add(i)
+        vistos.add(email)
+    return repetidos
+
+def inserir_funcionarios(db, docs):
+    """
+    Insere `docs` numa única escrita: o índice único de email rejeita as
+    linhas repetidas sem interromper as demais. Sem o índice único (base
+    antiga com repetidos), as repetidas são filtradas antes por consulta. Retorna (inseridos, conflitos), onde conflitos são pares
+    (posição em docs, documento).
+    """
+    if not docs:
+        return [], []
+    conflitos = {} if email_unico(db) else {i: docs[i] for i in emails_repetidos(db, docs)}
+    pendentes = [i for i in range(len(docs)) if i not in conflitos]
+    if pendentes:
+        for recusado in db.inserir_funcionarios([docs[i] for i in pendentes]):
+            posicao = pendentes[recusado]
+            conflitos[posicao] = docs[posicao]
+    inseridos = [d for i, d in enumerate(docs) if i not in conflitos]
+    return inseridos, sorted(conflitos.items())
+
+def atualizar_campos_derivados(db, funcionarios, matcher):
+    """Regrava os campos derivados dos funcionários informados (por `id`) numa escrita em lote."""
+    return db.atualizar_funcionarios([(f['id'], campos_derivados(f, matcher)) for f in funcionarios])
+
+def preencher_campos_derivados(db, matcher, todos=False):
+    """
+    Preenche os campos derivados dos funcionários que ainda não os têm
+    (ou de todos, com `todos=True`, ex.: após mudar as vagas).
+    """
+    campos = ('id', 'habilidades_declaradas', 'habilidades_descobertas')
+    docs = db.listar('funcionarios', campos) if todos else db.funcionarios_sem_derivados(campos)
+    lote = []
+    total = 0
+    for doc in docs:
+        lote.append(doc)
+        if len(lote) >= TAMANHO_LOTE:
+            total += atualizar_campos_derivados(db, lote, matcher)
+            lote = []
+    if lote:
+        total += atualizar_campos_derivados(db, lote, matcher)
+    return total
+
+def migrar_taxonomia(db, matcher):
+    """
+    Recalcula campos derivados e agregados de todos os funcionários quando a
+    taxonomia de skills mudou desde a última execução (a assinatura fica em
+    `meta`). Retorna True se houve migração.
+    """
+    assinatura = obter_taxonomia().assinatura
+    doc = db.ler_meta('taxonomia')
+    if doc is not None and doc.get('assinatura') == assinatura:
+        return False
+    if doc is None and not db.contar_funcionarios({}):
+        db.gravar_meta('taxonomia', {'assinatura': assinatura})
+        return False
+    preencher_campos_derivados(db, matcher, todos=True)
+    aggregates.reconstruir(db)
+    db.gravar_meta('taxonomia', {'assinatura': assinatura})
+    incrementar_versao(db)
+    return True
+
+def filtro_funcionarios(db, vocabulario, busca='', cargo='', area='', indice_busca=None):
+    """
+    Traduz os filtros do dashboard no filtro de funcionários do repositório
+    (app.repositorio), respondido pelos índices.
+
+    Os filtros de substring são resolvidos antes, contra conjuntos pequenos
+    (vocabulário de skills, cargos e áreas distintos, obtidos pelos índices), e
+    viram listas de valores aceitos em campos indexados. Com `indice_busca`
+    (app.busca), a busca de skills usa o índice de trigramas: aceita erros de
+    digitação e vários termos separados por vírgula, que precisam todos casar.
+    """
+    filtro = {}
+    if busca and indice_busca is not None:
+        grupos = indice_busca.resolver(busca)
+        if grupos:
+            filtro['skills'] = [list(chaves) for chaves in grupos]
+    elif busca:
+        termo = dobrar_skill(busca)
+        chaves = [k for k in vocabulario if termo in dobrar_skill(k)]
+        alias = normalizar_skill(busca)
+        if alias in vocabulario and alias not in chaves:
+            chaves.append(alias)
+        filtro['skills'] = [chaves]
+    if cargo:
+        termo = cargo.lower()
+        filtro['cargo'] = [c for c in db.valores_distintos('cargo') if isinstance(c, str) and termo in c.lower()]
+    if area:
+        termo = area.lower()
+        filtro['area_top'] = [a for a in db.valores_distintos('area_top') if isinstance(a, str) and a.lower() == termo]
+    return filtro
+
+def top_skills(db, filtro, vocabulario, limite=5):
+    """
+    Skills mais frequentes entre os funcionários que atendem ao filtro. A
+    contagem é feita no banco (uma linha por skill); empates seguem a ordem do
+    vocabulário, como no cálculo em memória.
+    """
+    posicao = {k: i for i, k in enumerate(vocabulario)}
+    grupos = sorted(db.contar_skills(filtro).items(), key=lambda item: (-item[1], posicao.get(item[0], len(posicao)), item[0]))
+    return [{'skill': vocabulario.get(chave, chave), 'count': n} for chave, n in grupos[:limite]]
+
+CAMPOS_LISTA = ('id', 'nome', 'cargo', 'melhor_compatibilidade', 'area_top')
+
+def pagina_funcionarios(db, filtro, ordem='nome', pagina=1, por_pagina=20, campos=None):
+    """Uma página de funcionários ordenada no banco; retorna (documentos, total). Contagem e página são lidas em paralelo."""
+    def pagina_atual():
+        return db.pagina_funcionarios(filtro, ordem, (pagina - 1) * por_pagina, por_pagina, campos or CAMPOS_LISTA)
+
+    resultados, _ = em_paralelo({'total': lambda: db.contar_funcionarios(filtro), 'pagina': pagina_atual})
+    return resultados['pagina'], resultados['total']
+
+def iterar_funcionarios(db, filtro, ordem='nome', campos=None, lote=1000):
+    """Todos os funcionários do filtro, na ordem pedida, lidos em lotes de `lote`."""
+    return db.iterar_funcionarios(filtro, ordem, campos or CAMPOS_LISTA, lote)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Índices e campos derivados da coleção funcionarios.')
+    parser.add_argument('--todos', action='store_true', help='recalcula os campos derivados de todos os funcionários')
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    from .db import conectar
+    from .recommendation.recommender import SkillMatcher
+    load_dotenv()
+    db, erro = conectar()
+    if db is None:
+        print(f"Erro de conexão com MongoDB: {erro}")
+        return 1
+    garantir_indices(db)
+    total = preencher_campos_derivados(db, SkillMatcher(db.listar('vagas')), todos=args.todos)
+    if total:
+        incrementar_versao(db)
+    print(json.dumps({'funcionarios_atualizados': total}, ensure_ascii=False))
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
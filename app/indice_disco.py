@@ -0,0 +1,241 @@
+"""
+Snapshot em disco dos índices de uma versão dos dados (IndiceCandidatos e
+SkillMatcher), para que um worker novo os carregue em vez de reconstruí-los
+na inicialização.
+
+Cada versão fica numa pasta `indices-v<versao>` com o vocabulário de skills
+(meta.json), as skills normalizadas de cada vaga (matcher.json) e arrays NumPy
+(.npy) abertos com mmap: as listas de postagem skill -> funcionários em
+formato CSR (ponteiros + posições) e a máscara de skills de cada funcionário,
+uma linha de bytes por funcionário com um bit por posição do vocabulário.
+As postagens são lidas do mmap sob demanda (workers na mesma máquina
+compartilham as páginas do sistema operacional); as máscaras viram ints numa
+única passada na carga, para as consultas custarem o mesmo que em memória.
+
+A pasta vale para a versão dos dados (`meta.versao_dados`, que toda escrita
+incrementa) e a assinatura da taxonomia em que as skills foram normalizadas.
+
+Uso (pré-construir para a versão atual dos dados):
+    python -m app.indice_disco --pasta indices
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+
+from .recommendation.recommender import IndiceCandidatos, SkillMatcher, _numpy
+from .nlp.extractor import normalizar_skill
+from .nlp.taxonomia import obter_taxonomia
+
+FORMATO = 4
+PREFIXO = 'indices-v'
+PREFIXOS_ANTIGOS = ('candidatos-v',)
+
+class PostagensCSR:
+    """Mapa somente leitura skill -> posições dos funcionários, sobre arrays CSR."""
+
+    def __init__(self, vocabulario, ponteiros, posicoes):
+        self._ids = {chave: j for j, chave in enumerate(vocabulario)}
+        self._ponteiros = ponteiros
+        self._posicoes = posicoes
+
+    def get(self, chave, padrao=()):
+        j = self._ids.get(chave)
+        if j is None:
+            return padrao
+        return self._posicoes[self._ponteiros[j]:self._ponteiros[j + 1]].tolist()
+
+    def __contains__(self, chave):
+        return chave in self._ids
+
+    def __len__(self):
+        return len(self._ids)
+
+def mascaras_disco(mascaras):
+    """
+    Máscaras de skills dos funcionários a partir do array (n x bytes) gravado:
+    cada linha vira um int com `int.from_bytes`, numa única passada, e as
+    consultas usam a lista de ints como o índice construído em memória.
+    """
+    largura = mascaras.shape[1]
+    dados = mascaras.tobytes()
+    return [int.from_bytes(dados[inicio:inicio + largura], 'little') for inicio in range(0, len(dados), largura)]
+
+class VocabularioDisco:
+    """
+    Ids de skill do índice gravado: o bit j é a posição j do vocabulário do
+    meta.json. Faz o papel da taxonomia (mascara / chaves_da_mascara) no
+    IndiceCandidatos carregado; chaves fora do vocabulário não têm bit, pois
+    nenhum funcionário as possui.
+    """
+
+    def __init__(self, vocabulario):
+        self._chaves = list(vocabulario)
+        self._ids = {chave: j for j, chave in enumerate(self._chaves)}
+
+    def mascara(self, chaves):
+        mascara = 0
+        for chave in chaves:
+            j = self._ids.get(chave)
+            if j is not None:
+                mascara |= 1 << j
+        return mascara
+
+    def chaves_da_mascara(self, mascara):
+        chaves = set()
+        i = 0
+        while mascara:
+            if mascara & 1:
+                chaves.add(self._chaves[i])
+            mascara >>= 1
+            i += 1
+        return chaves
+
+def _ids(np, registros, campo='id'):
+    return np.asarray([r.get(campo) for r in registros], dtype=np.int64)
+
+def _pasta_versao(pasta, versao):
+    return os.path.join(pasta, f"{PREFIXO}{versao}")
+
+def _salvar_matcher(np, destino, matcher):
+    """
+    Skills normalizadas de cada vaga em CSR: posições num vocabulário próprio,
+    na ordem de `habilidades_requeridas` (o texto original vem da própria vaga).
+    """
+    vocabulario = list(matcher.indice)
+    ids = {chave: j for j, chave in enumerate(vocabulario)}
+    chaves = [[ids[normalizar_skill(s)] for s in vaga.get('habilidades_requeridas', [])] for vaga in matcher.vagas]
+    ponteiros = np.zeros(len(chaves) + 1, dtype=np.int64)
+    np.cumsum([len(c) for c in chaves], out=ponteiros[1:])
+    np.save(os.path.join(destino, 'requisitos_ptr.npy'), ponteiros)
+    np.save(os.path.join(destino, 'requisitos_pos.npy'), np.fromiter((j for c in chaves for j in c), dtype=np.int32, count=int(ponteiros[-1])))
+    with open(os.path.join(destino, 'matcher.json'), 'w', encoding='utf-8') as f:
+        json.dump({'vagas': [v.get('id') for v in matcher.vagas], 'vocabulario': vocabulario}, f, ensure_ascii=False)
+
+def salvar(pasta, indice, versao, matcher=None):
+    """
+    Grava `indice` (e `matcher`, se dado) para a versão `versao` (escrita
+    atômica: pasta temporária + rename). Remove as versões antigas. Retorna o
+    caminho ou None sem NumPy.
+    """
+    np = _numpy()
+    if np is None:
+        return None
+    destino = _pasta_versao(pasta, versao)
+    if os.path.isdir(destino):
+        return destino
+    os.makedirs(pasta, exist_ok=True)
+
+    vocabulario = list(indice.postagens)
+    tamanhos = [len(indice.postagens[chave]) for chave in vocabulario]
+    postagens_ptr = np.zeros(len(vocabulario) + 1, dtype=np.int64)
+    np.cumsum(tamanhos, out=postagens_ptr[1:])
+    postagens_pos = np.fromiter((i for chave in vocabulario for i in indice.postagens[chave]), dtype=np.int32, count=int(postagens_ptr[-1]))
+
+    # A máscara sai das próprias postagens: bit j do funcionário i se i está na lista da skill j.
+    colunas = np.repeat(np.arange(len(vocabulario), dtype=np.int64), tamanhos)
+    mascaras = np.zeros((len(indice.funcionarios), max((len(vocabulario) + 7) // 8, 1)), dtype=np.uint8)
+    np.bitwise_or.at(mascaras, (postagens_pos, colunas >> 3), (1 << (colunas & 7)).astype(np.uint8))
+
+    temporaria = tempfile.mkdtemp(prefix='.tmp-', dir=pasta)
+    try:
+        np.save(os.path.join(temporaria, 'postagens_ptr.npy'), postagens_ptr)
+        np.save(os.path.join(temporaria, 'postagens_pos.npy'), postagens_pos)
+        np.save(os.path.join(temporaria, 'mascaras.npy'), mascaras)
+        np.save(os.path.join(temporaria, 'ids.npy'), _ids(np, indice.funcionarios))
+        if matcher is not None:
+            _salvar_matcher(np, temporaria, matcher)
+        with open(os.path.join(temporaria, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'formato': FORMATO, 'versao': versao, 'taxonomia': obter_taxonomia().assinatura, 'total': len(indice.funcionarios), 'vocabulario': vocabulario}, f, ensure_ascii=False)
+        os.rename(temporaria, destino)
+    except OSError:
+        shutil.rmtree(temporaria, ignore_errors=True)
+        if not os.path.isdir(destino):
+            raise
+
+    for nome in os.listdir(pasta):
+        if nome.startswith((PREFIXO,) + PREFIXOS_ANTIGOS) and nome != os.path.basename(destino):
+            shutil.rmtree(os.path.join(pasta, nome), ignore_errors=True)
+    return destino
+
+def _meta(origem, versao):
+    """meta.json da pasta se ela vale para `versao` e para a taxonomia ativa; senão None."""
+    with open(os.path.join(origem, 'meta.json'), encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('formato') != FORMATO or meta.get('versao') != versao:
+        return None
+    if meta.get('taxonomia') != obter_taxonomia().assinatura:
+        return None
+    return meta
+
+def carregar(pasta, funcionarios, versao):
+    """
+    IndiceCandidatos da versão `versao` lido do disco (arrays em mmap), ou None
+    se não houver snapshot desta versão e taxonomia com estes funcionários, na
+    mesma ordem.
+    """
+    np = _numpy()
+    origem = _pasta_versao(pasta, versao)
+    if np is None or not os.path.isdir(origem):
+        return None
+    try:
+        meta = _meta(origem, versao)
+        if meta is None or meta.get('total') != len(funcionarios):
+            return None
+        abrir = lambda nome: np.load(os.path.join(origem, nome), mmap_mode='r')
+        if not np.array_equal(abrir('ids.npy'), _ids(np, funcionarios)):
+            return None
+        vocabulario = meta['vocabulario']
+        postagens = PostagensCSR(vocabulario, abrir('postagens_ptr.npy'), abrir('postagens_pos.npy'))
+        skills = mascaras_disco(abrir('mascaras.npy'))
+    except (OSError, ValueError, TypeError, KeyError):
+        return None
+    return IndiceCandidatos.de_estruturas(funcionarios, skills, postagens, VocabularioDisco(vocabulario))
+
+def carregar_matcher(pasta, vagas, versao):
+    """SkillMatcher da versão `versao` com as skills das vagas já normalizadas, ou None."""
+    np = _numpy()
+    origem = _pasta_versao(pasta, versao)
+    if np is None or not os.path.isfile(os.path.join(origem, 'matcher.json')):
+        return None
+    try:
+        if _meta(origem, versao) is None:
+            return None
+        with open(os.path.join(origem, 'matcher.json'), encoding='utf-8') as f:
+            dados = json.load(f)
+        if dados['vagas'] != [v.get('id') for v in vagas]:
+            return None
+        vocabulario = dados['vocabulario']
+        ponteiros = np.load(os.path.join(origem, 'requisitos_ptr.npy')).tolist()
+        posicoes = np.load(os.path.join(origem, 'requisitos_pos.npy')).tolist()
+        requisitos = []
+        for i, vaga in enumerate(vagas):
+            originais = vaga.get('habilidades_requeridas', [])
+            if len(originais) != ponteiros[i + 1] - ponteiros[i]:
+                return None
+            requisitos.append({vocabulario[j]: original for j, original in zip(posicoes[ponteiros[i]:ponteiros[i + 1]], originais)})
+    except (OSError, ValueError, TypeError, KeyError, IndexError):
+        return None
+    return SkillMatcher.de_requisitos(vagas, requisitos)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Pré-constrói o snapshot em disco do índice de candidatos e do matcher.')
+    parser.add_argument('--pasta', default=os.getenv('TALENTFLOW_INDICE_DIR', 'indices'))
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    from .db import conectar
+    from .cache import SnapshotCache
+    load_dotenv()
+    db, erro = conectar()
+    if db is None:
+        print(f"Erro de conexão com MongoDB: {erro}")
+        return 1
+    snapshot = SnapshotCache().obter(db)
+    caminho = salvar(args.pasta, IndiceCandidatos(snapshot.funcionarios), snapshot.versao, SkillMatcher(snapshot.vagas))
+    print(caminho or 'NumPy indisponível: snapshot em disco desativado.')
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,220 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+
+logger = logging.getLogger(__name__)
+
+def montar_mensagens(funcionario, recomendacoes):
+    """Prompt do plano de carreira a partir do perfil e das 5 melhores recomendações."""
+    habilidades_decl = funcionario.get('habilidades_declaradas', [])
+    habilidades_desc = [h['skill'] for h in funcionario.get('habilidades_descobertas', [])]
+    return [
+        {"role": "system", "content": "Você é um assistente de carreira. Gere plano prático e acionável."},
+        {"role": "user", "content": (
+            f"Nome: {funcionario.get('nome')}\n"
+            f"Cargo atual: {funcionario.get('cargo')}\n"
+            f"Habilidades declaradas: {', '.join(habilidades_decl) or 'Nenhuma'}\n"
+            f"Habilidades descobertas: {', '.join(habilidades_desc) or 'Nenhuma'}\n"
+            f"Recomendações internas: "
+            + ", ".join([f"{r['titulo']} ({r['compatibilidade']}%)" for r in recomendacoes[:5]])
+            + "\nCrie um plano de carreira de 6-12 meses com: metas mensais, projetos internos sugeridos, habilidades a desenvolver e cursos/trilhas curtas. Linguagem objetiva em bullet points.\n"
+            + "Inclua recomendações de cursos com plataforma (somente: Alura, Data Science Academy, Udemy, Microsoft Learning), carga horária estimada e nível (iniciante/intermediário/avançado). Não sugira plataformas fora dessa lista."
+        )}
+    ]
+
+def chave_plano(modelo, mensagens):
+    """Endereço do resultado: hash do modelo e do prompt completo."""
+    conteudo = json.dumps({'modelo': modelo, 'mensagens': mensagens}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+class ClienteOpenAIFalso:
+    """
+    Substituto local do cliente OpenAI (mesma interface de
+    `chat.completions.create`), para desenvolvimento e testes sem rede.
+    """
+
+    def __init__(self, resposta=None, atraso=0.0):
+        self.resposta = resposta
+        self.atraso = atraso
+        self.chamadas = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._criar))
+
+    def _criar(self, model=None, messages=None, **kwargs):
+        with self._lock:
+            self.chamadas += 1
+        if self.atraso:
+            time.sleep(self.atraso)
+        conteudo = self.resposta or "Plano de carreira (simulado):\n" + (messages[-1]['content'] if messages else '')
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=conteudo))])
+
+class GeradorPlanos:
+    """
+    Fila de geração de planos de carreira em segundo plano.
+
+    Cada pedido é identificado pelo hash do prompt (`chave_plano`): resultados
+    ficam num cache LRU e pedidos idênticos simultâneos compartilham a mesma
+    chamada à API. O status é consultado pela chave.
+
+    Com `db`, status e resultado também são gravados em `planos_carreira`
+    (`_id` = chave), para que qualquer worker responda ao polling e reaproveite
+    planos já gerados. O pedido é reivindicado numa única escrita atômica
+    (`Repositorio.reivindicar_plano`), então só um worker chama a API; um
+    pedido 'pendente' de outro worker só é refeito depois de
+    `expira_pendente` segundos (o worker pode ter caído).
+    """
+
+    def __init__(self, fabrica_cliente, modelo='gpt-5-nano', max_workers=4, max_resultados=1024, expira_pendente=600):
+        self.fabrica_cliente = fabrica_cliente
+        self.modelo = modelo
+        self.max_resultados = max_resultados
+        self.expira_pendente = expira_pendente
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='plano-carreira')
+        self._resultados = OrderedDict()
+        self._em_andamento = {}
+        self._lock = threading.Lock()
+        self._cliente = None
+        self.chamadas_api = 0
+        self.hits = 0
+
+    @classmethod
+    def from_env(cls):
+        modelo = os.getenv('OPENAI_MODEL', 'gpt-5-nano')
+        max_workers = int(os.getenv('TALENTFLOW_PLANOS_WORKERS', 4))
+        if os.getenv('OPENAI_FAKE'):
+            return cls(ClienteOpenAIFalso, modelo=modelo, max_workers=max_workers)
+
+        def fabrica():
+            from openai import OpenAI
+            return OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+
+        return cls(fabrica, modelo=modelo, max_workers=max_workers)
+
+    def _obter_cliente(self):
+        with self._lock:
+            if self._cliente is None:
+                self._cliente = self.fabrica_cliente()
+            return self._cliente
+
+    def _ler(self, db, chave):
+        """Status gravado por qualquer worker, ou None (sem banco ou em falha)."""
+        if db is None:
+            return None
+        try:
+            return db.ler_plano(chave)
+        except Exception as e:
+            logger.warning("Falha ao ler o plano %s: %s", chave, e)
+            return None
+
+    def _gravar(self, db, chave, resultado):
+        if db is None:
+            return
+        try:
+            db.gravar_plano(chave, dict(resultado, modelo=self.modelo, atualizado_em=time.time()))
+        except Exception as e:
+            logger.warning("Falha ao gravar o plano %s: %s", chave, e)
+
+    def _reivindicar(self, db, chave):
+        """
+        Grava o pedido como 'pendente' numa única operação atômica do banco;
+        False se outro worker já o concluiu ou o gera. Sem banco (ou em
+        falha), o pedido é sempre deste worker.
+        """
+        if db is None:
+            return True
+        agora = time.time()
+        try:
+            return db.reivindicar_plano(chave, {'status': 'pendente', 'modelo': self.modelo, 'atualizado_em': agora},
+                                        agora - self.expira_pendente)
+        except Exception as e:
+            logger.warning("Falha ao reivindicar o plano %s: %s", chave, e)
+            return True
+
+    def _guardar(self, chave, resultado):
+        self._resultados[chave] = resultado
+        self._resultados.move_to_end(chave)
+        while len(self._resultados) > self.max_resultados:
+            self._resultados.popitem(last=False)
+
+    def solicitar(self, mensagens, db=None):
+        """Enfileira a geração (se ainda não houver resultado ou pedido igual) e retorna a chave."""
+        chave = chave_plano(self.modelo, mensagens)
+        with self._lock:
+            resultado = self._resultados.get(chave)
+            if resultado is not None and resultado['status'] == 'concluido':
+                self._resultados.move_to_end(chave)
+                self.hits += 1
+                return chave
+            if chave in self._em_andamento:
+                self.hits += 1
+                return chave
+        gravado = self._ler(db, chave)
+        if gravado is not None:
+            if gravado.get('status') == 'concluido':
+                with self._lock:
+                    self._guardar(chave, {'status': 'concluido', 'plano': gravado.get('plano')})
+                    self.hits += 1
+                return chave
+            if gravado.get('status') == 'pendente' and time.time() - gravado.get('atualizado_em', 0) < self.expira_pendente:
+                with self._lock:
+                    self.hits += 1
+                return chave
+        with self._lock:
+            if chave in self._em_andamento:
+                self.hits += 1
+                return chave
+            # Reserva local (sem futuro ainda): o banco é consultado fora do lock.
+            self._em_andamento[chave] = None
+            self._resultados.pop(chave, None)
+        if not self._reivindicar(db, chave):
+            with self._lock:
+                self._em_andamento.pop(chave, None)
+                self.hits += 1
+            return chave
+        futuro = self._executor.submit(self._executar, chave, mensagens, db)
+        with self._lock:
+            if self._em_andamento.get(chave, futuro) is None:
+                self._em_andamento[chave] = futuro
+        return chave
+
+    def _executar(self, chave, mensagens, db=None):
+        with self._lock:
+            self.chamadas_api += 1
+        try:
+            resp = self._obter_cliente().chat.completions.create(model=self.modelo, messages=mensagens)
+            resultado = {'status': 'concluido', 'plano': resp.choices[0].message.content}
+        except Exception as e:
+            resultado = {'status': 'erro', 'erro': str(e)}
+        self._gravar(db, chave, resultado)
+        with self._lock:
+            self._guardar(chave, resultado)
+            self._em_andamento.pop(chave, None)
+        return resultado
+
+    def status(self, chave, db=None):
+        """Status local do pedido; sem ele, o gravado por outro worker em `planos_carreira`."""
+        with self._lock:
+            if chave in self._em_andamento:
+                return {'status': 'pendente'}
+            resultado = self._resultados.get(chave)
+        if resultado is not None:
+            return dict(resultado)
+        gravado = self._ler(db, chave)
+        if gravado is None:
+            return {'status': 'desconhecido'}
+        return {campo: gravado[campo] for campo in ('status', 'plano', 'erro') if campo in gravado}
+
+    def aguardar(self, chave, timeout=None, db=None):
+        """Espera a conclusão de um pedido (útil em testes e na linha de comando)."""
+        with self._lock:
+            futuro = self._em_andamento.get(chave)
+        if futuro is not None:
+            futuro.result(timeout=timeout)
+        return self.status(chave, db)
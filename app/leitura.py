@@ -0,0 +1,83 @@
+"""
+Leituras independentes do banco em paralelo.
+
+Os repositórios são seguros entre threads, então consultas que não dependem
+umas das outras (as três coleções do snapshot, a contagem e a página do
+dashboard) são enviadas juntas por um pool de threads do processo: a latência
+passa a ser a da consulta mais lenta, não a soma. Cada leitura é cronometrada
+(`talentflow_leitura_segundos` em /metrics e `leitura_<nome>` no
+Server-Timing da requisição).
+
+TALENTFLOW_LEITURAS_PARALELAS define o tamanho do pool (padrão 8; 1 desliga) e
+TALENTFLOW_MONGO_LOTE o tamanho dos lotes lidos (padrão 1000).
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import g, has_request_context
+
+from .metrics import REGISTRO
+
+TAMANHO_LOTE = int(os.getenv('TALENTFLOW_MONGO_LOTE', 1000))
+REGISTRO.descrever('talentflow_leitura_segundos', 'Duração de cada leitura do banco feita pela camada de leituras paralelas.')
+
+_pool = None
+_pool_lock = threading.Lock()
+_local = threading.local()
+
+def _obter_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                trabalhadores = int(os.getenv('TALENTFLOW_LEITURAS_PARALELAS', 8))
+                _pool = ThreadPoolExecutor(trabalhadores, thread_name_prefix='leitura') if trabalhadores > 1 else False
+    return _pool
+
+def _cronometrar(funcao):
+    anterior = getattr(_local, 'no_pool', False)
+    _local.no_pool = True
+    inicio = time.perf_counter()
+    try:
+        return funcao(), time.perf_counter() - inicio
+    finally:
+        _local.no_pool = anterior
+
+def em_paralelo(tarefas):
+    """
+    Executa as funções de `tarefas` ({nome: função sem argumentos}) ao mesmo
+    tempo e retorna (resultados, tempos), dois dicts por nome; tempos em
+    segundos. A primeira exceção é repassada. Chamadas de dentro do pool rodam
+    em sequência, para não esperar pelo próprio pool.
+    """
+    pool = _obter_pool()
+    if not pool or len(tarefas) < 2 or getattr(_local, 'no_pool', False):
+        medidos = {nome: _cronometrar(funcao) for nome, funcao in tarefas.items()}
+    else:
+        futuros = {nome: pool.submit(_cronometrar, funcao) for nome, funcao in tarefas.items()}
+        medidos = {nome: futuro.result() for nome, futuro in futuros.items()}
+
+    resultados = {}
+    tempos = {}
+    for nome, (resultado, duracao) in medidos.items():
+        resultados[nome] = resultado
+        tempos[nome] = duracao
+        REGISTRO.observar('talentflow_leitura_segundos', duracao, (('leitura', nome),))
+    if has_request_context():
+        g.setdefault('etapas', []).extend((f"leitura_{nome}", duracao) for nome, duracao in tempos.items())
+    return resultados, tempos
+
+def ler_colecoes(db, consultas, lote=None):
+    """
+    Lê coleções inteiras em paralelo. `consultas` é {coleção: campos} (None
+    para os documentos inteiros); retorna ({coleção: lista de documentos},
+    {coleção: segundos}).
+    """
+    lote = lote or TAMANHO_LOTE
+    tarefas = {
+        nome: (lambda nome=nome, campos=campos: db.listar(nome, campos, lote))
+        for nome, campos in consultas.items()
+    }
+    return em_paralelo(tarefas)
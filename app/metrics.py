@@ -0,0 +1,248 @@
+"""
+Métricas de desempenho do processo, expostas em /metrics no formato texto do Prometheus.
+
+- tempo e contagem de requisições por rota, método e status;
+- etapas nomeadas dentro das rotas (`with etapa('render'): ...`), também
+  devolvidas no cabeçalho Server-Timing da própria resposta;
+- comandos do MongoDB (contagem, falhas e duração) via CommandListener do pymongo;
+- perfil por amostragem opcional (TALENTFLOW_PROFILER=1): requisições mais
+  lentas que TALENTFLOW_PROFILER_LIMIAR_MS geram um arquivo de pilhas no
+  formato "folded" (flamegraph.pl, speedscope) em TALENTFLOW_PROFILER_DIR.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+
+try:
+    from pymongo import monitoring
+except Exception:
+    monitoring = None
+
+LIMITES_PADRAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histograma:
+    def __init__(self, limites=LIMITES_PADRAO):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        i = 0
+        while i < len(self.limites) and valor > self.limites[i]:
+            i += 1
+        self.contagens[i] += 1
+        self.soma += valor
+        self.total += 1
+
+class Registro:
+    """Contadores e histogramas rotulados, seguros para várias threads."""
+
+    def __init__(self):
+        self._contadores = {}
+        self._histogramas = {}
+        self._ajuda = {}
+        self._lock = threading.Lock()
+
+    def descrever(self, nome, ajuda):
+        self._ajuda[nome] = ajuda
+
+    def incrementar(self, nome, rotulos=(), valor=1):
+        chave = (nome, tuple(rotulos))
+        with self._lock:
+            self._contadores[chave] = self._contadores.get(chave, 0) + valor
+
+    def observar(self, nome, valor, rotulos=()):
+        chave = (nome, tuple(rotulos))
+        with self._lock:
+            histograma = self._histogramas.get(chave)
+            if histograma is None:
+                histograma = self._histogramas[chave] = Histograma()
+            histograma.observar(valor)
+
+    def texto(self, extras=()):
+        """Exposição no formato texto do Prometheus; `extras` são gauges (nome, rótulos, valor)."""
+        linhas = []
+        with self._lock:
+            contadores = sorted(self._contadores.items())
+            histogramas = sorted(self._histogramas.items())
+            historicos = [(chave, list(h.contagens), h.soma, h.total, h.limites) for chave, h in histogramas]
+
+        vistos = set()
+        def cabecalho(nome, tipo):
+            if nome not in vistos:
+                vistos.add(nome)
+                if nome in self._ajuda:
+                    linhas.append(f"# HELP {nome} {self._ajuda[nome]}")
+                linhas.append(f"# TYPE {nome} {tipo}")
+
+        for (nome, rotulos), valor in contadores:
+            cabecalho(nome, 'counter')
+            linhas.append(f"{nome}{_rotulos(rotulos)} {valor}")
+        for (nome, rotulos), contagens, soma, total, limites in historicos:
+            cabecalho(nome, 'histogram')
+            acumulado = 0
+            for limite, contagem in zip(limites, contagens):
+                acumulado += contagem
+                linhas.append(f"{nome}_bucket{_rotulos(rotulos + (('le', repr(limite)),))} {acumulado}")
+            linhas.append(f"{nome}_bucket{_rotulos(rotulos + (('le', '+Inf'),))} {total}")
+            linhas.append(f"{nome}_sum{_rotulos(rotulos)} {soma:.6f}")
+            linhas.append(f"{nome}_count{_rotulos(rotulos)} {total}")
+        for nome, rotulos, valor in extras:
+            cabecalho(nome, 'gauge')
+            linhas.append(f"{nome}{_rotulos(tuple(rotulos))} {valor}")
+        return '\n'.join(linhas) + '\n'
+
+def _rotulos(rotulos):
+    if not rotulos:
+        return ''
+    pares = ','.join('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for k, v in rotulos)
+    return '{' + pares + '}'
+
+REGISTRO = Registro()
+REGISTRO.descrever('talentflow_requisicao_segundos', 'Duração das requisições HTTP por rota.')
+REGISTRO.descrever('talentflow_requisicoes_total', 'Requisições HTTP por rota, método e status.')
+REGISTRO.descrever('talentflow_etapa_segundos', 'Duração das etapas nomeadas dentro das rotas.')
+REGISTRO.descrever('talentflow_mongo_segundos', 'Duração dos comandos enviados ao MongoDB.')
+REGISTRO.descrever('talentflow_mongo_comandos_total', 'Comandos enviados ao MongoDB, por resultado.')
+
+@contextmanager
+def etapa(nome):
+    """Cronometra um trecho da rota como etapa `nome` (histograma e Server-Timing)."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        duracao = time.perf_counter() - inicio
+        rota = request.endpoint if has_request_context() else None
+        REGISTRO.observar('talentflow_etapa_segundos', duracao, (('rota', rota or '-'), ('etapa', nome)))
+        if has_request_context():
+            etapas = g.setdefault('etapas', [])
+            etapas.append((nome, duracao))
+
+if monitoring is not None:
+    class OuvinteMongo(monitoring.CommandListener):
+        """Conta e cronometra os comandos do pymongo (find, aggregate, update...)."""
+
+        def started(self, event):
+            pass
+
+        def succeeded(self, event):
+            REGISTRO.observar('talentflow_mongo_segundos', event.duration_micros / 1e6, (('comando', event.command_name),))
+            REGISTRO.incrementar('talentflow_mongo_comandos_total', (('comando', event.command_name), ('resultado', 'ok')))
+
+        def failed(self, event):
+            REGISTRO.observar('talentflow_mongo_segundos', event.duration_micros / 1e6, (('comando', event.command_name),))
+            REGISTRO.incrementar('talentflow_mongo_comandos_total', (('comando', event.command_name), ('resultado', 'falha')))
+
+    OUVINTE_MONGO = OuvinteMongo()
+else:
+    OUVINTE_MONGO = None
+
+class AmostradorPilhas:
+    """
+    Perfil por amostragem: uma thread lê periodicamente a pilha das threads
+    registradas (sys._current_frames) e conta pilhas no formato "folded".
+    """
+
+    def __init__(self, intervalo=0.005):
+        self.intervalo = intervalo
+        self._ativas = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def iniciar(self, thread_id):
+        pilhas = Counter()
+        with self._lock:
+            self._ativas[thread_id] = pilhas
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._amostrar, name='amostrador-pilhas', daemon=True)
+                self._thread.start()
+        return pilhas
+
+    def parar(self, thread_id):
+        with self._lock:
+            return self._ativas.pop(thread_id, Counter())
+
+    def _amostrar(self):
+        while True:
+            time.sleep(self.intervalo)
+            with self._lock:
+                ativas = list(self._ativas.items())
+            if not ativas:
+                continue
+            quadros = sys._current_frames()
+            for thread_id, pilhas in ativas:
+                quadro = quadros.get(thread_id)
+                if quadro is not None:
+                    pilhas[_pilha(quadro)] += 1
+
+def _pilha(quadro):
+    partes = []
+    while quadro is not None:
+        codigo = quadro.f_code
+        partes.append(f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}:{quadro.f_lineno}")
+        quadro = quadro.f_back
+    return ';'.join(reversed(partes))
+
+def salvar_perfil(pilhas, pasta, rota, duracao):
+    """Grava as pilhas amostradas em `pasta` (uma linha "pilha contagem" por pilha); retorna o caminho."""
+    os.makedirs(pasta, exist_ok=True)
+    caminho = os.path.join(pasta, f"{time.strftime('%Y%m%d-%H%M%S')}-{rota}-{int(duracao * 1000)}ms.folded")
+    with open(caminho, 'w', encoding='utf-8') as f:
+        for pilha, contagem in pilhas.most_common():
+            f.write(f"{pilha} {contagem}\n")
+    return caminho
+
+def instalar(app):
+    """Registra a medição de requisições (e o perfil opcional) no app."""
+    perfil = os.getenv('TALENTFLOW_PROFILER', '').lower() in ('1', 'true', 'sim')
+    limiar = float(os.getenv('TALENTFLOW_PROFILER_LIMIAR_MS', 500)) / 1000
+    pasta = os.getenv('TALENTFLOW_PROFILER_DIR', 'perfis')
+    amostrador = AmostradorPilhas(float(os.getenv('TALENTFLOW_PROFILER_INTERVALO_MS', 5)) / 1000) if perfil else None
+    app.config['AMOSTRADOR'] = amostrador
+
+    def finalizar(inicio, rota, metodo, status, thread_id):
+        duracao = time.perf_counter() - inicio
+        REGISTRO.observar('talentflow_requisicao_segundos', duracao, (('rota', rota), ('metodo', metodo)))
+        REGISTRO.incrementar('talentflow_requisicoes_total', (('rota', rota), ('metodo', metodo), ('status', status)))
+        if amostrador is not None:
+            pilhas = amostrador.parar(thread_id)
+            if duracao >= limiar and pilhas:
+                salvar_perfil(pilhas, pasta, rota, duracao)
+
+    @app.before_request
+    def iniciar_medicao():
+        g.inicio_requisicao = time.perf_counter()
+        if amostrador is not None:
+            amostrador.iniciar(threading.get_ident())
+
+    @app.after_request
+    def registrar_medicao(resposta):
+        inicio = g.pop('inicio_requisicao', None)
+        if inicio is None:
+            return resposta
+        etapas = g.get('etapas')
+        if etapas:
+            resposta.headers['Server-Timing'] = ', '.join(f"{nome};dur={d * 1000:.2f}" for nome, d in etapas)
+
+        # A medição fecha quando o servidor fecha a resposta, depois do
+        # corpo enviado: respostas em fluxo (exportação) contam por inteiro.
+        rota = request.endpoint or 'desconhecida'
+        metodo = request.method
+        status = resposta.status_code
+        thread_id = threading.get_ident()
+        resposta.call_on_close(lambda: finalizar(inicio, rota, metodo, status, thread_id))
+        return resposta
+
+    @app.teardown_request
+    def registrar_excecao(erro=None):
+        # Sem passar por after_request (exceção propagada): conta como 500.
+        inicio = g.pop('inicio_requisicao', None)
+        if inicio is not None:
+            finalizar(inicio, request.endpoint or 'desconhecida', request.method, 500, threading.get_ident())
@@ -0,0 +1,112 @@
+import unicodedata
+from collections import deque
+from functools import lru_cache
+
+@lru_cache(maxsize=8192)
+def _dobrar_caractere(c):
+    """Minúscula sem acento, sempre com um único caractere (preserva posições)."""
+    minuscula = c.lower()
+    if len(minuscula) != 1:
+        minuscula = c
+    base = ''.join(ch for ch in unicodedata.normalize('NFD', minuscula) if not unicodedata.combining(ch))
+    return base[:1] or minuscula
+
+def dobrar_texto(texto):
+    """Minúsculas e sem acentos, com o mesmo comprimento do texto original."""
+    if texto.isascii():
+        return texto.lower()
+    return ''.join(map(_dobrar_caractere, texto))
+
+def _eh_palavra(c):
+    return c.isalnum() or c == '_'
+
+class ExtratorSkills:
+    """
+    Extrator de skills por autômato Aho-Corasick.
+
+    Todas as skills são procuradas em uma única passada pelo texto, qualquer
+    que seja o tamanho do vocabulário. A comparação ignora caixa e acentos
+    ("otimizacao" encontra "otimização") e respeita limites de palavra como o
+    `\\b` das expressões regulares. Em sobreposições vale a ocorrência mais à
+    esquerda e, nela, a mais longa ("power bi" em vez de "bi").
+    """
+
+    def __init__(self, skills, normalizar=None):
+        normalizar = normalizar or (lambda s: s.strip().lower())
+        self._transicoes = [{}]
+        self._falha = [0]
+        self._saidas = [()]
+        for skill in skills:
+            padrao = dobrar_texto(skill.strip())
+            chave = normalizar(skill)
+            if padrao and chave:
+                self._adicionar(padrao, chave)
+        self._construir_falhas()
+
+    def _adicionar(self, padrao, chave):
+        no = 0
+        for c in padrao:
+            proximo = self._transicoes[no].get(c)
+            if proximo is None:
+                proximo = len(self._transicoes)
+                self._transicoes[no][c] = proximo
+                self._transicoes.append({})
+                self._falha.append(0)
+                self._saidas.append(())
+            no = proximo
+        if not self._saidas[no]:
+            self._saidas[no] = ((len(padrao), chave),)
+
+    def _construir_falhas(self):
+        fila = deque(self._transicoes[0].values())
+        while fila:
+            no = fila.popleft()
+            for c, filho in self._transicoes[no].items():
+                fila.append(filho)
+                f = self._falha[no]
+                while f and c not in self._transicoes[f]:
+                    f = self._falha[f]
+                destino = self._transicoes[f].get(c, 0)
+                self._falha[filho] = destino if destino != filho else 0
+                self._saidas[filho] = self._saidas[filho] + self._saidas[self._falha[filho]]
+
+    def encontrar(self, texto):
+        """Ocorrências como (inicio, fim, chave), sem sobreposição, na ordem do texto."""
+        if not texto:
+            return []
+        dobrado = dobrar_texto(texto)
+        transicoes, falha, saidas = self._transicoes, self._falha, self._saidas
+        candidatos = []
+        no = 0
+        tamanho = len(dobrado)
+        for i, c in enumerate(dobrado):
+            while no and c not in transicoes[no]:
+                no = falha[no]
+            no = transicoes[no].get(c, 0)
+            if not saidas[no]:
+                continue
+            fim = i + 1
+            if fim < tamanho and _eh_palavra(dobrado[fim]):
+                continue
+            for comprimento, chave in saidas[no]:
+                inicio = fim - comprimento
+                if inicio > 0 and _eh_palavra(dobrado[inicio - 1]):
+                    continue
+                candidatos.append((inicio, fim, chave))
+
+        candidatos.sort(key=lambda m: (m[0], m[0] - m[1]))
+        ocorrencias = []
+        ultimo_fim = 0
+        for inicio, fim, chave in candidatos:
+            if inicio >= ultimo_fim:
+                ocorrencias.append((inicio, fim, chave))
+                ultimo_fim = fim
+        return ocorrencias
+
+    def extrair(self, texto):
+        """Chaves canônicas encontradas no texto, ordenadas e sem repetição."""
+        return sorted({chave for _, _, chave in self.encontrar(texto)})
+
+    def extrair_lote(self, textos):
+        """`extrair` para vários textos de uma vez (ex.: todas as tarefas de um projeto)."""
+        return [self.extrair(texto or '') for texto in textos]
@@ -0,0 +1,157 @@
+import argparse
+import hashlib
+import json
+import time
+from datetime import datetime
+
+from .extractor import obter_extrator, normalizar_skill
+from .taxonomia import obter_taxonomia
+
+# Marca d'água por projeto: {chave: chave_marca(...), hash, atualizado_em}
+COLECAO_MARCAS = 'descoberta_projetos'
+ORIGEM = 'NLP (projetos)'
+TAMANHO_LOTE = 500
+
+def chave_marca(id_projeto, ocorrencia):
+    """
+    Chave da marca do projeto pela (id_projeto, ocorrência), como no índice de
+    cobertura: a primeira ocorrência usa o próprio id (marcas já gravadas
+    continuam valendo) e as seguintes, '5#2', '5#3'...
+    """
+    return id_projeto if ocorrencia == 0 else f"{id_projeto}#{ocorrencia + 1}"
+
+def assinatura_projeto(projeto, vocabulario):
+    """Hash do que influencia a descoberta: descrições das tarefas, participantes e vocabulário."""
+    conteudo = {
+        'tarefas': [t.get('descricao', '') or '' for t in projeto.get('tarefas', [])],
+        'participantes': sorted(projeto.get('participantes', []), key=str),
+        'vocabulario': vocabulario
+    }
+    return hashlib.sha1(json.dumps(conteudo, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+def descobrir_skills(db, forcar=False, skills=None, ao_gravar=None):
+    """
+    Descobre skills nas tarefas dos projetos e grava nos funcionários participantes.
+
+    Só reprocessa projetos cuja assinatura mudou desde a última execução (use
+    `forcar` para reprocessar tudo). A marca de um projeto com skills
+    encontradas só é gravada quando todos os participantes existem: um
+    funcionário cadastrado depois do projeto recebe as descobertas na
+    próxima execução. Marcas são chaveadas por (id_projeto, ocorrência)
+    (`chave_marca`), então projetos com o mesmo id não se sobrescrevem.
+
+    As descobertas são acumuladas por funcionário em memória e gravadas numa
+    única escrita em lote, sem repetir as que o funcionário já tem. Depois da
+    escrita, `ao_gravar` (opcional) recebe a lista de pares (antes, depois) dos
+    funcionários alterados, ex.: para atualizar agregados.
+    Retorna um relatório com contagens e duração.
+    """
+    inicio = time.perf_counter()
+    taxonomia = obter_taxonomia()
+    if skills is None:
+        extrator = taxonomia.extrator
+        vocabulario = taxonomia.assinatura
+    else:
+        skills = tuple(skills)
+        extrator = obter_extrator(skills)
+        vocabulario = hashlib.sha1('\n'.join(sorted(skills)).encode('utf-8')).hexdigest()
+    hoje = datetime.utcnow().strftime('%Y-%m-%d')
+
+    marcas = {}
+    if not forcar:
+        marcas = db.marcas_descoberta()
+
+    descobertas = {}
+    novas_marcas = {}
+    participantes_marca = {}
+    ocorrencias = {}
+    processados = 0
+    ignorados = 0
+    for projeto in db.listar('projetos', ('id_projeto', 'participantes', 'tarefas.descricao'), TAMANHO_LOTE):
+        id_projeto = projeto.get('id_projeto')
+        chave = chave_marca(id_projeto, ocorrencias.get(id_projeto, 0))
+        ocorrencias[id_projeto] = ocorrencias.get(id_projeto, 0) + 1
+        assinatura = assinatura_projeto(projeto, vocabulario)
+        if id_projeto is not None and marcas.get(chave) == assinatura:
+            ignorados += 1
+            continue
+        processados += 1
+        encontrados = set()
+        for skills_tarefa in extrator.extrair_lote(t.get('descricao', '') for t in projeto.get('tarefas', [])):
+            encontrados.update(skills_tarefa)
+        if encontrados:
+            for pid in projeto.get('participantes', []):
+                descobertas.setdefault(pid, set()).update(encontrados)
+        if id_projeto is not None:
+            novas_marcas[chave] = assinatura
+            if encontrados:
+                participantes_marca[chave] = set(projeto.get('participantes', []))
+
+    operacoes = []
+    pares = []
+    encontrados_na_base = set()
+    if descobertas:
+        campos = ('id', 'habilidades_declaradas', 'habilidades_descobertas')
+        for doc in db.funcionarios_por_id(list(descobertas), campos):
+            encontrados_na_base.add(doc['id'])
+            atuais = doc.get('habilidades_descobertas', []) or []
+            existentes = {normalizar_skill(e.get('skill')) for e in atuais if isinstance(e, dict)}
+            novos = [
+                {'skill': taxonomia.nome(k), 'origem': ORIGEM, 'data': hoje}
+                for k in sorted(descobertas[doc['id']] - existentes)
+            ]
+            if novos:
+                operacoes.append((doc['id'], novos))
+                pares.append((doc, dict(doc, habilidades_descobertas=atuais + novos)))
+
+    atualizados = 0
+    if operacoes:
+        atualizados = db.adicionar_descobertas(operacoes)
+        if ao_gravar is not None:
+            ao_gravar(pares)
+    # Marcas só depois dos funcionários: se a escrita acima falhar, o projeto é refeito.
+    # Projetos com participantes ainda não cadastrados também ficam sem marca.
+    incompletos = [chave for chave, pids in participantes_marca.items() if not pids <= encontrados_na_base]
+    for chave in incompletos:
+        del novas_marcas[chave]
+    if novas_marcas:
+        db.gravar_marcas_descoberta(novas_marcas, hoje)
+
+    return {
+        'projetos_processados': processados,
+        'projetos_ignorados': ignorados,
+        'projetos_incompletos': len(incompletos),
+        'funcionarios_atualizados': atualizados,
+        'documentos_tocados': atualizados + len(novas_marcas),
+        'duracao_s': round(time.perf_counter() - inicio, 3)
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Descoberta incremental de skills nas tarefas dos projetos.')
+    parser.add_argument('--forcar', action='store_true', help='reprocessa todos os projetos, ignorando as marcas')
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    from ..db import conectar
+    from .. import aggregates, indexes
+    from ..cache import incrementar_versao
+    from ..recommendation.recommender import SkillMatcher
+    load_dotenv()
+    db, erro = conectar()
+    if db is None:
+        print(f"Erro de conexão com MongoDB: {erro}")
+        return 1
+    matcher = SkillMatcher(db.listar('vagas'))
+
+    def ao_gravar(pares):
+        indexes.atualizar_campos_derivados(db, [depois for _, depois in pares], matcher)
+        aggregates.registrar_alteracoes(db, pares, matcher)
+
+    relatorio = descobrir_skills(db, forcar=args.forcar, ao_gravar=ao_gravar)
+    if relatorio['funcionarios_atualizados']:
+        incrementar_versao(db)
+    print(json.dumps(relatorio, indent=4, ensure_ascii=False))
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
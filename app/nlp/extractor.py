@@ -1,78 +1,220 @@
-import re
+import argparse
 import json
 import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, as_completed, wait
 from datetime import datetime
+from functools import lru_cache
 
-# Lista de skills conhecidas (pode ser expandida e gerenciada em um arquivo separado)
-SKILLS_CONHECIDAS = [
-    "python", "pandas", "power bi", "bi", "sql", "otimização", "api", "rest",
-    "flask", "java", "spring", "microserviços", "gestão de estoque", "transporte",
-    "sap", "excel", "análise financeira", "contabilidade", "gestão de projetos",
-    "logística", "supply chain management", "liderança", "comunicação", "docker", "django"
-]
+from .aho_corasick import ExtratorSkills
+from .taxonomia import SKILLS_PADRAO, Taxonomia, obter_taxonomia, definir_taxonomia
 
-def extrair_skills_dos_projetos():
+# Chaves das skills canônicas da taxonomia padrão (ver app/nlp/taxonomia.py)
+SKILLS_CONHECIDAS = [chave for chave, _, _ in SKILLS_PADRAO]
+
+def normalizar_skill(s):
+    """Chave canônica da skill pela taxonomia ativa: sem níveis, caixa, acentos e aliases (memoizado)."""
+    return obter_taxonomia().normalizar(s)
+
+def obter_extrator(skills=None):
+    """Extrator compilado uma única vez: o da taxonomia ativa ou, com `skills`, um por vocabulário."""
+    if skills is None:
+        return obter_taxonomia().extrator
+    return _extrator_vocabulario(tuple(skills))
+
+@lru_cache(maxsize=8)
+def _extrator_vocabulario(skills):
+    return ExtratorSkills(skills, normalizar=normalizar_skill)
+
+TAMANHO_LOTE = 500
+ORIGEM_ARQUIVO = "NLP (projetos.json)"
+
+def ler_projetos(caminho, bloco=1 << 20):
+    """
+    Lê os projetos um a um, sem carregar o arquivo inteiro: aceita JSON Lines
+    (um projeto por linha) ou um array JSON, decodificado incrementalmente.
+    """
+    with open(caminho, 'r', encoding='utf-8') as f:
+        inicio = f.read(bloco)
+        conteudo = inicio.lstrip()
+        if not conteudo.startswith('['):
+            f.seek(0)
+            for linha in f:
+                linha = linha.strip()
+                if linha:
+                    yield json.loads(linha)
+            return
+
+        decodificador = json.JSONDecoder()
+        buffer = conteudo[1:]
+        pos = 0
+        fim_arquivo = False
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if buffer.startswith(']', pos):
+                return
+            try:
+                projeto, pos = decodificador.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if fim_arquivo:
+                    raise
+                parte = f.read(bloco)
+                fim_arquivo = not parte
+                buffer = buffer[pos:] + parte
+                pos = 0
+                continue
+            yield projeto
+
+def _em_lotes(itens, tamanho):
+    lote = []
+    for item in itens:
+        lote.append(item)
+        if len(lote) >= tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+def _iniciar_trabalhador(entradas):
+    definir_taxonomia(Taxonomia(entradas))
+
+def _extrair_lote_projetos(projetos):
+    """Descobertas de um lote de projetos: {id do participante: chaves encontradas}."""
+    extrator = obter_extrator()
+    descobertas = {}
+    for projeto in projetos:
+        encontrados = set()
+        for skills_tarefa in extrator.extrair_lote(t.get("descricao", "") for t in projeto.get("tarefas", [])):
+            encontrados.update(skills_tarefa)
+        if encontrados:
+            for participante_id in projeto.get("participantes", []):
+                descobertas.setdefault(participante_id, set()).update(encontrados)
+    return descobertas, len(projetos)
+
+def _mapear_em_paralelo(executor, funcao, lotes, pendentes_max):
+    """Como executor.map, mas com no máximo `pendentes_max` lotes em voo (memória constante)."""
+    pendentes = set()
+    for lote in lotes:
+        pendentes.add(executor.submit(funcao, lote))
+        if len(pendentes) >= pendentes_max:
+            prontos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+            for futuro in prontos:
+                yield futuro.result()
+    for futuro in as_completed(pendentes):
+        yield futuro.result()
+
+def gravar_json_atomico(caminho, dados):
+    """Grava num arquivo temporário da mesma pasta e troca pelo destino com os.replace."""
+    pasta = os.path.dirname(os.path.abspath(caminho))
+    descritor, temporario = tempfile.mkstemp(prefix='.tmp-', suffix='.json', dir=pasta)
+    try:
+        with os.fdopen(descritor, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, indent=4, ensure_ascii=False)
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+def extrair_skills_dos_projetos(caminho_projetos=None, caminho_funcionarios=None, trabalhadores=1, lote=TAMANHO_LOTE):
     """
     Lê os arquivos de projetos e funcionários, extrai as skills das tarefas
-    usando regex e atualiza o JSON de funcionários com as novas habilidades descobertas.
+    com o extrator compilado e atualiza o JSON de funcionários com as novas habilidades descobertas.
+
+    Os projetos são lidos em fluxo (JSON Lines ou array JSON) e processados em
+    lotes; com `trabalhadores` > 1 os lotes vão para um pool de processos. As
+    descobertas são juntadas por funcionário e o arquivo de funcionários é
+    regravado atomicamente, no mesmo formato lido (lista de funcionários, como
+    a do gerador, ou `{"funcionarios": [...]}`). Retorna um relatório ou None
+    se faltar arquivo.
     """
     base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-    caminho_projetos = os.path.join(base_dir, 'data', 'projetos.json')
-    caminho_funcionarios = os.path.join(base_dir, 'data', 'funcionarios.json')
+    caminho_projetos = caminho_projetos or os.path.join(base_dir, 'data', 'projetos.json')
+    caminho_funcionarios = caminho_funcionarios or os.path.join(base_dir, 'data', 'funcionarios.json')
 
     try:
-        with open(caminho_projetos, 'r', encoding='utf-8') as f:
-            projetos = json.load(f)
         with open(caminho_funcionarios, 'r', encoding='utf-8') as f:
             funcionarios_data = json.load(f)
+        projetos = ler_projetos(caminho_projetos)
+        lotes = _em_lotes(projetos, lote)
+        inicio = time.perf_counter()
+
+        descobertas = {}
+        total_projetos = 0
+        if trabalhadores > 1:
+            entradas = obter_taxonomia().entradas()
+            with ProcessPoolExecutor(trabalhadores, initializer=_iniciar_trabalhador, initargs=(entradas,)) as executor:
+                for parcial, n in _mapear_em_paralelo(executor, _extrair_lote_projetos, lotes, trabalhadores * 2):
+                    total_projetos += n
+                    for participante_id, chaves in parcial.items():
+                        descobertas.setdefault(participante_id, set()).update(chaves)
+        else:
+            for parcial, n in map(_extrair_lote_projetos, lotes):
+                total_projetos += n
+                for participante_id, chaves in parcial.items():
+                    descobertas.setdefault(participante_id, set()).update(chaves)
     except FileNotFoundError:
         print("Arquivos de dados não encontrados.")
-        return
-
-    funcionarios = funcionarios_data.get('funcionarios', [])
-    mapa_funcionarios = {func['id']: func for func in funcionarios}
-
-    # Cria uma expressão regular a partir da lista de skills (case-insensitive)
-    regex_skills = r"\b(" + "|".join(re.escape(skill) for skill in SKILLS_CONHECIDAS) + r")\b"
-
-    def normalizar_skill(s):
-        s = s or ''
-        s = re.sub(r"\s*\(.*?\)\s*", '', s)
-        return s.strip().lower()
+        return None
 
+    envelope = None
+    if isinstance(funcionarios_data, dict):
+        envelope = 'funcionarios' if 'funcionarios' in funcionarios_data else next(iter(funcionarios_data), 'funcionarios')
+        funcionarios = funcionarios_data.get(envelope, [])
+    else:
+        funcionarios = funcionarios_data
+    taxonomia = obter_taxonomia()
     hoje = datetime.utcnow().strftime('%Y-%m-%d')
+    atualizados = 0
 
-    for projeto in projetos:
-        for participante_id in projeto.get("participantes", []):
-            if participante_id in mapa_funcionarios:
-                funcionario = mapa_funcionarios[participante_id]
-                existentes = funcionario.get("habilidades_descobertas", [])
-                existentes_map = {normalizar_skill(item.get("skill")) for item in existentes if isinstance(item, dict)}
-
-                novos = set()
-                for tarefa in projeto.get("tarefas", []):
-                    texto_tarefa = tarefa.get("descricao", "").lower()
-                    skills_encontradas = re.findall(regex_skills, texto_tarefa, re.IGNORECASE)
-                    for skill in skills_encontradas:
-                        k = normalizar_skill(skill)
-                        if k and k not in existentes_map:
-                            novos.add(k)
-
-                for k in sorted(novos):
-                    existentes.append({
-                        "skill": k.capitalize(),
-                        "origem": "NLP (projetos.json)",
-                        "data": hoje
-                    })
-
-                funcionario["habilidades_descobertas"] = existentes
+    for funcionario in funcionarios:
+        encontrados = descobertas.get(funcionario.get('id'))
+        if not encontrados:
+            continue
+        existentes = funcionario.get("habilidades_descobertas", [])
+        existentes_map = {normalizar_skill(item.get("skill")) for item in existentes if isinstance(item, dict)}
 
+        novos = {k for k in encontrados if k not in existentes_map}
+        for k in sorted(novos):
+            existentes.append({
+                "skill": taxonomia.nome(k),
+                "origem": ORIGEM_ARQUIVO,
+                "data": hoje
+            })
+        if novos:
+            atualizados += 1
+        funcionario["habilidades_descobertas"] = existentes
+
+    duracao = time.perf_counter() - inicio
+    relatorio = {
+        'projetos': total_projetos,
+        'funcionarios_atualizados': atualizados,
+        'duracao_s': round(duracao, 3),
+        'projetos_por_s': round(total_projetos / duracao, 1) if duracao else None
+    }
     try:
-        with open(caminho_funcionarios, 'w', encoding='utf-8') as f:
-            json.dump({"funcionarios": funcionarios}, f, indent=4, ensure_ascii=False)
+        gravar_json_atomico(caminho_funcionarios, dict(funcionarios_data, **{envelope: funcionarios}) if envelope else funcionarios)
         print("Habilidades extraídas e atualizadas com sucesso!")
-    except IOError as e:
+    except (IOError, OSError) as e:
         print(f"Erro ao salvar o arquivo de funcionários: {e}")
+    return relatorio
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Extrai skills das tarefas dos projetos (arquivos JSON) para o JSON de funcionários.')
+    parser.add_argument('--projetos', help='projetos em JSON Lines ou array JSON (padrão: app/data/projetos.json)')
+    parser.add_argument('--funcionarios', help='JSON de funcionários a atualizar, lista ou {"funcionarios": [...]} (padrão: app/data/funcionarios.json)')
+    parser.add_argument('--trabalhadores', type=int, default=os.cpu_count() or 1, help='processos de extração (1 = no próprio processo)')
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help='projetos por lote enviado a cada processo')
+    args = parser.parse_args(argv)
+
+    relatorio = extrair_skills_dos_projetos(args.projetos, args.funcionarios, max(1, args.trabalhadores), max(1, args.lote))
+    if relatorio is None:
+        return 1
+    print(f"{relatorio['projetos']} projetos em {relatorio['duracao_s']}s "
+          f"({relatorio['projetos_por_s']} projetos/s), {relatorio['funcionarios_atualizados']} funcionários atualizados")
+    return 0
 
 if __name__ == '__main__':
-    extrair_skills_dos_projetos()
+    raise SystemExit(main())
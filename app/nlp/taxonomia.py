@@ -0,0 +1,222 @@
+"""
+Taxonomia canônica de skills.
+
+Cada skill canônica tem uma chave (a forma normalizada usada nos índices e
+agregados), um nome de exibição e aliases. A normalização remove níveis entre
+parênteses, ignora caixa, acentos e separadores ("Power-BI", "powerbi" e
+"POWER BI (avançado)" viram "power bi") e resolve aliases
+("microservices" -> "microserviços"). Skills fora da taxonomia ficam com a
+forma dobrada (minúsculas, sem acentos).
+
+Cada chave recebe um id inteiro interno ao processo, para que conjuntos de
+skills possam ser guardados como máscaras de bits (`mascara`).
+
+A taxonomia ativa é a padrão abaixo, ou a carregada de um JSON ou da coleção
+`taxonomia_skills` (ver TALENTFLOW_TAXONOMIA no README).
+
+Uso:
+    python -m app.nlp.taxonomia --exportar taxonomia.json
+    python -m app.nlp.taxonomia --importar taxonomia.json     # grava na coleção do MongoDB
+"""
+import argparse
+import hashlib
+import json
+import re
+import threading
+from functools import lru_cache
+
+from .aho_corasick import dobrar_texto, ExtratorSkills
+
+COLECAO = 'taxonomia_skills'
+
+# (chave, nome de exibição, aliases)
+SKILLS_PADRAO = [
+    ("python", "Python", ["python3", "python 3"]),
+    ("pandas", "Pandas", []),
+    ("power bi", "Power BI", ["powerbi", "microsoft power bi"]),
+    ("bi", "BI", ["business intelligence"]),
+    ("sql", "SQL", []),
+    ("otimização", "Otimização", ["otimizações", "optimization"]),
+    ("api", "API", ["apis"]),
+    ("rest", "REST", ["restful"]),
+    ("flask", "Flask", []),
+    ("java", "Java", []),
+    ("spring", "Spring", ["spring boot"]),
+    ("microserviços", "Microserviços", ["micro serviços", "microservices", "microsserviços"]),
+    ("gestão de estoque", "Gestão de estoque", ["gestão de estoques", "controle de estoque"]),
+    ("transporte", "Transporte", []),
+    ("sap", "SAP", ["sap erp"]),
+    ("excel", "Excel", ["microsoft excel", "ms excel"]),
+    ("análise financeira", "Análise financeira", []),
+    ("contabilidade", "Contabilidade", []),
+    ("gestão de projetos", "Gestão de projetos", ["gerenciamento de projetos", "project management"]),
+    ("logística", "Logística", []),
+    ("supply chain management", "Supply chain management", ["supply chain", "scm"]),
+    ("liderança", "Liderança", []),
+    ("comunicação", "Comunicação", []),
+    ("docker", "Docker", []),
+    ("django", "Django", []),
+]
+
+_PARENTESES = re.compile(r"\s*\(.*?\)\s*")
+_SEPARADORES = re.compile(r"[\s\-_]+")
+
+@lru_cache(maxsize=65536)
+def dobrar_skill(s):
+    """Forma de comparação: sem parênteses, minúscula, sem acentos, separadores como um espaço."""
+    s = _PARENTESES.sub(' ', s or '')
+    return _SEPARADORES.sub(' ', dobrar_texto(s)).strip()
+
+if hasattr(int, 'bit_count'):
+    def contar_bits(mascara):
+        return mascara.bit_count()
+else:
+    def contar_bits(mascara):
+        return bin(mascara).count('1')
+
+class Taxonomia:
+    """Skills canônicas, tabela de aliases, normalizador memoizado e ids inteiros."""
+
+    LIMITE_CACHE = 65536
+
+    def __init__(self, entradas):
+        self._nomes = {}
+        self._aliases_por_chave = {}
+        self._aliases = {}
+        self._formas = []
+        self._ids = {}
+        self._chaves = []
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._extrator = None
+        for entrada in entradas:
+            if isinstance(entrada, dict):
+                nome = entrada['nome']
+                chave = entrada.get('chave') or nome
+                aliases = entrada.get('aliases', [])
+            else:
+                chave, nome, aliases = entrada
+            chave = chave.strip().lower()
+            if chave in self._nomes:
+                continue
+            self._nomes[chave] = nome
+            self._aliases_por_chave[chave] = list(aliases)
+            self.id(chave)
+            for forma in [chave, nome] + list(aliases):
+                self._aliases.setdefault(dobrar_skill(forma), chave)
+                self._formas.append(forma)
+
+    def normalizar(self, s):
+        """Chave canônica da skill `s` (memoizado)."""
+        chave = self._cache.get(s)
+        if chave is None:
+            dobrada = dobrar_skill(s)
+            chave = self._aliases.get(dobrada, dobrada)
+            if len(self._cache) >= self.LIMITE_CACHE:
+                self._cache.clear()
+            self._cache[s] = chave
+        return chave
+
+    def id(self, chave):
+        """Id inteiro (interno ao processo) da chave, atribuído no primeiro uso."""
+        i = self._ids.get(chave)
+        if i is None:
+            with self._lock:
+                i = self._ids.get(chave)
+                if i is None:
+                    i = self._ids[chave] = len(self._chaves)
+                    self._chaves.append(chave)
+        return i
+
+    def chave(self, i):
+        return self._chaves[i]
+
+    def mascara(self, chaves):
+        """Conjunto de chaves como máscara de bits (um int), pelos ids."""
+        mascara = 0
+        for chave in chaves:
+            mascara |= 1 << self.id(chave)
+        return mascara
+
+    def chaves_da_mascara(self, mascara):
+        chaves = set()
+        i = 0
+        while mascara:
+            if mascara & 1:
+                chaves.add(self._chaves[i])
+            mascara >>= 1
+            i += 1
+        return chaves
+
+    def nome(self, chave):
+        """Nome de exibição da chave (canônico, ou a chave capitalizada se fora da taxonomia)."""
+        return self._nomes.get(chave) or chave.capitalize()
+
+    @property
+    def conhecidas(self):
+        """Chaves das skills canônicas, na ordem da taxonomia."""
+        return list(self._nomes)
+
+    @property
+    def extrator(self):
+        """Extrator Aho-Corasick sobre nomes, chaves e aliases, que devolve chaves canônicas."""
+        if self._extrator is None:
+            self._extrator = ExtratorSkills(self._formas, normalizar=self.normalizar)
+        return self._extrator
+
+    @property
+    def assinatura(self):
+        """Hash das entradas: muda quando skills ou aliases mudam (para reprocessar derivados)."""
+        return hashlib.sha1(json.dumps(self.entradas(), ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def entradas(self):
+        return [{'chave': chave, 'nome': nome, 'aliases': self._aliases_por_chave[chave]} for chave, nome in self._nomes.items()]
+
+def carregar_json(caminho):
+    """Taxonomia de um JSON: lista de {"chave", "nome", "aliases"} (chave opcional)."""
+    with open(caminho, encoding='utf-8') as f:
+        return Taxonomia(json.load(f))
+
+def carregar_mongo(db):
+    """Taxonomia gravada no banco (coleção taxonomia_skills: {chave, nome, aliases}); None se vazia."""
+    docs = db.ler_taxonomia()
+    return Taxonomia(docs) if docs else None
+
+def salvar_mongo(db, taxonomia):
+    db.gravar_taxonomia(taxonomia.entradas())
+
+_ATIVA = Taxonomia(SKILLS_PADRAO)
+
+def obter_taxonomia():
+    return _ATIVA
+
+def definir_taxonomia(taxonomia):
+    """Troca a taxonomia ativa do processo (ex.: carregada do MongoDB na inicialização)."""
+    global _ATIVA
+    _ATIVA = taxonomia
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Exporta ou importa a taxonomia de skills.')
+    parser.add_argument('--exportar', metavar='ARQUIVO', help='grava a taxonomia padrão em JSON')
+    parser.add_argument('--importar', metavar='ARQUIVO', help=f'grava a taxonomia do JSON na coleção {COLECAO}')
+    args = parser.parse_args(argv)
+
+    if args.exportar:
+        with open(args.exportar, 'w', encoding='utf-8') as f:
+            json.dump(Taxonomia(SKILLS_PADRAO).entradas(), f, indent=4, ensure_ascii=False)
+        print(args.exportar)
+    if args.importar:
+        from dotenv import load_dotenv
+        from ..db import conectar
+        load_dotenv()
+        db, erro = conectar()
+        if db is None:
+            print(f"Erro de conexão com MongoDB: {erro}")
+            return 1
+        taxonomia = carregar_json(args.importar)
+        salvar_mongo(db, taxonomia)
+        print(f"{len(taxonomia.conhecidas)} skills gravadas em {COLECAO}")
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
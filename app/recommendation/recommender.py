@@ -1,42 +1,539 @@
+import argparse
 import json
+import math
 import os
+import re
+import heapq
+import threading
+from collections import Counter
+from functools import lru_cache
 
-def carregar_dados():
-    """Carrega os dados de funcionários e vagas a partir dos arquivos JSON."""
-    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-    caminho_funcionarios = os.path.join(base_dir, 'data', 'funcionarios.json')
-    caminho_vagas = os.path.join(base_dir, 'data', 'vagas.json')
+from ..nlp.extractor import normalizar_skill
+from ..nlp.taxonomia import obter_taxonomia, contar_bits
+from ..nlp.aho_corasick import dobrar_texto
 
+@lru_cache(maxsize=1)
+def _numpy():
+    """NumPy, importado só no primeiro cálculo em lote (encurta a inicialização); None se ausente."""
     try:
-        with open(caminho_funcionarios, 'r', encoding='utf-8') as f:
-            funcionarios = json.load(f)
-        with open(caminho_vagas, 'r', encoding='utf-8') as f:
-            vagas = json.load(f)
-        return funcionarios, vagas
-    except FileNotFoundError:
-        return None, None
-
-def recomendar_vagas(id_funcionario):
+        import numpy
+        return numpy
+    except Exception:
+        return None
+
+FAIXAS_LABELS = ["0-20", "21-40", "41-60", "61-80", "81-100"]
+FAIXAS_LIMITES = [20, 40, 60, 80]
+
+def faixa_compatibilidade(valor):
+    """Índice da faixa (0-20 ... 81-100) de uma compatibilidade."""
+    for i, limite in enumerate(FAIXAS_LIMITES):
+        if valor <= limite:
+            return i
+    return len(FAIXAS_LIMITES)
+
+def skills_do_funcionario(funcionario):
+    """Mapa skill normalizada -> texto original (declaradas + descobertas)."""
+    habilidades_decl = list(funcionario.get('habilidades_declaradas', []))
+    habilidades_desc = [h['skill'] for h in funcionario.get('habilidades_descobertas', [])]
+    mapa = {}
+    for s in habilidades_decl + habilidades_desc:
+        mapa[normalizar_skill(s)] = s
+    return mapa
+
+def chaves_do_funcionario(funcionario):
+    """Skills normalizadas do funcionário; usa as pré-calculadas dos registros do snapshot (app.registros)."""
+    chaves = getattr(funcionario, 'skills', None)
+    if chaves is None:
+        chaves = skills_do_funcionario(funcionario).keys()
+    return chaves
+
+class SkillMatcher:
     """
-    Gera recomendações de vagas para um funcionário específico com base em suas habilidades.
+    Motor de compatibilidade funcionário x vagas.
+
+    Normaliza o catálogo de vagas uma única vez e monta um índice invertido
+    skill normalizada -> vagas, com o tamanho de cada requisito pré-calculado.
+    Pontuar um funcionário visita apenas as vagas que têm ao menos uma skill
+    em comum com ele.
+    """
+
+    def __init__(self, vagas):
+        vagas = list(vagas)
+        self._indexar(vagas, [{normalizar_skill(s): s for s in vaga.get('habilidades_requeridas', [])} for vaga in vagas])
+
+    @classmethod
+    def de_requisitos(cls, vagas, requisitos):
+        """
+        Matcher sobre skills já normalizadas (ex.: lidas do disco por
+        app.indice_disco): `requisitos[i]` é o mapa chave -> texto original da vaga i.
+        """
+        matcher = cls.__new__(cls)
+        matcher._indexar(list(vagas), requisitos)
+        return matcher
+
+    def _indexar(self, vagas, requisitos):
+        self.vagas = vagas
+        self.requisitos = requisitos
+        self.tamanhos = []
+        self.indice = {}
+        for i, mapa_vaga in enumerate(requisitos):
+            self.tamanhos.append(len(mapa_vaga))
+            for k in mapa_vaga:
+                self.indice.setdefault(k, []).append(i)
+        self._vocabulario = None
+        self._requisitos_matriz = None
+        self._tamanhos_matriz = None
+        self._vagas_vazias = None
+
+    def contar_comuns(self, chaves_func):
+        """Retorna {indice_vaga: quantidade de skills em comum} só para vagas tocadas."""
+        comuns = {}
+        for k in chaves_func:
+            for i in self.indice.get(k, ()):
+                comuns[i] = comuns.get(i, 0) + 1
+        return comuns
+
+    def compatibilidade(self, i, n_comuns):
+        return round((n_comuns / self.tamanhos[i]) * 100)
+
+    def recomendar(self, funcionario, limiar=None):
+        """
+        Vagas com ao menos uma skill em comum, da mais para a menos compatível.
+        Com `limiar`, mantém só as de compatibilidade estritamente maior.
+        """
+        chaves_func = chaves_do_funcionario(funcionario)
+        recomendacoes = []
+        for i, n in sorted(self.contar_comuns(chaves_func).items()):
+            compatibilidade = self.compatibilidade(i, n)
+            if limiar is not None and compatibilidade <= limiar:
+                continue
+            recomendacoes.append(self.recomendacao(i, chaves_func, compatibilidade))
+        recomendacoes.sort(key=lambda x: x['compatibilidade'], reverse=True)
+        return recomendacoes
+
+    def recomendacao(self, i, chaves_func, compatibilidade=None):
+        """Vaga `i` frente às skills do funcionário: compatibilidade exata e skills em comum/a desenvolver."""
+        vaga = self.vagas[i]
+        mapa_vaga = self.requisitos[i]
+        chaves_vaga = set(mapa_vaga.keys())
+        chaves_comuns = chaves_vaga.intersection(chaves_func)
+        if compatibilidade is None:
+            compatibilidade = self.compatibilidade(i, len(chaves_comuns)) if self.tamanhos[i] else 0
+        return {
+            "id": vaga['id'],
+            "titulo": vaga['titulo'],
+            "compatibilidade": compatibilidade,
+            "habilidades_em_comum": [mapa_vaga[k] for k in sorted(chaves_comuns)],
+            "habilidades_a_desenvolver": [mapa_vaga[k] for k in sorted(chaves_vaga - chaves_comuns)]
+        }
+
+    def melhor_compatibilidade(self, funcionario):
+        """Maior compatibilidade do funcionário e a área da primeira vaga que a atinge."""
+        chaves_func = chaves_do_funcionario(funcionario)
+        melhor = 0
+        melhor_area = ''
+        for i, n in sorted(self.contar_comuns(chaves_func).items()):
+            comp = self.compatibilidade(i, n)
+            if comp > melhor:
+                melhor = comp
+                melhor_area = self.vagas[i].get('area', '')
+        return melhor, melhor_area
+
+    def melhores_em_lote(self, funcionarios, bloco=2048):
+        """
+        Melhor compatibilidade e área de cada funcionário de uma vez.
+
+        Com NumPy, funcionários e vagas viram matrizes booleanas sobre o
+        vocabulário de skills das vagas e a contagem de skills em comum sai de
+        um produto de matrizes por bloco de funcionários. Sem NumPy, cai no
+        índice invertido de `melhor_compatibilidade`.
+        """
+        funcionarios = list(funcionarios)
+        if _numpy() is None or not funcionarios:
+            pares = [self.melhor_compatibilidade(f) for f in funcionarios]
+            return [p[0] for p in pares], [p[1] for p in pares]
+        melhores, indices = self._melhores_matriz(funcionarios, bloco)
+        areas = [self.vagas[i].get('area', '') if m > 0 else '' for m, i in zip(melhores.tolist(), indices.tolist())]
+        return melhores.tolist(), areas
+
+    def resumo_em_lote(self, funcionarios, bloco=2048):
+        """
+        Indicadores agregados da força de trabalho: melhor compatibilidade por
+        funcionário, contagem por área da melhor vaga e histograma por faixa.
+        """
+        np = _numpy()
+        funcionarios = list(funcionarios)
+        if np is None or not funcionarios:
+            melhores, areas = self.melhores_em_lote(funcionarios)
+            area_counts = {}
+            distribuicao = [0] * len(FAIXAS_LABELS)
+            for melhor, area in zip(melhores, areas):
+                distribuicao[faixa_compatibilidade(melhor)] += 1
+                if area:
+                    area_counts[area] = area_counts.get(area, 0) + 1
+            return {"melhores": melhores, "areas": areas, "area_counts": area_counts, "distribuicao": distribuicao}
+
+        melhores, indices = self._melhores_matriz(funcionarios, bloco)
+        nomes_area = []
+        codigo_area = {}
+        codigos_vaga = np.full(len(self.vagas), -1, dtype=np.int64)
+        for i, vaga in enumerate(self.vagas):
+            area = vaga.get('area', '')
+            if not area:
+                continue
+            if area not in codigo_area:
+                codigo_area[area] = len(nomes_area)
+                nomes_area.append(area)
+            codigos_vaga[i] = codigo_area[area]
+        codigos = np.where(melhores > 0, codigos_vaga[indices], -1) if len(self.vagas) else np.full(len(funcionarios), -1)
+
+        # Contagem por área mantendo a ordem de primeira ocorrência.
+        validos = codigos[codigos >= 0]
+        area_counts = {}
+        if validos.size:
+            unicos, primeiros, contagens = np.unique(validos, return_index=True, return_counts=True)
+            for j in np.argsort(primeiros, kind='stable'):
+                area_counts[nomes_area[unicos[j]]] = int(contagens[j])
+
+        faixas = np.searchsorted(np.asarray(FAIXAS_LIMITES), melhores, side='left')
+        distribuicao = np.bincount(faixas, minlength=len(FAIXAS_LABELS)).tolist()
+        areas = [self.vagas[i].get('area', '') if m > 0 else '' for m, i in zip(melhores.tolist(), indices.tolist())]
+        return {"melhores": melhores.tolist(), "areas": areas, "area_counts": area_counts, "distribuicao": distribuicao}
+
+    def _matriz_vagas(self):
+        np = _numpy()
+        if self._vocabulario is None:
+            self._vocabulario = {k: j for j, k in enumerate(self.indice)}
+            requisitos = np.zeros((len(self._vocabulario), len(self.vagas)), dtype=np.float32)
+            for k, j in self._vocabulario.items():
+                requisitos[j, self.indice[k]] = 1
+            self._requisitos_matriz = requisitos
+            tamanhos = np.asarray(self.tamanhos, dtype=np.float64)
+            self._vagas_vazias = tamanhos == 0
+            tamanhos[self._vagas_vazias] = 1
+            self._tamanhos_matriz = tamanhos
+        return self._vocabulario, self._requisitos_matriz
+
+    def _melhores_matriz(self, funcionarios, bloco):
+        np = _numpy()
+        vocabulario, requisitos = self._matriz_vagas()
+        total = len(funcionarios)
+        melhores = np.zeros(total, dtype=np.int64)
+        indices = np.zeros(total, dtype=np.int64)
+        if not self.vagas:
+            return melhores, indices
+        for inicio in range(0, total, bloco):
+            lote = funcionarios[inicio:inicio + bloco]
+            linhas, colunas = [], []
+            for r, f in enumerate(lote):
+                for k in chaves_do_funcionario(f):
+                    j = vocabulario.get(k)
+                    if j is not None:
+                        linhas.append(r)
+                        colunas.append(j)
+            skills = np.zeros((len(lote), len(vocabulario)), dtype=np.float32)
+            skills[linhas, colunas] = 1
+            comuns = skills @ requisitos
+            # Mesma conta de round(len(comuns) / len(mapa_vaga) * 100), em float64.
+            comp = np.rint((comuns.astype(np.float64) / self._tamanhos_matriz) * 100)
+            comp[:, self._vagas_vazias] = -1
+            indices[inicio:inicio + len(lote)] = comp.argmax(axis=1)
+            melhores[inicio:inicio + len(lote)] = np.maximum(comp.max(axis=1), 0)
+        return melhores, indices
+
+class IndiceCandidatos:
+    """
+    Matching reverso: dada uma vaga, os funcionários mais compatíveis.
+
+    Mantém uma lista de postagem skill normalizada -> funcionários. Para uma
+    vaga com r skills e limiar L, um funcionário só passa do limiar com ao
+    menos m skills em comum, e então aparece obrigatoriamente em uma das
+    r - m + 1 listas mais curtas; só esses são pontuados (filtro de prefixo).
+    As skills de cada funcionário ficam como máscara de bits sobre os ids da
+    taxonomia, e as skills em comum com a vaga saem de um AND e uma contagem
+    de bits. O top-K sai de um heap de tamanho K.
+    """
+
+    def __init__(self, funcionarios):
+        self.funcionarios = list(funcionarios)
+        self.taxonomia = obter_taxonomia()
+        self.skills = []
+        self.postagens = {}
+        for i, funcionario in enumerate(self.funcionarios):
+            chaves = chaves_do_funcionario(funcionario)
+            self.skills.append(self.taxonomia.mascara(chaves))
+            for k in chaves:
+                self.postagens.setdefault(k, []).append(i)
+
+    @classmethod
+    def de_estruturas(cls, funcionarios, skills, postagens, taxonomia=None):
+        """
+        Índice sobre estruturas já prontas (ex.: carregadas do disco por
+        app.indice_disco): `skills[i]` é a máscara de skills do funcionário i,
+        `postagens.get(chave, ())` a sequência de posições e `taxonomia` o
+        mapeamento chave <-> bit das máscaras (`mascara`, `chaves_da_mascara`).
+        """
+        indice = cls.__new__(cls)
+        indice.funcionarios = list(funcionarios)
+        indice.taxonomia = taxonomia or obter_taxonomia()
+        indice.skills = skills
+        indice.postagens = postagens
+        return indice
+
+    def chaves(self, i):
+        """Conjunto de chaves de skill do funcionário na posição i."""
+        return self.taxonomia.chaves_da_mascara(self.skills[i])
+
+    @staticmethod
+    def minimo_em_comum(total_requeridas, limiar):
+        """Menor número de skills em comum cuja compatibilidade passa do limiar."""
+        for c in range(1, total_requeridas + 1):
+            if round((c / total_requeridas) * 100) > limiar:
+                return c
+        return None
+
+    def candidatos(self, vaga, k=10, limiar=0):
+        mapa_vaga = {normalizar_skill(s): s for s in vaga.get('habilidades_requeridas', [])}
+        chaves_vaga = set(mapa_vaga.keys())
+        total = len(chaves_vaga)
+        if not total or k <= 0:
+            return []
+        minimo = self.minimo_em_comum(total, limiar)
+        if minimo is None:
+            return []
+
+        por_tamanho = sorted(chaves_vaga, key=lambda c: len(self.postagens.get(c, ())))
+        vistos = set()
+        for chave in por_tamanho[:total - minimo + 1]:
+            vistos.update(self.postagens.get(chave, ()))
+
+        mascara_vaga = self.taxonomia.mascara(chaves_vaga)
+        heap = []
+        for i in vistos:
+            n = contar_bits(self.skills[i] & mascara_vaga)
+            if n < minimo:
+                continue
+            item = (round((n / total) * 100), -i)
+            if len(heap) < k:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+
+        resultado = []
+        for compatibilidade, neg_i in sorted(heap, reverse=True):
+            funcionario = self.funcionarios[-neg_i]
+            chaves_comuns = self.taxonomia.chaves_da_mascara(self.skills[-neg_i] & mascara_vaga)
+            resultado.append({
+                "id": funcionario.get('id'),
+                "nome": funcionario.get('nome'),
+                "cargo": funcionario.get('cargo'),
+                "compatibilidade": compatibilidade,
+                "habilidades_em_comum": [mapa_vaga[c] for c in sorted(chaves_comuns)],
+                "habilidades_a_desenvolver": [mapa_vaga[c] for c in sorted(chaves_vaga - chaves_comuns)]
+            })
+        return resultado
+
+STOPWORDS = frozenset("""
+a o as os um uma uns umas de do da dos das em no na nos nas por para pelo pela pelos pelas com sem
+e ou que se ao aos como mais menos sobre entre ate apos sua seu suas seus the and of to in for with on
+""".split())
+_TOKEN = re.compile(r"\w[\w+#]*")
+PESO_SKILL = 2.0
+PESO_PROJETOS = 0.5
+
+def termos_texto(texto, extrator=None):
+    """Frequência dos termos de um texto livre: palavras dobradas e, via extrator, skills canônicas ("skill:<chave>")."""
+    termos = Counter(t for t in _TOKEN.findall(dobrar_texto(texto or '')) if len(t) > 1 and t not in STOPWORDS and not t.isdigit())
+    for chave in (extrator or obter_taxonomia().extrator).extrair(texto or ''):
+        termos['skill:' + chave] += PESO_SKILL
+    return termos
+
+def termos_skills(skills):
+    """Frequência dos termos de uma lista de skills: a chave canônica pesa PESO_SKILL, mais as palavras do nome."""
+    termos = Counter()
+    for s in skills:
+        chave = normalizar_skill(s)
+        if not chave:
+            continue
+        termos['skill:' + chave] += PESO_SKILL
+        termos.update(t for t in _TOKEN.findall(dobrar_texto(s)) if len(t) > 1 and t not in STOPWORDS)
+    return termos
+
+def _vetor(termos, idf):
+    """Vetor TF-IDF esparso ({termo: peso}) normalizado (L2), com tf sublinear; termos fora do vocabulário são ignorados."""
+    vetor = {}
+    for termo, tf in termos.items():
+        peso = idf.get(termo)
+        if peso and tf > 0:
+            vetor[termo] = (1 + math.log(tf)) * peso
+    norma = math.sqrt(sum(p * p for p in vetor.values()))
+    return {t: p / norma for t, p in vetor.items()} if norma else {}
+
+class IndiceSemantico:
     """
-    funcionarios, vagas = carregar_dados()
-    if funcionarios is None or vagas is None:
-        return {"erro": "Arquivos de dados não encontrados."}
+    Compatibilidade semântica opcional por TF-IDF esparso, sem serviço externo.
 
-    funcionario_alvo = None
-    for f in funcionarios:
-        if f['id'] == id_funcionario:
-            funcionario_alvo = f
-            break
+    Vagas (título, descrição e skills requeridas) e projetos (tarefas) viram
+    vetores TF-IDF sobre palavras dobradas e skills canônicas; o perfil de um
+    funcionário junta as skills dele e, com peso menor, as tarefas dos projetos
+    de que participa. A similaridade é o cosseno, acumulado por uma lista
+    invertida termo -> vagas, então só vagas com algum termo em comum são
+    visitadas.
 
+    É um índice do processo: a tokenização de cada vaga e projeto fica em
+    cache e só é refeita quando o conteúdo muda. `atualizar` devolve um
+    ModeloSemantico imutável para a versão atual dos dados.
+    """
+
+    def __init__(self):
+        self._termos = {}
+        self._lock = threading.Lock()
+        self.tokenizacoes = 0
+
+    def _termos_doc(self, chave, conteudo, calcular):
+        atual = self._termos.get(chave)
+        if atual is not None and atual[0] == conteudo:
+            return atual[1]
+        termos = calcular()
+        self._termos[chave] = (conteudo, termos)
+        self.tokenizacoes += 1
+        return termos
+
+    def atualizar(self, vagas, projetos):
+        with self._lock:
+            extrator = obter_taxonomia().extrator
+            vistos = set()
+            ocorrencias = Counter()
+            termos_vagas = []
+            for vaga in vagas:
+                chave = self._chave('vaga', vaga.get('id'), ocorrencias)
+                vistos.add(chave)
+                conteudo = (vaga.get('titulo') or '', vaga.get('descricao') or '', tuple(vaga.get('habilidades_requeridas', ())))
+                termos_vagas.append(self._termos_doc(chave, conteudo, lambda: termos_texto(f"{conteudo[0]}\n{conteudo[1]}", extrator) + termos_skills(conteudo[2])))
+            termos_projetos = []
+            participacoes = {}
+            for projeto in projetos:
+                chave = self._chave('projeto', projeto.get('id_projeto'), ocorrencias)
+                vistos.add(chave)
+                conteudo = '\n'.join(t.get('descricao', '') or '' for t in projeto.get('tarefas', ()))
+                for pid in projeto.get('participantes', ()):
+                    participacoes.setdefault(pid, []).append(len(termos_projetos))
+                termos_projetos.append(self._termos_doc(chave, conteudo, lambda: termos_texto(conteudo, extrator)))
+            for chave in set(self._termos) - vistos:
+                del self._termos[chave]
+        return ModeloSemantico(termos_vagas, termos_projetos, participacoes)
+
+    @staticmethod
+    def _chave(tipo, id_doc, ocorrencias):
+        """(tipo, id, ocorrência), como no índice de cobertura: documentos com o mesmo id não dividem a entrada do cache."""
+        ocorrencia = ocorrencias[(tipo, id_doc)]
+        ocorrencias[(tipo, id_doc)] += 1
+        return (tipo, id_doc, ocorrencia)
+
+    def estatisticas(self):
+        return {'documentos': len(self._termos), 'tokenizacoes': self.tokenizacoes}
+
+class ModeloSemantico:
+    """
+    Vetores TF-IDF das vagas e dos projetos numa versão dos dados (somente
+    leitura, exceto o cache de perfis). Vagas e projetos são indexados pela
+    posição na lista; `participacoes` mapeia o id do funcionário para as
+    posições dos projetos de que participa.
+    """
+
+    def __init__(self, termos_vagas, termos_projetos, participacoes):
+        documentos = list(termos_vagas) + list(termos_projetos)
+        df = Counter()
+        for termos in documentos:
+            df.update(termos.keys())
+        total = len(documentos)
+        self.idf = {t: math.log((1 + total) / (1 + n)) + 1 for t, n in df.items()}
+        self.invertido = {}
+        for i, termos in enumerate(termos_vagas):
+            for termo, peso in _vetor(termos, self.idf).items():
+                self.invertido.setdefault(termo, []).append((i, peso))
+        self.termos_projetos = termos_projetos
+        self.participacoes = participacoes
+        self.total_vagas = len(termos_vagas)
+        self._perfis = {}
+        self._lock = threading.Lock()
+
+    def vetor_perfil(self, funcionario):
+        """Vetor do funcionário (skills + tarefas dos projetos), em cache por id."""
+        id_funcionario = funcionario.get('id')
+        vetor = self._perfis.get(id_funcionario)
+        if vetor is None:
+            habilidades = list(funcionario.get('habilidades_declaradas', [])) + [h.get('skill') for h in funcionario.get('habilidades_descobertas', [])]
+            termos = termos_skills(s for s in habilidades if s)
+            for posicao in self.participacoes.get(id_funcionario, ()):
+                for termo, tf in self.termos_projetos[posicao].items():
+                    termos[termo] += PESO_PROJETOS * tf
+            vetor = _vetor(termos, self.idf)
+            with self._lock:
+                self._perfis[id_funcionario] = vetor
+        return vetor
+
+    def similaridades(self, vetor):
+        """{índice da vaga: cosseno} para as vagas com algum termo em comum com `vetor`."""
+        pontuacoes = {}
+        for termo, peso in vetor.items():
+            for i, peso_vaga in self.invertido.get(termo, ()):
+                pontuacoes[i] = pontuacoes.get(i, 0.0) + peso * peso_vaga
+        return pontuacoes
+
+    def recomendar(self, funcionario, matcher, k=10, limiar=None):
+        """
+        As `k` vagas mais similares ao perfil, com a similaridade (0-100) ao
+        lado da compatibilidade exata do `matcher` (construído sobre as mesmas
+        vagas, na mesma ordem). Com `limiar`, só similaridades maiores que ele.
+        """
+        pontuacoes = self.similaridades(self.vetor_perfil(funcionario))
+        melhores = heapq.nlargest(k, pontuacoes.items(), key=lambda p: (p[1], -p[0]))
+        chaves_func = chaves_do_funcionario(funcionario)
+        recomendacoes = []
+        for i, cosseno in melhores:
+            similaridade = round(cosseno * 100)
+            if limiar is not None and similaridade <= limiar:
+                continue
+            recomendacoes.append(dict(matcher.recomendacao(i, chaves_func), similaridade=similaridade))
+        return recomendacoes
+
+    def recomendar_em_lote(self, funcionarios, matcher, k=10, limiar=None):
+        return [self.recomendar(f, matcher, k, limiar) for f in funcionarios]
+
+def abrir_banco():
+    """
+    Banco do backend configurado (TALENTFLOW_BANCO: mongo, json ou sqlite). Sem
+    nenhum configurado, os arquivos JSON de app/data, como antes (só leitura).
+    """
+    from ..db import conectar
+    from .. import armazenamento
+    db, erro = conectar()
+    if db is None and not os.getenv('TALENTFLOW_BANCO') and not os.getenv('MONGODB_URI'):
+        return armazenamento.abrir('json', armazenamento.PASTA_ORIGEM, somente_leitura=True), None
+    return db, erro
+
+def recomendar_vagas(id_funcionario, db=None):
+    """
+    Gera recomendações de vagas para um funcionário específico com base em suas habilidades.
+
+    O funcionário é lido por id com uma consulta pontual ao índice `id` do
+    backend (`db`, ou o configurado; app.repositorio); as vagas, uma vez por
+    chamada.
+    """
+    if db is None:
+        db, erro = abrir_banco()
+        if db is None:
+            return {"erro": f"Banco de dados indisponível: {erro}"}
+    funcionario_alvo = db.funcionario(id_funcionario)
     if not funcionario_alvo:
         return {"erro": f"Funcionário com ID {id_funcionario} não encontrado."}
+    vagas = db.listar('vagas')
 
     # Combina habilidades declaradas e descobertas (e converte para minúsculas para comparação)
     habilidades_do_funcionario = set(
         [h.lower() for h in funcionario_alvo.get("habilidades_declaradas", [])] + 
-        [h.lower() for h in funcionario_alvo.get("habilidades_descobertas", [])]
+        [(h.get("skill") or "" if isinstance(h, dict) else h).lower() for h in funcionario_alvo.get("habilidades_descobertas", [])]
     )
 
     recomendacoes = []
@@ -68,7 +565,16 @@ def recomendar_vagas(id_funcionario):
         "recomendacoes": recomendacoes_ordenadas
     }
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Recomendações de vagas para um funcionário, no backend configurado.')
+    parser.add_argument('--id', type=int, default=1, help='id do funcionário (padrão: 1)')
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    resultado_recomendacao = recomendar_vagas(args.id)
+    print(json.dumps(resultado_recomendacao, indent=4, ensure_ascii=False))
+    return 1 if 'erro' in resultado_recomendacao else 0
+
 if __name__ == '__main__':
-    # Exemplo de uso: Recomendações para a funcionária Ana Silva (ID 1)
-    resultado_recomendacao = recomendar_vagas(1)
-    print(json.dumps(resultado_recomendacao, indent=4, ensure_ascii=False))
\ No newline at end of file
+    raise SystemExit(main())
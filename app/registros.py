@@ -0,0 +1,118 @@
+"""
+Registros compactos e somente leitura para o snapshot em memória.
+
+Funcionario, Vaga e Projeto usam `__slots__` (sem __dict__ por objeto), listas
+viram tuplas e subdocumentos viram mapeamentos somente leitura, então um
+snapshot pode ser compartilhado entre threads sem cópias. Cada classe declara
+os campos que as rotas usam; `campos()` são os caminhos lidos do repositório,
+e campos que só servem ao dashboard (ex.: `skills_normalizadas`) não são
+carregados.
+
+Os registros aceitam `get`, `[]` e `dict(registro)` como os documentos, para o
+código que recebe um ou outro. Resultados calculados por requisição
+(recomendações, plano de carreira) ficam em objetos à parte, como
+ResultadoPerfil, e nunca no registro.
+"""
+from types import MappingProxyType
+
+from .nlp.extractor import normalizar_skill
+
+def _congelar(valor):
+    if isinstance(valor, dict):
+        return MappingProxyType({k: _congelar(v) for k, v in valor.items()})
+    if isinstance(valor, (list, tuple)):
+        return tuple(_congelar(v) for v in valor)
+    return valor
+
+def _descongelar(valor):
+    if isinstance(valor, MappingProxyType):
+        return {k: _descongelar(v) for k, v in valor.items()}
+    if isinstance(valor, tuple):
+        return [_descongelar(v) for v in valor]
+    return valor
+
+class Registro:
+    __slots__ = ()
+    CAMPOS = ()
+    SUBCAMPOS = {}
+
+    def __init__(self, **campos):
+        for campo in self.CAMPOS:
+            object.__setattr__(self, campo, _congelar(campos.get(campo)))
+
+    @classmethod
+    def campos(cls):
+        """Caminhos (com pontos para os subcampos) lidos do repositório para o registro."""
+        caminhos = []
+        for campo in cls.CAMPOS:
+            subcampos = cls.SUBCAMPOS.get(campo)
+            if subcampos:
+                caminhos.extend(f"{campo}.{sub}" for sub in subcampos)
+            else:
+                caminhos.append(campo)
+        return tuple(caminhos)
+
+    @classmethod
+    def de_documento(cls, doc):
+        return cls(**doc)
+
+    def __setattr__(self, nome, valor):
+        raise AttributeError(f"{type(self).__name__} é somente leitura")
+
+    def __delattr__(self, nome):
+        raise AttributeError(f"{type(self).__name__} é somente leitura")
+
+    def get(self, campo, padrao=None):
+        valor = getattr(self, campo, None) if campo in self.CAMPOS else None
+        return padrao if valor is None else valor
+
+    def __getitem__(self, campo):
+        if campo not in self.CAMPOS:
+            raise KeyError(campo)
+        return getattr(self, campo)
+
+    def __contains__(self, campo):
+        return campo in self.CAMPOS and getattr(self, campo) is not None
+
+    def keys(self):
+        return [campo for campo in self.CAMPOS if getattr(self, campo) is not None]
+
+    def como_dict(self):
+        """Cópia mutável (listas e dicts comuns), ex.: para serializar em JSON."""
+        return {campo: _descongelar(getattr(self, campo)) for campo in self.keys()}
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{c}={getattr(self, c)!r}' for c in self.keys())})"
+
+class Funcionario(Registro):
+    """Funcionário com as skills já normalizadas em `skills` (declaradas + descobertas)."""
+
+    CAMPOS = ('id', 'nome', 'cargo', 'email', 'habilidades_declaradas', 'habilidades_descobertas')
+    SUBCAMPOS = {'habilidades_descobertas': ('skill', 'origem', 'data')}
+    __slots__ = CAMPOS + ('skills',)
+
+    def __init__(self, **campos):
+        super().__init__(**campos)
+        decl = {normalizar_skill(s) for s in self.get('habilidades_declaradas', ())}
+        desc = {normalizar_skill(h.get('skill')) for h in self.get('habilidades_descobertas', ())}
+        object.__setattr__(self, 'skills', frozenset(decl | desc))
+
+class Vaga(Registro):
+    CAMPOS = ('id', 'titulo', 'area', 'descricao', 'habilidades_requeridas')
+    __slots__ = CAMPOS
+
+class Projeto(Registro):
+    CAMPOS = ('id_projeto', 'nome_projeto', 'participantes', 'tarefas')
+    SUBCAMPOS = {'tarefas': ('descricao',)}
+    __slots__ = CAMPOS
+
+class ResultadoPerfil:
+    """Dados calculados para uma página de perfil; o Funcionario do snapshot não é alterado."""
+
+    __slots__ = ('recomendacoes_vagas', 'plano_carreira', 'plano_carreira_erro', 'plano_carreira_job')
+
+    def __init__(self, recomendacoes_vagas=(), plano_carreira=None, plano_carreira_erro=None, plano_carreira_job=None):
+        self.recomendacoes_vagas = recomendacoes_vagas
+        self.plano_carreira = plano_carreira
+        self.plano_carreira_erro = plano_carreira_erro
+        self.plano_carreira_job = plano_carreira_job
@@ -0,0 +1,473 @@
+"""
+Repositório: a interface estreita entre a aplicação e o banco.
+
+Rotas, jobs e ferramentas de linha de comando não montam consultas do MongoDB:
+chamam os métodos de `Repositorio`, um por operação que a aplicação faz
+(ler uma coleção, uma página filtrada do dashboard, incrementar agregados,
+reservar ids...). Há três implementações: RepositorioMongo (abaixo, sobre um
+banco do pymongo) e, em app.armazenamento, RepositorioSQLite (tabelas e
+índices de verdade) e RepositorioJSON (arquivos JSON em memória, para
+desenvolvimento).
+
+Filtro de funcionários (dict; chaves ausentes não filtram):
+- 'skills': lista de grupos de chaves normalizadas; o funcionário precisa ter
+  ao menos uma skill de cada grupo;
+- 'cargo' e 'area_top': listas de valores aceitos.
+
+Ordens da listagem: 'nome' (nome, id) e 'compat' (melhor_compatibilidade
+decrescente, id). `campos` são caminhos com pontos (ex.: 'tarefas.descricao');
+None devolve o documento inteiro. Os documentos nunca trazem `_id`.
+"""
+import logging
+
+from pymongo import ASCENDING, DESCENDING, UpdateOne, ReplaceOne, ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+
+COLECOES_BASE = ('funcionarios', 'vagas', 'projetos')
+COLECAO_AGREGADOS = 'agregados'
+COLECAO_META = 'meta'
+COLECAO_CONTADORES = 'contadores'
+COLECAO_MARCAS = 'descoberta_projetos'
+COLECAO_PLANOS = 'planos_carreira'
+COLECAO_TAXONOMIA = 'taxonomia_skills'
+COLECOES = COLECOES_BASE + (COLECAO_AGREGADOS, COLECAO_META, COLECAO_CONTADORES, COLECAO_MARCAS, COLECAO_PLANOS, COLECAO_TAXONOMIA)
+ID_VERSAO = 'versao_dados'
+ORDENS = ('nome', 'compat')
+CAMPOS_DISTINTOS = ('cargo', 'area_top', 'skills_normalizadas')
+DUPLICADO = 11000
+TAMANHO_LOTE = 1000
+AVISO_EMAIL_REPETIDO = "Índice único de email não criado (há emails repetidos na base); deduplicação por consulta: %s"
+
+logger = logging.getLogger(__name__)
+
+# --- documentos ---
+
+def copiar(valor):
+    if isinstance(valor, dict):
+        return {k: copiar(v) for k, v in valor.items()}
+    if isinstance(valor, list):
+        return [copiar(v) for v in valor]
+    return valor
+
+def _arvore(campos):
+    arvore = {}
+    for caminho in campos:
+        no = arvore
+        partes = caminho.split('.')
+        for parte in partes[:-1]:
+            if parte in no and no[parte] is None:
+                break
+            no = no.setdefault(parte, {})
+        else:
+            no[partes[-1]] = None
+    return arvore
+
+def _incluir(valor, arvore):
+    if isinstance(valor, list):
+        return [_incluir(item, arvore) for item in valor if isinstance(item, (dict, list))]
+    resultado = {}
+    for campo, subarvore in arvore.items():
+        if campo not in valor:
+            continue
+        if subarvore is None:
+            resultado[campo] = copiar(valor[campo])
+        elif isinstance(valor[campo], (dict, list)):
+            resultado[campo] = _incluir(valor[campo], subarvore)
+    return resultado
+
+def projetar(doc, campos=None):
+    """Cópia de `doc` só com `campos` (caminhos com pontos, descendo por listas de subdocumentos)."""
+    if campos is None:
+        return {k: copiar(v) for k, v in doc.items() if k != '_id'}
+    return _incluir(doc, _arvore(campos))
+
+def verificar_colecoes(colecoes, permitidas=COLECOES):
+    for colecao in colecoes:
+        if colecao not in permitidas:
+            raise ValueError(f"Coleção desconhecida: {colecao}")
+
+def adicionar_sem_repetir(lista, itens):
+    """Acrescenta a `lista` os `itens` que ainda não estão nela ($addToSet); retorna quantos entraram."""
+    novos = 0
+    for item in itens:
+        if item not in lista:
+            lista.append(copiar(item))
+            novos += 1
+    return novos
+
+class Repositorio:
+    """
+    Operações da aplicação sobre o banco. As subclasses implementam todas;
+    as descrições abaixo valem para os três backends.
+    """
+
+    # Coleções base (funcionarios, vagas, projetos)
+
+    def listar(self, colecao, campos=None, lote=TAMANHO_LOTE):
+        """Todos os documentos da coleção, na ordem de inserção."""
+        raise NotImplementedError
+
+    def inserir(self, colecao, docs):
+        """Acrescenta `docs` à coleção, sem validação (carga inicial e cópia entre backends)."""
+        raise NotImplementedError
+
+    def limpar(self, *colecoes):
+        """Apaga todos os documentos das coleções (nomes de COLECOES)."""
+        raise NotImplementedError
+
+    # Funcionários
+
+    def funcionario(self, id):
+        """Documento do funcionário com este `id` (consulta pelo índice), ou None."""
+        raise NotImplementedError
+
+    def funcionarios_por_id(self, ids, campos=None):
+        """Funcionários com estes ids (iterável, como as demais consultas que podem ser grandes)."""
+        raise NotImplementedError
+
+    def funcionarios_sem_derivados(self, campos=None):
+        """Funcionários ainda sem os campos derivados (`skills_normalizadas`); iterável."""
+        raise NotImplementedError
+
+    def maior_id_funcionario(self):
+        raise NotImplementedError
+
+    def emails_existentes(self, emails):
+        """Quais dos `emails` já estão na base (conjunto)."""
+        raise NotImplementedError
+
+    def inserir_funcionarios(self, docs):
+        """
+        Insere `docs`; com o índice único de email, os repetidos são
+        recusados sem interromper os demais. Retorna as posições recusadas.
+        """
+        raise NotImplementedError
+
+    def atualizar_funcionarios(self, alteracoes):
+        """Aplica `alteracoes`, pares (id, {campo: valor}), ao funcionário de cada id; retorna quantos."""
+        raise NotImplementedError
+
+    def adicionar_descobertas(self, novas):
+        """
+        Acrescenta habilidades descobertas, pares (id, [habilidades]), sem
+        repetir as que o funcionário já tem; retorna quantos foram alterados.
+        """
+        raise NotImplementedError
+
+    def valores_distintos(self, campo):
+        """Valores distintos de `cargo`, `area_top` ou `skills_normalizadas`."""
+        raise NotImplementedError
+
+    def contar_funcionarios(self, filtro):
+        raise NotImplementedError
+
+    def pagina_funcionarios(self, filtro, ordem='nome', pular=0, limite=0, campos=None):
+        raise NotImplementedError
+
+    def iterar_funcionarios(self, filtro, ordem='nome', campos=None, lote=TAMANHO_LOTE):
+        """Como pagina_funcionarios, mas devolve um iterador lido em lotes."""
+        raise NotImplementedError
+
+    def contar_skills(self, filtro):
+        """{skill normalizada: ocorrências} entre os funcionários do filtro, contando repetições."""
+        raise NotImplementedError
+
+    # Índices
+
+    def garantir_indices(self):
+        """
+        Cria os índices da aplicação (idempotente). O de email é único se a
+        base não tiver emails repetidos; senão fica um índice comum e o aviso
+        vai para o log.
+        """
+        raise NotImplementedError
+
+    def email_unico(self):
+        """True se o índice único de email está ativo."""
+        raise NotImplementedError
+
+    # Agregados materializados: documentos {_id, tipo, chave, display, indice, count, ordem}
+
+    def agregado_total(self):
+        """Contagem do documento 'total', ou None se os agregados ainda não foram construídos."""
+        raise NotImplementedError
+
+    def agregados(self, tipo, limite=0, por_contagem=False):
+        """Agregados do `tipo` com count > 0, por `ordem` (ou por count decrescente e ordem)."""
+        raise NotImplementedError
+
+    def incrementar_agregados(self, deltas, definicoes):
+        """Soma `deltas` {_id: n} aos agregados; os que não existem nascem com `definicoes[_id]`."""
+        raise NotImplementedError
+
+    def substituir_agregados(self, docs):
+        """Grava `docs` um a um (leitores nunca veem a coleção vazia) e remove os demais."""
+        raise NotImplementedError
+
+    # Contadores e metadados
+
+    def versao_dados(self):
+        raise NotImplementedError
+
+    def incrementar_versao(self):
+        raise NotImplementedError
+
+    def garantir_contador(self, nome, minimo):
+        """Leva o contador a pelo menos `minimo` (atômico e idempotente)."""
+        raise NotImplementedError
+
+    def incrementar_contador(self, nome, quantidade, criar=False):
+        """Soma `quantidade` atomicamente e retorna o novo valor; None se o contador não existe e não `criar`."""
+        raise NotImplementedError
+
+    def ler_meta(self, chave):
+        raise NotImplementedError
+
+    def gravar_meta(self, chave, valores):
+        raise NotImplementedError
+
+    # Marcas d'água da descoberta de skills: {chave do projeto: hash}
+
+    def marcas_descoberta(self):
+        raise NotImplementedError
+
+    def gravar_marcas_descoberta(self, marcas, data):
+        raise NotImplementedError
+
+    # Planos de carreira: {status, plano, erro, modelo, atualizado_em} por chave
+
+    def ler_plano(self, chave):
+        raise NotImplementedError
+
+    def gravar_plano(self, chave, campos):
+        raise NotImplementedError
+
+    def reivindicar_plano(self, chave, campos, limite):
+        """
+        Grava `campos` (o pedido pendente) numa única operação atômica se a
+        chave não existe, terminou em erro ou está pendente desde antes de
+        `limite` (time.time()). Retorna True se gravou: só esse chamador gera
+        o plano.
+        """
+        raise NotImplementedError
+
+    # Taxonomia de skills: entradas {chave, nome, aliases} em ordem
+
+    def ler_taxonomia(self):
+        raise NotImplementedError
+
+    def gravar_taxonomia(self, entradas):
+        raise NotImplementedError
+
+    def fechar(self):
+        """Libera conexões e travas do repositório (opcional; o processo também as libera ao sair)."""
+
+# --- MongoDB ---
+
+ORDENACOES = {
+    'nome': [('nome', ASCENDING), ('id', ASCENDING)],
+    'compat': [('melhor_compatibilidade', DESCENDING), ('id', ASCENDING)]
+}
+INDICE_EMAIL_BUSCA = 'email_1_id_1'
+
+def _projecao(campos):
+    return {'_id': 0} if campos is None else dict({campo: 1 for campo in campos}, _id=0)
+
+class RepositorioMongo(Repositorio):
+    """Repositório sobre um banco do pymongo."""
+
+    def __init__(self, db):
+        self.db = db
+        self._email_unico = None
+
+    def _consulta(self, filtro):
+        consulta = {}
+        grupos = filtro.get('skills')
+        if grupos:
+            if len(grupos) == 1:
+                consulta['skills_normalizadas'] = {'$in': list(grupos[0])}
+            else:
+                consulta['$and'] = [{'skills_normalizadas': {'$in': list(chaves)}} for chaves in grupos]
+        for campo in ('cargo', 'area_top'):
+            if campo in filtro:
+                consulta[campo] = {'$in': list(filtro[campo])}
+        return consulta
+
+    def listar(self, colecao, campos=None, lote=TAMANHO_LOTE):
+        verificar_colecoes([colecao], COLECOES_BASE)
+        return list(self.db[colecao].find({}, _projecao(campos)).batch_size(lote))
+
+    def inserir(self, colecao, docs):
+        verificar_colecoes([colecao], COLECOES_BASE)
+        if docs:
+            self.db[colecao].insert_many([dict(d) for d in docs], ordered=False)
+
+    def limpar(self, *colecoes):
+        verificar_colecoes(colecoes)
+        for colecao in colecoes:
+            self.db[colecao].delete_many({})
+
+    def funcionario(self, id):
+        return self.db.funcionarios.find_one({'id': id}, {'_id': 0})
+
+    def funcionarios_por_id(self, ids, campos=None):
+        return self.db.funcionarios.find({'id': {'$in': list(ids)}}, _projecao(campos)).batch_size(TAMANHO_LOTE)
+
+    def funcionarios_sem_derivados(self, campos=None):
+        return self.db.funcionarios.find({'skills_normalizadas': {'$exists': False}}, _projecao(campos)).batch_size(TAMANHO_LOTE)
+
+    def maior_id_funcionario(self):
+        maior = self.db.funcionarios.find_one({}, {'_id': 0, 'id': 1}, sort=[('id', DESCENDING)])
+        return maior.get('id', 0) if maior else 0
+
+    def emails_existentes(self, emails):
+        emails = list(emails)
+        if not emails:
+            return set()
+        return {d['email'] for d in self.db.funcionarios.find({'email': {'$in': emails}}, {'_id': 0, 'email': 1})}
+
+    def inserir_funcionarios(self, docs):
+        if not docs:
+            return []
+        try:
+            self.db.funcionarios.insert_many([dict(d) for d in docs], ordered=False)
+        except BulkWriteError as e:
+            recusados = []
+            for erro in e.details.get('writeErrors', []):
+                if erro.get('code') != DUPLICADO:
+                    raise
+                recusados.append(erro['index'])
+            return sorted(recusados)
+        return []
+
+    def atualizar_funcionarios(self, alteracoes):
+        operacoes = [UpdateOne({'id': id}, {'$set': campos}) for id, campos in alteracoes]
+        for inicio in range(0, len(operacoes), TAMANHO_LOTE):
+            self.db.funcionarios.bulk_write(operacoes[inicio:inicio + TAMANHO_LOTE], ordered=False)
+        return len(operacoes)
+
+    def adicionar_descobertas(self, novas):
+        operacoes = [UpdateOne({'id': id}, {'$addToSet': {'habilidades_descobertas': {'$each': list(itens)}}}) for id, itens in novas]
+        if not operacoes:
+            return 0
+        return self.db.funcionarios.bulk_write(operacoes, ordered=True).modified_count
+
+    def valores_distintos(self, campo):
+        if campo not in CAMPOS_DISTINTOS:
+            raise ValueError(f"Campo sem valores distintos: {campo}")
+        return self.db.funcionarios.distinct(campo)
+
+    def contar_funcionarios(self, filtro):
+        return self.db.funcionarios.count_documents(self._consulta(filtro))
+
+    def _ordenados(self, filtro, ordem, campos):
+        return self.db.funcionarios.find(self._consulta(filtro), _projecao(campos)).sort(ORDENACOES.get(ordem, ORDENACOES['nome']))
+
+    def pagina_funcionarios(self, filtro, ordem='nome', pular=0, limite=0, campos=None):
+        return list(self._ordenados(filtro, ordem, campos).skip(pular).limit(limite))
+
+    def iterar_funcionarios(self, filtro, ordem='nome', campos=None, lote=TAMANHO_LOTE):
+        return self._ordenados(filtro, ordem, campos).batch_size(lote)
+
+    def contar_skills(self, filtro):
+        pipeline = [
+            {'$match': self._consulta(filtro)},
+            {'$unwind': '$skills_normalizadas'},
+            {'$group': {'_id': '$skills_normalizadas', 'count': {'$sum': 1}}}
+        ]
+        return {d['_id']: d['count'] for d in self.db.funcionarios.aggregate(pipeline)}
+
+    def garantir_indices(self):
+        funcionarios = self.db.funcionarios
+        funcionarios.create_index([('skills_normalizadas', ASCENDING)])
+        funcionarios.create_index([('cargo', ASCENDING)])
+        funcionarios.create_index([('area_top', ASCENDING)])
+        funcionarios.create_index([('nome', ASCENDING), ('id', ASCENDING)])
+        funcionarios.create_index([('melhor_compatibilidade', DESCENDING), ('id', ASCENDING)])
+        funcionarios.create_index([('id', ASCENDING)])
+        self.db[COLECAO_AGREGADOS].create_index([('tipo', 1), ('count', -1), ('ordem', 1)])
+        try:
+            funcionarios.create_index([('email', ASCENDING)], unique=True, partialFilterExpression={'email': {'$type': 'string'}})
+        except OperationFailure as e:
+            logger.warning(AVISO_EMAIL_REPETIDO, e)
+            funcionarios.create_index([('email', ASCENDING), ('id', ASCENDING)], name=INDICE_EMAIL_BUSCA)
+            self._email_unico = False
+            return
+        self._email_unico = True
+        if INDICE_EMAIL_BUSCA in funcionarios.index_information():
+            funcionarios.drop_index(INDICE_EMAIL_BUSCA)
+
+    def email_unico(self):
+        # Verificado uma vez (em garantir_indices ou na primeira chamada), não a cada inserção.
+        if self._email_unico is None:
+            self._email_unico = any(info.get('unique') and info['key'][0][0] == 'email' for info in self.db.funcionarios.index_information().values())
+        return self._email_unico
+
+    def agregado_total(self):
+        total = self.db[COLECAO_AGREGADOS].find_one({'_id': 'total'})
+        return None if total is None else total.get('count', 0)
+
+    def agregados(self, tipo, limite=0, por_contagem=False):
+        ordem = [('count', DESCENDING), ('ordem', ASCENDING)] if por_contagem else [('ordem', ASCENDING)]
+        return list(self.db[COLECAO_AGREGADOS].find({'tipo': tipo, 'count': {'$gt': 0}}, {'_id': 0}).sort(ordem).limit(limite))
+
+    def incrementar_agregados(self, deltas, definicoes):
+        operacoes = [UpdateOne({'_id': _id}, {'$inc': {'count': delta}, '$setOnInsert': definicoes[_id]}, upsert=True) for _id, delta in deltas.items()]
+        if operacoes:
+            self.db[COLECAO_AGREGADOS].bulk_write(operacoes, ordered=False)
+
+    def substituir_agregados(self, docs):
+        self.db[COLECAO_AGREGADOS].bulk_write([ReplaceOne({'_id': d['_id']}, d, upsert=True) for d in docs], ordered=False)
+        self.db[COLECAO_AGREGADOS].delete_many({'_id': {'$nin': [d['_id'] for d in docs]}})
+
+    def versao_dados(self):
+        doc = self.db[COLECAO_META].find_one({'_id': ID_VERSAO})
+        return doc.get('valor', 0) if doc else 0
+
+    def incrementar_versao(self):
+        self.db[COLECAO_META].update_one({'_id': ID_VERSAO}, {'$inc': {'valor': 1}}, upsert=True)
+
+    def garantir_contador(self, nome, minimo):
+        self.db[COLECAO_CONTADORES].update_one({'_id': nome}, {'$max': {'valor': minimo}}, upsert=True)
+
+    def incrementar_contador(self, nome, quantidade, criar=False):
+        doc = self.db[COLECAO_CONTADORES].find_one_and_update(
+            {'_id': nome}, {'$inc': {'valor': quantidade}}, upsert=criar, return_document=ReturnDocument.AFTER)
+        return None if doc is None else doc['valor']
+
+    def ler_meta(self, chave):
+        return self.db[COLECAO_META].find_one({'_id': chave}, {'_id': 0})
+
+    def gravar_meta(self, chave, valores):
+        self.db[COLECAO_META].update_one({'_id': chave}, {'$set': valores}, upsert=True)
+
+    def marcas_descoberta(self):
+        return {d['_id']: d.get('hash') for d in self.db[COLECAO_MARCAS].find({}, {'hash': 1})}
+
+    def gravar_marcas_descoberta(self, marcas, data):
+        operacoes = [UpdateOne({'_id': chave}, {'$set': {'hash': valor, 'atualizado_em': data}}, upsert=True) for chave, valor in marcas.items()]
+        if operacoes:
+            self.db[COLECAO_MARCAS].bulk_write(operacoes, ordered=False)
+
+    def ler_plano(self, chave):
+        return self.db[COLECAO_PLANOS].find_one({'_id': chave}, {'_id': 0})
+
+    def gravar_plano(self, chave, campos):
+        self.db[COLECAO_PLANOS].update_one({'_id': chave}, {'$set': campos}, upsert=True)
+
+    def reivindicar_plano(self, chave, campos, limite):
+        # Com o documento presente e fora do filtro, o upsert tenta inserir o mesmo _id e o índice de _id o recusa.
+        disponivel = {'_id': chave, '$or': [{'status': 'erro'}, {'status': 'pendente', 'atualizado_em': {'$lt': limite}}]}
+        try:
+            self.db[COLECAO_PLANOS].update_one(disponivel, {'$set': campos}, upsert=True)
+        except DuplicateKeyError:
+            return False
+        return True
+
+    def ler_taxonomia(self):
+        return list(self.db[COLECAO_TAXONOMIA].find({}, {'_id': 0, 'ordem': 0}).sort('ordem', 1))
+
+    def gravar_taxonomia(self, entradas):
+        self.db[COLECAO_TAXONOMIA].delete_many({})
+        if entradas:
+            self.db[COLECAO_TAXONOMIA].insert_many([dict(entrada, ordem=i) for i, entrada in enumerate(entradas)])
@@ -1,213 +1,262 @@
-from flask import Blueprint, render_template, request, abort, redirect, url_for, current_app
-import json
-import re
-from .nlp.extractor import SKILLS_CONHECIDAS, extrair_skills_dos_projetos
-from openpyxl import load_workbook
+from flask import Blueprint, render_template, request, abort, redirect, url_for, current_app, jsonify, g, Response, stream_with_context
+from .nlp.discovery import descobrir_skills
+from .recommendation.recommender import FAIXAS_LABELS
+from .cache import Snapshot
+from .registros import ResultadoPerfil
+from . import aggregates, indexes
+from .jobs import montar_mensagens
+from .metrics import etapa, REGISTRO
+from .leitura import em_paralelo
+from functools import wraps
 import os
-from openai import OpenAI
 
 main = Blueprint('main', __name__)
 
 COMPATIBILIDADE_LIMIAR = 30
+POR_PAGINA = 24
+POR_PAGINA_MAX = 100
+RECOMENDACOES_SEMANTICAS = 10
 
 def get_db():
-    db = current_app.config.get('DB')
+    """Banco do cliente gerenciado do processo; None (sem bloquear) com o circuito aberto."""
+    db, erro = current_app.config['CONEXAO'].obter()
+    current_app.config['DB'] = db
+    current_app.config['DB_ERROR'] = erro
+    return db
+
+def registrar_erro_db(erro):
+    """Mostra o erro na página; a falha já foi contada no circuit breaker pelo banco monitorado (app.db)."""
+    current_app.config['DB_ERROR'] = str(erro)
+
+def load_snapshot():
+    """Snapshot compartilhado (somente leitura) de funcionarios, vagas e projetos."""
+    db = get_db()
     if db is not None:
-        return db
-    uri = os.getenv('MONGODB_URI')
-    if not uri:
-        current_app.config['DB_ERROR'] = 'MONGODB_URI ausente no .env.'
+        try:
+            return current_app.config['CACHE'].obter(db)
+        except Exception as e:
+            registrar_erro_db(e)
+    return Snapshot([], [], [])
+
+def load_data():
+    snapshot = load_snapshot()
+    return snapshot.funcionarios, snapshot.vagas
+
+def load_agregados(snapshot):
+    """Agregados materializados (total, top skills, áreas, faixas), lidos uma vez por snapshot."""
+    db = get_db()
+    if db is None:
         return None
+
+    def carregar():
+        agregados = aggregates.ler(db)
+        if agregados is None:
+            aggregates.reconstruir(db, snapshot.funcionarios, snapshot.vagas)
+            agregados = aggregates.ler(db)
+        return agregados
+
     try:
-        from pymongo import MongoClient
-        kwargs = {'serverSelectionTimeoutMS': 5000}
-        try:
-            import certifi
-            kwargs['tlsCAFile'] = certifi.where()
-            kwargs['tls'] = True
-        except Exception:
-            pass
-        client = MongoClient(uri, **kwargs)
-        client.admin.command('ping')
-        db_name = os.getenv('MONGODB_DB', 'talentflow')
-        db = client[db_name]
-        current_app.config['DB'] = db
-        current_app.config['DB_ERROR'] = None
-        return db
+        return snapshot.derivado('agregados', carregar)
     except Exception as e:
-        current_app.config['DB_ERROR'] = str(e)
+        registrar_erro_db(e)
         return None
 
-def load_data():
+def load_vocabulario(snapshot):
+    """Skills conhecidas {chave: exibição}, usadas para resolver a busca do dashboard."""
+    db = get_db()
+    if db is None:
+        return {}
+
+    def carregar():
+        load_agregados(snapshot)
+        vocabulario = aggregates.vocabulario(db)
+        if not vocabulario:
+            vocabulario = {k: k for k in db.valores_distintos('skills_normalizadas')}
+        return vocabulario
+
+    return snapshot.derivado('vocabulario', carregar)
+
+def registrar_alteracoes(db, pares):
+    """Propaga funcionários alterados (pares antes/depois) para campos derivados e agregados."""
+    matcher = load_snapshot().matcher
+    indexes.atualizar_campos_derivados(db, [depois for _, depois in pares], matcher)
+    aggregates.registrar_alteracoes(db, pares, matcher)
+
+def load_cobertura(snapshot):
+    """Cobertura de skills por projeto, sincronizada com o índice do processo uma vez por snapshot."""
+    indice = current_app.config['COBERTURA']
+    return snapshot.derivado('cobertura', lambda: indice.atualizar(snapshot.projetos, snapshot.skills_por_funcionario))
+
+def load_busca(snapshot):
+    """Índice de trigramas da busca de skills, sincronizado incrementalmente uma vez por snapshot."""
+    indice = current_app.config['BUSCA']
+    return snapshot.derivado('busca', lambda: indice.atualizar(snapshot.skills_por_funcionario))
+
+def load_semantico(snapshot):
+    """Modelo TF-IDF de vagas e projetos; a tokenização é reaproveitada pelo índice do processo entre snapshots."""
+    indice = current_app.config['SEMANTICO']
+    return snapshot.derivado('semantico', lambda: indice.atualizar(snapshot.vagas, snapshot.projetos))
+
+def recomendar(snapshot, funcionario, modo='', limiar=COMPATIBILIDADE_LIMIAR):
+    """
+    Recomendações de vagas no modo pedido: por padrão, compatibilidade exata de
+    skills acima de `limiar`; com modo 'semantico', as vagas mais similares
+    por TF-IDF (o limiar, se informado, vale para a similaridade).
+    """
+    if modo == 'semantico':
+        return load_semantico(snapshot).recomendar(funcionario, snapshot.matcher, k=RECOMENDACOES_SEMANTICAS, limiar=limiar)
+    return snapshot.matcher.recomendar(funcionario, limiar=limiar)
+
+def invalidar_cache(db):
+    current_app.config['CACHE'].invalidar(db)
+    current_app.config['RESPOSTAS'].limpar()
+
+def pagina_em_cache(*argumentos):
+    """
+    Serve a página do cache de respostas enquanto a versão dos dados não muda.
+    A chave usa só os `argumentos` de query informados (vazios são ignorados),
+    para que parâmetros irrelevantes não criem entradas novas. Páginas que
+    marcam g.sem_cache (ex.: erro de banco) não são armazenadas.
+    """
+    def decorador(view):
+        @wraps(view)
+        def envoltorio(*args, **kwargs):
+            versao = load_snapshot().versao
+            if versao is None:
+                return view(*args, **kwargs)
+            consulta = tuple((nome, request.args.get(nome)) for nome in argumentos if request.args.get(nome))
+            chave = (request.endpoint, versao, tuple(sorted(kwargs.items())), consulta)
+            gerada = []
+
+            def gerar():
+                resposta = current_app.make_response(view(*args, **kwargs))
+                gerada.append(resposta)
+                return resposta.get_data(), resposta.status_code == 200 and not g.get('sem_cache')
+
+            corpo = current_app.config['RESPOSTAS'].obter_ou_gerar(chave, gerar)
+            if gerada:
+                return gerada[0]
+            return Response(corpo, mimetype='text/html')
+        return envoltorio
+    return decorador
+
+def resumo_dashboard(snapshot, db, query='', filtro_cargo='', top=5):
+    """
+    Filtro indexado de busca/cargo, total de colaboradores e top skills.
+    Sem filtros, total e top skills vêm dos agregados materializados.
+    Retorna (filtro, vocabulario, total_colaboradores, top_skills).
+    """
+    vocabulario = load_vocabulario(snapshot)
+    filtro = indexes.filtro_funcionarios(db, vocabulario, busca=query, cargo=filtro_cargo, indice_busca=load_busca(snapshot))
+    agregados = load_agregados(snapshot) if not filtro else None
+    if agregados is not None:
+        top_skills = [{"skill": item['skill'], "count": item['count']} for item in agregados['skills'][:top]]
+        return filtro, vocabulario, agregados['total'], top_skills
+    resultados, _ = em_paralelo({
+        'total_colaboradores': lambda: db.contar_funcionarios(filtro),
+        'top_skills': lambda: indexes.top_skills(db, filtro, vocabulario, limite=top),
+    })
+    return filtro, vocabulario, resultados['total_colaboradores'], resultados['top_skills']
+
+def dados_dashboard(args):
+    """Lista paginada, totais e top skills do dashboard para os argumentos da requisição."""
+    with etapa('snapshot'):
+        snapshot = load_snapshot()
     db = get_db()
+    db_error = current_app.config.get('DB_ERROR')
+    query = args.get('busca_habilidade', '')
+    filtro_area = args.get('area', '')
+    filtro_cargo = args.get('cargo', '')
+    ordem = args.get('ordem', '')
+    pagina = max(args.get('pagina', default=1, type=int), 1)
+    por_pagina = min(max(args.get('por_pagina', default=POR_PAGINA, type=int), 1), POR_PAGINA_MAX)
+
+    anotados = []
+    total_colaboradores = 0
+    total_resultados = 0
+    top_skills = []
     if db is not None:
         try:
-            funcionarios = list(db.funcionarios.find({}, {'_id': 0}))
-            vagas = list(db.vagas.find({}, {'_id': 0}))
-            return funcionarios, vagas
+            with etapa('resumo'):
+                filtro, vocabulario, total_colaboradores, top_skills = resumo_dashboard(snapshot, db, query, filtro_cargo)
+            with etapa('pagina'):
+                if filtro_area:
+                    filtro.update(indexes.filtro_funcionarios(db, vocabulario, area=filtro_area))
+                anotados, total_resultados = indexes.pagina_funcionarios(db, filtro, ordem='compat' if ordem == 'compat' else 'nome', pagina=pagina, por_pagina=por_pagina)
         except Exception as e:
-            current_app.config['DB_ERROR'] = str(e)
-            return [], []
-    return [], []
+            registrar_erro_db(e)
+            db_error = str(e)
+    if db_error:
+        g.sem_cache = True
+    total_paginas = max((total_resultados + por_pagina - 1) // por_pagina, 1)
+
+    return dict(funcionarios=anotados, query=query, total_colaboradores=total_colaboradores, top_skills=top_skills, filtro_area=filtro_area, filtro_cargo=filtro_cargo, ordem=ordem, db_error=db_error, pagina=pagina, por_pagina=por_pagina, total_paginas=total_paginas, total_resultados=total_resultados)
 
 @main.route('/')
 @main.route('/dashboard')
+@pagina_em_cache('busca_habilidade', 'area', 'cargo', 'ordem', 'pagina', 'por_pagina')
 def dashboard():
-    funcionarios, vagas = load_data()
-    db_error = current_app.config.get('DB_ERROR')
-    query = request.args.get('busca_habilidade', '')
-    filtro_area = request.args.get('area', '')
-    filtro_cargo = request.args.get('cargo', '')
-    ordem = request.args.get('ordem', '')
-    
-    if query:
-        funcionarios_filtrados = []
-        for f in funcionarios:
-            habilidades_declaradas = f.get('habilidades_declaradas', [])
-            habilidades_descobertas = [h['skill'] for h in f.get('habilidades_descobertas', [])]
-            habilidades = habilidades_declaradas + habilidades_descobertas
-            if any(query.lower() in habilidade.lower() for habilidade in habilidades):
-                funcionarios_filtrados.append(f)
-        funcionarios = funcionarios_filtrados
-    if filtro_cargo:
-        funcionarios = [f for f in funcionarios if filtro_cargo.lower() in f.get('cargo', '').lower()]
-    def normalizar_skill(s):
-        s = s or ''
-        s = re.sub(r"\s*\(.*?\)\s*", '', s)
-        return s.strip().lower()
-
-    total_colaboradores = len(funcionarios)
-    contagem = {}
-    display_map = {}
-    for f in funcionarios:
-        habilidades_declaradas = f.get('habilidades_declaradas', [])
-        habilidades_descobertas = [h['skill'] for h in f.get('habilidades_descobertas', [])]
-        for s in habilidades_declaradas + habilidades_descobertas:
-            k = normalizar_skill(s)
-            if k:
-                contagem[k] = contagem.get(k, 0) + 1
-                if k not in display_map:
-                    display_map[k] = s
-    top_skills = sorted(({"skill": display_map[k], "count": c} for k, c in contagem.items()), key=lambda x: x["count"], reverse=True)[:5]
-
-    def melhor_compatibilidade(funcionario):
-        habilidades_decl = funcionario.get('habilidades_declaradas', [])
-        habilidades_desc = [h['skill'] for h in funcionario.get('habilidades_descobertas', [])]
-        mapa_func = {normalizar_skill(s) for s in (habilidades_decl + habilidades_desc)}
-        melhor = 0
-        melhor_area = ''
-        for vaga in vagas:
-            mapa_vaga = {normalizar_skill(s) for s in vaga.get('habilidades_requeridas', [])}
-            if not mapa_vaga:
-                continue
-            comuns = mapa_func.intersection(mapa_vaga)
-            comp = round((len(comuns) / len(mapa_vaga)) * 100)
-            if comp > melhor:
-                melhor = comp
-                melhor_area = vaga.get('area', '')
-        return melhor, melhor_area
-
-    anotados = []
-    for f in funcionarios:
-        comp, area_top = melhor_compatibilidade(f)
-        f['melhor_compatibilidade'] = comp
-        f['area_top'] = area_top
-        anotados.append(f)
-
-    if filtro_area:
-        anotados = [f for f in anotados if f.get('area_top', '').lower() == filtro_area.lower()]
-
-    if ordem == 'compat':
-        anotados.sort(key=lambda x: x.get('melhor_compatibilidade', 0), reverse=True)
-    else:
-        anotados.sort(key=lambda x: x.get('nome', ''))
-
-    def extrair_skills_texto(texto):
-        encontrados = re.findall(r"\b(" + "|".join(re.escape(s) for s in SKILLS_CONHECIDAS) + r")\b", texto.lower())
-        return sorted({normalizar_skill(s) for s in encontrados})
-
-    def skill_gap_projetos():
-        try:
-            with open('app/data/projetos.json', 'r', encoding='utf-8') as f:
-                projetos = json.load(f)
-        except FileNotFoundError:
-            return []
-        mapa_func = {f['id']: f for f in funcionarios}
-        resultado = []
-        for proj in projetos:
-            skills_req = set()
-            for t in proj.get('tarefas', []):
-                skills_req.update(extrair_skills_texto(t.get('descricao', '')))
-            participantes = proj.get('participantes', [])
-            cobertura = []
-            for s in sorted(skills_req):
-                total = len(participantes) or 1
-                tem = 0
-                for pid in participantes:
-                    f = mapa_func.get(pid)
-                    if not f:
-                        continue
-                    decl = {normalizar_skill(x) for x in f.get('habilidades_declaradas', [])}
-                    desc = {normalizar_skill(x.get('skill')) for x in f.get('habilidades_descobertas', [])}
-                    if s in decl or s in desc:
-                        tem += 1
-                cobertura.append({"skill": s.capitalize(), "percent": round((tem / total) * 100)})
-            resultado.append({
-                "id_projeto": proj.get('id_projeto'),
-                "nome": proj.get('nome_projeto'),
-                "cobertura": cobertura
-            })
-        return resultado
-
-    gap = skill_gap_projetos()
-
-    return render_template('dashboard.html', funcionarios=anotados, query=query, total_colaboradores=total_colaboradores, top_skills=top_skills, filtro_area=filtro_area, filtro_cargo=filtro_cargo, ordem=ordem, gap=gap, db_error=db_error)
+    dados = dados_dashboard(request.args)
+    with etapa('cobertura'):
+        gap = load_cobertura(load_snapshot())
+    with etapa('render'):
+        return render_template('dashboard.html', gap=gap, **dados)
+
+@main.route('/dashboard/exportar')
+def exportar_dashboard():
+    """Colaboradores com os mesmos filtros do dashboard, em CSV (padrão) ou XLSX (`formato=xlsx`), em fluxo."""
+    from .exportacao import FORMATOS, COLUNAS
+    formato = request.args.get('formato', 'csv').lower()
+    if formato not in FORMATOS:
+        abort(400)
+    db = get_db()
+    if db is None:
+        return Response('Erro de conexão com MongoDB.', status=503, mimetype='text/plain')
+    gerar, mimetype = FORMATOS[formato]
+    try:
+        snapshot = load_snapshot()
+        filtro = indexes.filtro_funcionarios(db, load_vocabulario(snapshot), busca=request.args.get('busca_habilidade', ''), cargo=request.args.get('cargo', ''), area=request.args.get('area', ''), indice_busca=load_busca(snapshot))
+        ordem = 'compat' if request.args.get('ordem') == 'compat' else 'nome'
+        funcionarios = indexes.iterar_funcionarios(db, filtro, ordem=ordem, campos=COLUNAS)
+    except Exception as e:
+        registrar_erro_db(e)
+        return Response('Erro de conexão com MongoDB.', status=503, mimetype='text/plain')
+    resposta = Response(stream_with_context(gerar(funcionarios)), mimetype=mimetype)
+    resposta.headers['Content-Disposition'] = f'attachment; filename=colaboradores.{formato}'
+    resposta.headers['Cache-Control'] = 'no-store'
+    return resposta
 
 @main.route('/perfil/<int:id>')
+@pagina_em_cache('limiar', 'modo')
 def perfil(id):
-    funcionarios, vagas = load_data()
-    funcionario = next((f for f in funcionarios if f['id'] == id), None)
+    with etapa('snapshot'):
+        snapshot = load_snapshot()
+        funcionario = snapshot.funcionario(id)
     
     if funcionario is None:
         abort(404)
 
-    def normalizar_skill(s):
-        s = s or ''
-        s = re.sub(r"\s*\(.*?\)\s*", '', s)  # remove níveis/parenteses
-        return s.strip().lower()
-
-    habilidades_decl = funcionario.get('habilidades_declaradas', [])
-    habilidades_desc = [h['skill'] for h in funcionario.get('habilidades_descobertas', [])]
-
-    mapa_func = {}
-    for s in habilidades_decl + habilidades_desc:
-        mapa_func[normalizar_skill(s)] = s
-
-    recomendacoes = []
-    for vaga in vagas:
-        habilidades_req = vaga.get('habilidades_requeridas', [])
-        mapa_vaga = {normalizar_skill(s): s for s in habilidades_req}
-        chaves_func = set(mapa_func.keys())
-        chaves_vaga = set(mapa_vaga.keys())
-        chaves_comuns = chaves_func.intersection(chaves_vaga)
-        
-        if chaves_comuns:
-            compatibilidade = round((len(chaves_comuns) / len(chaves_vaga)) * 100) if chaves_vaga else 0
-            limiar = request.args.get('limiar', default=COMPATIBILIDADE_LIMIAR, type=int)
-            if compatibilidade > limiar:
-                recomendacoes.append({
-                    "id": vaga['id'],
-                    "titulo": vaga['titulo'],
-                    "compatibilidade": compatibilidade,
-                    "habilidades_em_comum": [mapa_vaga[k] for k in sorted(chaves_comuns)],
-                    "habilidades_a_desenvolver": [mapa_vaga[k] for k in sorted(chaves_vaga - chaves_func)]
-                })
-    
-    recomendacoes.sort(key=lambda x: x['compatibilidade'], reverse=True)
-    
-    funcionario['recomendacoes_vagas'] = recomendacoes
+    modo = request.args.get('modo', '')
+    limiar = request.args.get('limiar', default=None if modo == 'semantico' else COMPATIBILIDADE_LIMIAR, type=int)
+    with etapa('compatibilidade'):
+        recomendacoes = recomendar(snapshot, funcionario, modo, limiar)
+
+    with etapa('render'):
+        return render_template('perfil.html', funcionario=funcionario, resultado=ResultadoPerfil(recomendacoes), modo=modo)
+
+@main.route('/vaga/<int:id>/candidatos')
+def candidatos_vaga(id):
+    snapshot = load_snapshot()
+    vaga = snapshot.vaga(id)
+    if vaga is None:
+        abort(404)
+
+    limiar = request.args.get('limiar', default=COMPATIBILIDADE_LIMIAR, type=int)
+    limite = min(max(request.args.get('limite', default=10, type=int), 1), POR_PAGINA_MAX)
+    with etapa('candidatos'):
+        candidatos = snapshot.candidatos.candidatos(vaga, k=limite, limiar=limiar)
 
-    return render_template('perfil.html', funcionario=funcionario)
+    return render_template('candidatos.html', vaga=vaga, candidatos=candidatos, limiar=limiar, limite=limite)
 
 @main.route('/atualizar_skills')
 def atualizar_skills():
@@ -215,129 +264,44 @@ def atualizar_skills():
     if db is None:
         return redirect(url_for('main.dashboard', erro_conexao=1))
     try:
-        projetos = list(db.projetos.find({}, {'_id': 0}))
-        skills = set(SKILLS_CONHECIDAS)
-        regex = re.compile(r"\b(" + "|".join(re.escape(s) for s in skills) + r")\b", re.IGNORECASE)
-        from datetime import datetime
-        hoje = datetime.utcnow().strftime('%Y-%m-%d')
-        for projeto in projetos:
-            participantes = projeto.get('participantes', [])
-            encontrados = set()
-            for tarefa in projeto.get('tarefas', []):
-                texto = (tarefa.get('descricao', '') or '').lower()
-                for m in regex.findall(texto):
-                    encontrados.add(m.strip())
-            for pid in participantes:
-                doc = db.funcionarios.find_one({'id': pid})
-                if not doc:
-                    continue
-                existentes = doc.get('habilidades_descobertas', []) or []
-                existentes_map = { (e.get('skill') or '').strip().lower() for e in existentes if isinstance(e, dict) }
-                novos = []
-                for s in sorted(encontrados):
-                    k = re.sub(r"\s*\(.*?\)\s*", '', s).strip().lower()
-                    if k and k not in existentes_map:
-                        novos.append({'skill': k.capitalize(), 'origem': 'NLP (projetos)', 'data': hoje})
-                if novos:
-                    db.funcionarios.update_one({'id': pid}, {'$set': {'habilidades_descobertas': existentes + novos}})
-        return redirect(url_for('main.dashboard', updated=1))
+        relatorio = descobrir_skills(db, ao_gravar=lambda pares: registrar_alteracoes(db, pares))
+        invalidar_cache(db)
+        return redirect(url_for('main.dashboard', updated=1, tocados=relatorio['documentos_tocados']))
     except Exception:
+        invalidar_cache(None)
         return redirect(url_for('main.dashboard', updated=0))
 
-@main.route('/graficos')
-def graficos():
-    funcionarios, vagas = load_data()
+def dados_graficos():
+    """Séries dos gráficos: top skills, áreas, faixas de compatibilidade e cobertura de projetos."""
+    with etapa('snapshot'):
+        snapshot = load_snapshot()
+    funcionarios = snapshot.funcionarios
     db_error = None
     db = get_db()
     if db is None:
         db_error = 'Erro de conexão com MongoDB.'
-    def normalizar_skill(s):
-        s = s or ''
-        s = re.sub(r"\s*\(.*?\)\s*", '', s)
-        return s.strip().lower()
-
-    contagem = {}
-    display_map = {}
-    for f in funcionarios:
-        habilidades_declaradas = f.get('habilidades_declaradas', [])
-        habilidades_descobertas = [h['skill'] for h in f.get('habilidades_descobertas', [])]
-        for s in habilidades_declaradas + habilidades_descobertas:
-            k = normalizar_skill(s)
-            if k:
-                contagem[k] = contagem.get(k, 0) + 1
-                if k not in display_map:
-                    display_map[k] = s
-    top_labels = [display_map[k] for k, _ in sorted(contagem.items(), key=lambda x: x[1], reverse=True)[:10]]
-    top_values = [contagem[normalizar_skill(lbl)] for lbl in top_labels]
-
-    area_counts = {}
-    compat_values = []
-    for f in funcionarios:
-        habilidades_decl = f.get('habilidades_declaradas', [])
-        habilidades_desc = [h['skill'] for h in f.get('habilidades_descobertas', [])]
-        mapa_func = {normalizar_skill(s) for s in (habilidades_decl + habilidades_desc)}
-        melhor = 0
-        melhor_area = ''
-        for vaga in vagas:
-            mapa_vaga = {normalizar_skill(s) for s in vaga.get('habilidades_requeridas', [])}
-            if not mapa_vaga:
-                continue
-            comuns = mapa_func.intersection(mapa_vaga)
-            comp = round((len(comuns) / len(mapa_vaga)) * 100)
-            if comp > melhor:
-                melhor = comp
-                melhor_area = vaga.get('area', '')
-        compat_values.append(melhor)
-        if melhor_area:
-            area_counts[melhor_area] = area_counts.get(melhor_area, 0) + 1
-
-    bins = [0, 20, 40, 60, 80, 100]
-    dist_labels = ["0-20", "21-40", "41-60", "61-80", "81-100"]
-    dist_values = [0, 0, 0, 0, 0]
-    for v in compat_values:
-        if v <= 20:
-            dist_values[0] += 1
-        elif v <= 40:
-            dist_values[1] += 1
-        elif v <= 60:
-            dist_values[2] += 1
-        elif v <= 80:
-            dist_values[3] += 1
-        else:
-            dist_values[4] += 1
-
-    projetos = list(db.projetos.find({}, {'_id': 0})) if db is not None else []
-    mapa_func = {f['id']: f for f in funcionarios}
+    with etapa('agregados'):
+        agregados = load_agregados(snapshot)
+        if agregados is None:
+            agregados = aggregates.calcular(funcionarios, snapshot.matcher)
+            agregados['skills'] = sorted(agregados['skills'], key=lambda x: x['count'], reverse=True)
+    top_labels = [item['skill'] for item in agregados['skills'][:10]]
+    top_values = [item['count'] for item in agregados['skills'][:10]]
+    area_counts = agregados['areas']
+    dist_labels = FAIXAS_LABELS
+    dist_values = agregados['distribuicao']
+
     proj_labels = []
     proj_values = []
-    for proj in projetos:
-        participantes = proj.get('participantes', [])
-        total = len(participantes) or 1
-        skills_req = set()
-        for t in proj.get('tarefas', []):
-            encontrados = re.findall(r"\b(" + "|".join(re.escape(s) for s in SKILLS_CONHECIDAS) + r")\b", t.get('descricao', '').lower())
-            for s in encontrados:
-                skills_req.add(normalizar_skill(s))
-        if not skills_req:
+    with etapa('cobertura'):
+        cobertura = load_cobertura(snapshot)
+    for proj in cobertura:
+        if proj['media'] is None:
             continue
-        cobertura_percent = []
-        for s in skills_req:
-            tem = 0
-            for pid in participantes:
-                f = mapa_func.get(pid)
-                if not f:
-                    continue
-                decl = {normalizar_skill(x) for x in f.get('habilidades_declaradas', [])}
-                desc = {normalizar_skill(x.get('skill')) for x in f.get('habilidades_descobertas', [])}
-                if s in decl or s in desc:
-                    tem += 1
-            cobertura_percent.append((tem / total) * 100)
-        media = round(sum(cobertura_percent) / len(cobertura_percent))
-        proj_labels.append(proj.get('nome_projeto'))
-        proj_values.append(media)
-
-    return render_template(
-        'graficos.html',
+        proj_labels.append(proj['nome'])
+        proj_values.append(proj['media'])
+
+    return dict(
         top_labels=top_labels,
         top_values=top_values,
         area_labels=list(area_counts.keys()),
@@ -349,6 +313,51 @@ def graficos():
         db_error=db_error
     )
 
+@main.route('/graficos')
+@pagina_em_cache()
+def graficos():
+    dados = dados_graficos()
+    with etapa('render'):
+        return render_template('graficos.html', **dados)
+
+@main.route('/projetos/cobertura')
+def projetos_cobertura():
+    cobertura = load_cobertura(load_snapshot())
+    id_projeto = request.args.get('id_projeto', type=int)
+    if id_projeto is not None:
+        cobertura = [p for p in cobertura if p['id_projeto'] == id_projeto]
+    return jsonify(cobertura)
+
+@main.route('/status/cache')
+def status_cache():
+    return jsonify(dict(current_app.config['CACHE'].estatisticas(), respostas=current_app.config['RESPOSTAS'].estatisticas(), busca=current_app.config['BUSCA'].estatisticas(), semantico=current_app.config['SEMANTICO'].estatisticas()))
+
+@main.route('/healthz')
+def healthz():
+    """
+    Prontidão: 200 com o aquecimento concluído e o banco acessível; 503 durante
+    a inicialização ou com o circuito aberto. Não consulta dados.
+    """
+    db = get_db()
+    pronto = db is not None and current_app.config['PRONTO'].is_set()
+    situacao = current_app.config['CONEXAO'].situacao()
+    return jsonify(dict(situacao, pronto=pronto, inicializacao=current_app.config['INICIALIZACAO'])), (200 if pronto else 503)
+
+@main.route('/metrics')
+def metrics():
+    """Métricas no formato texto do Prometheus, com o estado dos caches e do banco como gauges."""
+    extras = []
+    for nome, estatisticas in (('snapshot', current_app.config['CACHE'].estatisticas()), ('respostas', current_app.config['RESPOSTAS'].estatisticas())):
+        for campo in ('hits', 'misses', 'hit_ratio'):
+            extras.append((f'talentflow_cache_{campo}', (('cache', nome),), estatisticas[campo]))
+    extras.append(('talentflow_cache_respostas_bytes', (), current_app.config['RESPOSTAS'].estatisticas()['bytes']))
+    extras.append(('talentflow_db_circuito_aberto', (), int(current_app.config['CONEXAO'].estado != 'fechado')))
+    inicializacao = current_app.config['INICIALIZACAO']
+    for nome, segundos in [('create_app', inicializacao['create_app_s']), ('pronto', inicializacao['pronto_s'])] + sorted(inicializacao['etapas'].items()):
+        if segundos is not None:
+            extras.append(('talentflow_inicializacao_segundos', (('etapa', nome),), segundos))
+    return Response(REGISTRO.texto(extras), mimetype='text/plain; version=0.0.4')
+
 @main.route('/styleguide')
 def styleguide():
     return render_template('styleguide.html')
@@ -366,16 +375,21 @@ def novo_usuario():
         if db is None:
             return render_template('upload_usuarios.html', erro='Sem conexão com MongoDB. Configure MONGODB_URI/MONGODB_DB e reinicie.'), 500
 
-        max_doc = db.funcionarios.find_one(sort=[('id', -1)])
-        novo_id = (max_doc['id'] + 1) if max_doc and 'id' in max_doc else 1
-        db.funcionarios.insert_one({
-            'id': novo_id,
+        doc = {
+            'id': indexes.reservar_ids(db, 1)[0],
             'nome': nome,
             'cargo': cargo,
             'email': email,
             'habilidades_declaradas': habilidades_lista,
             'habilidades_descobertas': []
-        })
+        }
+        matcher = load_snapshot().matcher
+        doc.update(indexes.campos_derivados(doc, matcher))
+        _, conflitos = indexes.inserir_funcionarios(db, [doc])
+        if conflitos:
+            return render_template('novo_usuario.html', erro=f'Já existe um colaborador com o email {email}.', form=request.form), 409
+        aggregates.registrar_inclusao(db, [doc], matcher)
+        invalidar_cache(db)
         return redirect(url_for('main.dashboard', created=1))
     return render_template('novo_usuario.html')
 
@@ -385,6 +399,7 @@ def upload_usuarios():
         file = request.files.get('arquivo')
         if not file or not file.filename.lower().endswith('.xlsx'):
             return redirect(url_for('main.upload_usuarios', erro=1))
+        from openpyxl import load_workbook
         wb = load_workbook(filename=file, read_only=True)
         ws = wb['Funcionarios'] if 'Funcionarios' in wb.sheetnames else wb.active
         rows = list(ws.iter_rows(values_only=True))
@@ -393,109 +408,71 @@ def upload_usuarios():
         header = [str(h).strip().lower() if h is not None else '' for h in rows[0]]
         idx = {k: header.index(k) if k in header else -1 for k in ['id','nome','cargo','email','habilidades_declaradas']}
         novos = []
-        for r in rows[1:]:
+        for linha, r in enumerate(rows[1:], start=2):
             nome = (r[idx['nome']] if idx['nome']!=-1 else '') or ''
             cargo = (r[idx['cargo']] if idx['cargo']!=-1 else '') or ''
             email = (r[idx['email']] if idx['email']!=-1 else '') or ''
             habilidades_raw = (r[idx['habilidades_declaradas']] if idx['habilidades_declaradas']!=-1 else '') or ''
             habilidades = [h.strip() for h in str(habilidades_raw).split(',') if str(h).strip()] if habilidades_raw else []
             if nome and cargo and email:
-                novos.append({'nome': nome, 'cargo': cargo, 'email': email, 'habilidades_declaradas': habilidades})
+                novos.append((linha, {'nome': nome, 'cargo': cargo, 'email': email, 'habilidades_declaradas': habilidades}))
         db = get_db()
         if db is None:
             return render_template('upload_usuarios.html', erro='Sem conexão com MongoDB. Configure MONGODB_URI/MONGODB_DB e reinicie.'), 500
-        existentes = set(doc.get('email') for doc in db.funcionarios.find({}, {'email': 1, '_id': 0}))
-        max_doc = db.funcionarios.find_one(sort=[('id', -1)])
-        next_id = (max_doc['id'] + 1) if max_doc and 'id' in max_doc else 1
+        matcher = load_snapshot().matcher
+        ids = indexes.reservar_ids(db, len(novos)) if novos else []
         docs = []
-        importados = 0
-        for n in novos:
-            if n['email'] in existentes:
-                continue
+        for novo_id, (_, n) in zip(ids, novos):
             docs.append({
-                'id': next_id,
+                'id': novo_id,
                 'nome': n['nome'],
                 'cargo': n['cargo'],
                 'email': n['email'],
                 'habilidades_declaradas': n['habilidades_declaradas'],
                 'habilidades_descobertas': []
             })
-            next_id += 1
-            importados += 1
-        if docs:
-            db.funcionarios.insert_many(docs)
+            docs[-1].update(indexes.campos_derivados(docs[-1], matcher))
+        inseridos, conflitos = indexes.inserir_funcionarios(db, docs)
+        importados = len(inseridos)
+        if inseridos:
+            aggregates.registrar_inclusao(db, inseridos, matcher)
+            invalidar_cache(db)
+        if conflitos:
+            repetidos = [{'linha': novos[i][0], 'email': doc['email']} for i, doc in conflitos]
+            return render_template('upload_usuarios.html', importados=importados, repetidos=repetidos)
         return redirect(url_for('main.dashboard', importados=importados))
     return render_template('upload_usuarios.html')
 
 @main.route('/plano_carreira/<int:id>', methods=['POST'])
 def plano_carreira(id):
-    funcionarios, vagas = load_data()
-    funcionario = next((f for f in funcionarios if f['id'] == id), None)
+    snapshot = load_snapshot()
+    funcionario = snapshot.funcionario(id)
     if not funcionario:
         abort(404)
 
-    def normalizar_skill(s):
-        s = s or ''
-        s = re.sub(r"\s*\(.*?\)\s*", '', s)
-        return s.strip().lower()
-
-    habilidades_decl = funcionario.get('habilidades_declaradas', [])
-    habilidades_desc = [h['skill'] for h in funcionario.get('habilidades_descobertas', [])]
-    mapa_func = {}
-    for s in habilidades_decl + habilidades_desc:
-        mapa_func[normalizar_skill(s)] = s
-
-    recomendacoes = []
-    for vaga in vagas:
-        habilidades_req = vaga.get('habilidades_requeridas', [])
-        mapa_vaga = {normalizar_skill(s): s for s in habilidades_req}
-        chaves_func = set(mapa_func.keys())
-        chaves_vaga = set(mapa_vaga.keys())
-        chaves_comuns = chaves_func.intersection(chaves_vaga)
-        if chaves_comuns:
-            compatibilidade = round((len(chaves_comuns) / len(chaves_vaga)) * 100) if chaves_vaga else 0
-            recomendacoes.append({
-                "id": vaga['id'],
-                "titulo": vaga['titulo'],
-                "compatibilidade": compatibilidade,
-                "habilidades_em_comum": [mapa_vaga[k] for k in sorted(chaves_comuns)],
-                "habilidades_a_desenvolver": [mapa_vaga[k] for k in sorted(chaves_vaga - chaves_func)]
-            })
-    recomendacoes.sort(key=lambda x: x['compatibilidade'], reverse=True)
+    recomendacoes = snapshot.matcher.recomendar(funcionario)
+    resultado = ResultadoPerfil(recomendacoes)
+
+    gerador = current_app.config['PLANOS']
+    if not os.getenv('OPENAI_API_KEY') and not os.getenv('OPENAI_FAKE'):
+        resultado.plano_carreira_erro = 'Chave de API ausente (OPENAI_API_KEY).'
+        return render_template('perfil.html', funcionario=funcionario, resultado=resultado)
 
-    api_key = os.getenv('OPENAI_API_KEY')
-    plano = None
-    erro_ai = None
-    if not api_key:
-        erro_ai = 'Chave de API ausente (OPENAI_API_KEY).'
+    db = get_db()
+    chave = gerador.solicitar(montar_mensagens(funcionario, recomendacoes), db)
+    status = gerador.status(chave, db)
+    if status['status'] == 'concluido':
+        resultado.plano_carreira = status['plano']
+    elif status['status'] == 'erro':
+        resultado.plano_carreira_erro = status['erro']
     else:
-        try:
-            client = OpenAI(api_key=api_key)
-            mensagens = [
-                {"role": "system", "content": "Você é um assistente de carreira. Gere plano prático e acionável."},
-                {"role": "user", "content": (
-                    f"Nome: {funcionario.get('nome')}\n"
-                    f"Cargo atual: {funcionario.get('cargo')}\n"
-                    f"Habilidades declaradas: {', '.join(habilidades_decl) or 'Nenhuma'}\n"
-                    f"Habilidades descobertas: {', '.join(habilidades_desc) or 'Nenhuma'}\n"
-                    f"Recomendações internas: "
-                    + ", ".join([f"{r['titulo']} ({r['compatibilidade']}%)" for r in recomendacoes[:5]])
-                    + "\nCrie um plano de carreira de 6-12 meses com: metas mensais, projetos internos sugeridos, habilidades a desenvolver e cursos/trilhas curtas. Linguagem objetiva em bullet points.\n"
-                    + "Inclua recomendações de cursos com plataforma (somente: Alura, Data Science Academy, Udemy, Microsoft Learning), carga horária estimada e nível (iniciante/intermediário/avançado). Não sugira plataformas fora dessa lista."
-                )}
-            ]
-            resp = client.chat.completions.create(model=os.getenv('OPENAI_MODEL', 'gpt-5-nano'), messages=mensagens)
-            plano = resp.choices[0].message.content
-        except Exception as e:
-            erro_ai = str(e)
+        resultado.plano_carreira_job = chave
 
-    funcionario['recomendacoes_vagas'] = recomendacoes
-    if plano:
-        funcionario['plano_carreira'] = plano
-    if erro_ai:
-        funcionario['plano_carreira_erro'] = erro_ai
+    return render_template('perfil.html', funcionario=funcionario, resultado=resultado)
 
-    return render_template('perfil.html', funcionario=funcionario)
+@main.route('/plano_carreira/status/<chave>')
+def plano_carreira_status(chave):
+    return jsonify(current_app.config['PLANOS'].status(chave, get_db()))
 
 @main.app_errorhandler(404)
 def page_not_found(e):
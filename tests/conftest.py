@@ -0,0 +1,35 @@
+import os
+import uuid
+
+import pytest
+
+from app import armazenamento
+
+BACKENDS = ('json', 'sqlite', 'sqlite_memoria', 'mongo')
+
+def abrir_repositorio(backend, tmp_path):
+    """Repositório vazio do backend; mongo só com TALENTFLOW_MONGODB_URI_TESTE (um banco descartável por teste)."""
+    if backend == 'json':
+        return armazenamento.RepositorioJSON(str(tmp_path / 'json'))
+    if backend == 'sqlite':
+        return armazenamento.RepositorioSQLite(str(tmp_path / 'talentflow.sqlite3'))
+    if backend == 'sqlite_memoria':
+        return armazenamento.RepositorioSQLite(':memory:')
+    uri = os.getenv('TALENTFLOW_MONGODB_URI_TESTE')
+    if not uri:
+        pytest.skip('TALENTFLOW_MONGODB_URI_TESTE não definido')
+    from pymongo import MongoClient
+    from app.repositorio import RepositorioMongo
+    cliente = MongoClient(uri, serverSelectionTimeoutMS=2000)
+    nome = f"talentflow_teste_{uuid.uuid4().hex[:8]}"
+    repositorio = RepositorioMongo(cliente[nome])
+    repositorio.descartar = lambda: cliente.drop_database(nome)
+    return repositorio
+
+@pytest.fixture(params=BACKENDS)
+def repositorio(request, tmp_path):
+    repositorio = abrir_repositorio(request.param, tmp_path)
+    yield repositorio
+    descartar = getattr(repositorio, 'descartar', None)
+    if descartar is not None:
+        descartar()
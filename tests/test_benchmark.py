@@ -0,0 +1,12 @@
+from app import armazenamento
+from app.benchmark import preparar_banco
+from app.data.gerador import gerar_dados
+
+def test_preparar_banco_no_sqlite_padrao():
+    dados = gerar_dados(50, 10, 10, seed=1)
+    db = armazenamento.abrir('sqlite', ':memory:')
+    preparar_banco(db, dados)
+    assert db.contar_funcionarios({}) == 50
+    assert list(db.funcionarios_sem_derivados()) == []
+    assert db.agregado_total() == 50
+    assert db.email_unico()
@@ -0,0 +1,53 @@
+import pytest
+from pymongo.errors import AutoReconnect
+
+from app.db import Conexao
+
+class BancoInstavel:
+    def __init__(self):
+        self.fora = False
+
+    def versao_dados(self):
+        if self.fora:
+            raise AutoReconnect('conexão perdida')
+        return 1
+
+    def listar(self, colecao, campos=None, lote=None):
+        def docs():
+            yield {'id': 1}
+            if self.fora:
+                raise AutoReconnect('conexão perdida no cursor')
+        return docs()
+
+    def contar_funcionarios(self, filtro):
+        raise ValueError('consulta inválida')
+
+def test_falhas_de_qualquer_chamada_abrem_o_circuito():
+    banco = BancoInstavel()
+    conexao = Conexao.de_banco(banco)
+    conexao.falhas_para_abrir = 2
+    db, _ = conexao.obter()
+    assert db.versao_dados() == 1
+    banco.fora = True
+    with pytest.raises(AutoReconnect):
+        db.versao_dados()
+    with pytest.raises(AutoReconnect):
+        list(db.listar('funcionarios'))
+    assert conexao.estado == Conexao.ABERTO
+    assert conexao.obter() == (None, 'conexão perdida no cursor')
+
+def test_sucesso_zera_e_erros_de_consulta_nao_contam():
+    banco = BancoInstavel()
+    conexao = Conexao.de_banco(banco)
+    conexao.falhas_para_abrir = 2
+    db, _ = conexao.obter()
+    banco.fora = True
+    with pytest.raises(AutoReconnect):
+        db.versao_dados()
+    banco.fora = False
+    assert list(db.listar('funcionarios')) == [{'id': 1}]
+    assert conexao.falhas == 0
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            db.contar_funcionarios({})
+    assert conexao.estado == Conexao.FECHADO
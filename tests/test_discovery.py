@@ -0,0 +1,40 @@
+from app import armazenamento
+from app.nlp.discovery import descobrir_skills
+
+SKILLS = ('python', 'sql')
+
+def banco(projetos, funcionarios):
+    db = armazenamento.RepositorioSQLite(':memory:')
+    db.inserir('projetos', projetos)
+    db.inserir('funcionarios', funcionarios)
+    return db
+
+def funcionario(id):
+    return {'id': id, 'nome': f'F{id}', 'email': f'f{id}@x', 'habilidades_declaradas': [], 'habilidades_descobertas': []}
+
+def descobertas(db, id):
+    return sorted(h['skill'].lower() for h in db.funcionario(id)['habilidades_descobertas'])
+
+def test_projetos_com_o_mesmo_id_tem_marcas_separadas():
+    projetos = [
+        {'id_projeto': 5, 'participantes': [1], 'tarefas': [{'descricao': 'API em Python'}]},
+        {'id_projeto': 5, 'participantes': [2], 'tarefas': [{'descricao': 'Relatórios em SQL'}]},
+    ]
+    db = banco(projetos, [funcionario(1), funcionario(2)])
+    relatorio = descobrir_skills(db, skills=SKILLS)
+    assert relatorio['projetos_processados'] == 2
+    assert set(db.marcas_descoberta()) == {5, '5#2'}
+    assert descobertas(db, 1) == ['python'] and descobertas(db, 2) == ['sql']
+    assert descobrir_skills(db, skills=SKILLS)['projetos_ignorados'] == 2
+
+def test_participante_ausente_adia_a_marca():
+    projetos = [{'id_projeto': 7, 'participantes': [1, 2], 'tarefas': [{'descricao': 'ETL com Python'}]}]
+    db = banco(projetos, [funcionario(1)])
+    relatorio = descobrir_skills(db, skills=SKILLS)
+    assert relatorio['projetos_incompletos'] == 1
+    assert db.marcas_descoberta() == {}
+    db.inserir('funcionarios', [funcionario(2)])
+    relatorio = descobrir_skills(db, skills=SKILLS)
+    assert relatorio['projetos_processados'] == 1 and relatorio['projetos_incompletos'] == 0
+    assert descobertas(db, 2) == ['python']
+    assert set(db.marcas_descoberta()) == {7}
@@ -0,0 +1,18 @@
+import csv
+import io
+
+from app.exportacao import gerar_csv, gerar_xlsx
+
+FUNCIONARIOS = [{'id': 1, 'nome': '=HYPERLINK("http://x")', 'cargo': '-Dev', 'email': '@ana', 'habilidades_declaradas': ['+Python', 'SQL'], 'melhor_compatibilidade': -3}]
+
+def test_csv_neutraliza_formulas():
+    linhas = list(csv.reader(io.StringIO(''.join(gerar_csv(FUNCIONARIOS)).lstrip('﻿'))))
+    assert linhas[1][:5] == ["1", "'=HYPERLINK(\"http://x\")", "'-Dev", "'@ana", "'+Python, SQL"]
+    assert linhas[1][-1] == '-3'
+
+def test_xlsx_grava_formulas_como_texto():
+    from openpyxl import load_workbook
+    ws = load_workbook(io.BytesIO(b''.join(gerar_xlsx(FUNCIONARIOS))))['Funcionarios']
+    celulas = list(ws.iter_rows(min_row=2))[0]
+    assert [c.value for c in celulas[1:4]] == ['=HYPERLINK("http://x")', '-Dev', '@ana']
+    assert all(c.data_type == 's' for c in celulas[1:5])
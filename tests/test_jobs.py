@@ -0,0 +1,75 @@
+import threading
+
+from app import armazenamento
+from app.jobs import ClienteOpenAIFalso, GeradorPlanos
+
+MENSAGENS = [{'role': 'user', 'content': 'Nome: Ana'}]
+
+class ClienteComErro:
+    def __init__(self):
+        self.chat = self
+        self.completions = self
+
+    def create(self, **kwargs):
+        raise RuntimeError('cota excedida')
+
+def test_pedidos_iguais_chamam_a_api_uma_vez():
+    cliente = ClienteOpenAIFalso(atraso=0.05)
+    gerador = GeradorPlanos(lambda: cliente)
+    chaves = {gerador.solicitar(MENSAGENS) for _ in range(5)}
+    assert len(chaves) == 1
+    chave = chaves.pop()
+    assert gerador.aguardar(chave, timeout=5)['status'] == 'concluido'
+    gerador.solicitar(MENSAGENS)
+    assert cliente.chamadas == 1
+    assert gerador.hits == 5
+
+def test_workers_no_mesmo_banco_chamam_a_api_uma_vez(tmp_path):
+    caminho = str(tmp_path / 'talentflow.sqlite3')
+    cliente = ClienteOpenAIFalso(atraso=0.05)
+    workers = [(GeradorPlanos(lambda: cliente), armazenamento.RepositorioSQLite(caminho)) for _ in range(4)]
+    barreira = threading.Barrier(len(workers))
+    chaves = []
+
+    def pedir(gerador, db):
+        barreira.wait()
+        chaves.append(gerador.solicitar(MENSAGENS, db))
+
+    threads = [threading.Thread(target=pedir, args=w) for w in workers]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for gerador, db in workers:
+        gerador.aguardar(chaves[0], timeout=5, db=db)
+    assert cliente.chamadas == 1
+    for gerador, db in workers:
+        assert gerador.status(chaves[0], db)['status'] == 'concluido'
+        db.fechar()
+
+def test_plano_concluido_fica_gravado():
+    db = armazenamento.RepositorioSQLite(':memory:')
+    cliente = ClienteOpenAIFalso(resposta='Plano de 6 meses')
+    gerador = GeradorPlanos(lambda: cliente, modelo='modelo-teste')
+    chave = gerador.solicitar(MENSAGENS, db)
+    assert gerador.aguardar(chave, timeout=5, db=db) == {'status': 'concluido', 'plano': 'Plano de 6 meses'}
+    gravado = db.ler_plano(chave)
+    assert gravado['status'] == 'concluido' and gravado['plano'] == 'Plano de 6 meses'
+    assert gravado['modelo'] == 'modelo-teste'
+    # Outro worker reaproveita o plano gravado sem chamar a API.
+    outro = GeradorPlanos(lambda: cliente, modelo='modelo-teste')
+    assert outro.solicitar(MENSAGENS, db) == chave
+    assert outro.status(chave, db)['plano'] == 'Plano de 6 meses'
+    assert cliente.chamadas == 1
+
+def test_erro_da_api_e_refeito_no_proximo_pedido():
+    db = armazenamento.RepositorioSQLite(':memory:')
+    gerador = GeradorPlanos(ClienteComErro)
+    chave = gerador.solicitar(MENSAGENS, db)
+    assert gerador.aguardar(chave, timeout=5, db=db) == {'status': 'erro', 'erro': 'cota excedida'}
+    assert db.ler_plano(chave)['status'] == 'erro'
+    cliente = ClienteOpenAIFalso(resposta='Plano')
+    outro = GeradorPlanos(lambda: cliente)
+    outro.solicitar(MENSAGENS, db)
+    assert outro.aguardar(chave, timeout=5, db=db)['status'] == 'concluido'
+    assert cliente.chamadas == 1
@@ -0,0 +1,56 @@
+import time
+
+import pytest
+from flask import Flask, Response
+
+from app import metrics
+
+def medicao(rota):
+    historico = metrics.REGISTRO._histogramas.get(('talentflow_requisicao_segundos', (('rota', rota), ('metodo', 'GET'))))
+    return (historico.total, historico.soma) if historico else (0, 0.0)
+
+def requisicoes(rota, status):
+    return metrics.REGISTRO._contadores.get(('talentflow_requisicoes_total', (('rota', rota), ('metodo', 'GET'), ('status', status))), 0)
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    metrics.instalar(app)
+
+    @app.route('/fluxo')
+    def teste_metricas_fluxo():
+        def gerar():
+            yield 'a'
+            time.sleep(0.05)
+            yield 'b'
+        return Response(gerar())
+
+    @app.route('/falha')
+    def teste_metricas_falha():
+        raise RuntimeError('falhou')
+
+    return app
+
+def test_resposta_em_fluxo_conta_o_envio_do_corpo(app):
+    antes = medicao('teste_metricas_fluxo')
+    resposta = app.test_client().get('/fluxo')
+    assert resposta.data == b'ab'
+    # A medição fecha com a resposta, como faz o servidor WSGI depois de enviar o corpo.
+    assert medicao('teste_metricas_fluxo') == antes
+    resposta.close()
+    total, soma = medicao('teste_metricas_fluxo')
+    assert total == antes[0] + 1
+    assert soma - antes[1] >= 0.05
+
+def test_excecao_nao_tratada_e_medida(app):
+    for testing in (False, True):
+        app.testing = testing
+        antes = requisicoes('teste_metricas_falha', 500)
+        if testing:
+            with pytest.raises(RuntimeError):
+                app.test_client().get('/falha')
+        else:
+            resposta = app.test_client().get('/falha')
+            assert resposta.status_code == 500
+            resposta.close()
+        assert requisicoes('teste_metricas_falha', 500) == antes + 1
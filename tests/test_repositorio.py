@@ -0,0 +1,186 @@
+"""Contrato de app.repositorio, o mesmo para os backends json, sqlite e mongo."""
+import pytest
+
+from app import armazenamento
+from conftest import abrir_repositorio
+
+def funcionario(id, nome, cargo='Dev', email=None, skills=(), compat=None, area=None):
+    doc = {'id': id, 'nome': nome, 'cargo': cargo, 'email': email or f'f{id}@x.com', 'habilidades_declaradas': list(skills)}
+    if compat is not None:
+        doc.update(skills_normalizadas=[s.lower() for s in skills], melhor_compatibilidade=compat, area_top=area)
+    return doc
+
+@pytest.fixture
+def povoado(repositorio):
+    repositorio.inserir('funcionarios', [
+        funcionario(1, 'Bia', 'Dev', skills=['Python', 'SQL'], compat=80, area='Tecnologia'),
+        funcionario(2, 'Ana', 'Analista', skills=['SQL'], compat=50, area='Dados'),
+        funcionario(3, 'Caio', 'Dev', skills=['Go', 'Python'], compat=80, area='Tecnologia'),
+        funcionario(4, 'Ana', 'Gerente', skills=[]),
+    ])
+    repositorio.inserir('vagas', [{'id': 10, 'titulo': 'Back-end', 'habilidades_requeridas': ['Python']}])
+    repositorio.inserir('projetos', [{'id_projeto': 5, 'participantes': [1, 2], 'tarefas': [{'descricao': 'api', 'horas': 3}]}])
+    repositorio.garantir_indices()
+    return repositorio
+
+def ids(docs):
+    return [d['id'] for d in docs]
+
+def test_listar_projeta_campos_sem_id_interno(povoado):
+    assert povoado.listar('vagas') == [{'id': 10, 'titulo': 'Back-end', 'habilidades_requeridas': ['Python']}]
+    assert povoado.listar('projetos', ('id_projeto', 'tarefas.descricao')) == [{'id_projeto': 5, 'tarefas': [{'descricao': 'api'}]}]
+    assert ids(povoado.listar('funcionarios', ('id',))) == [1, 2, 3, 4]
+
+def test_consultas_por_id(povoado):
+    assert povoado.funcionario(3)['nome'] == 'Caio'
+    assert povoado.funcionario(99) is None
+    assert sorted(ids(list(povoado.funcionarios_por_id([3, 1, 99], ('id',))))) == [1, 3]
+    assert ids(list(povoado.funcionarios_sem_derivados(('id',)))) == [4]
+    assert povoado.maior_id_funcionario() == 4
+
+def test_email_unico_recusa_repetidos(povoado):
+    assert povoado.email_unico()
+    recusados = povoado.inserir_funcionarios([funcionario(5, 'Duda', email='f1@x.com'), funcionario(6, 'Edu'), funcionario(7, 'Fê', email='f6@x.com')])
+    assert recusados == [0, 2]
+    assert povoado.emails_existentes(['f6@x.com', 'f1@x.com', 'z@x.com']) == {'f6@x.com', 'f1@x.com'}
+    assert povoado.maior_id_funcionario() == 6
+
+def test_base_com_repetidos_fica_sem_indice_unico(repositorio):
+    repositorio.inserir('funcionarios', [funcionario(1, 'A', email='r@x.com'), funcionario(2, 'B', email='r@x.com')])
+    repositorio.garantir_indices()
+    assert not repositorio.email_unico()
+    assert repositorio.inserir_funcionarios([funcionario(3, 'C', email='r@x.com')]) == []
+
+def test_filtros_ordem_e_paginacao(povoado):
+    assert povoado.contar_funcionarios({}) == 4
+    assert povoado.contar_funcionarios({'skills': [['python']]}) == 2
+    assert povoado.contar_funcionarios({'skills': [['python'], ['sql', 'go']]}) == 2
+    assert povoado.contar_funcionarios({'skills': [['python'], ['sql']], 'cargo': ['Dev']}) == 1
+    assert povoado.contar_funcionarios({'cargo': []}) == 0
+    assert ids(povoado.pagina_funcionarios({}, 'nome')) == [2, 4, 1, 3]
+    assert ids(povoado.pagina_funcionarios({}, 'compat')) == [1, 3, 2, 4]
+    assert ids(povoado.pagina_funcionarios({}, 'nome', pular=1, limite=2, campos=('id',))) == [4, 1]
+    assert ids(list(povoado.iterar_funcionarios({'area_top': ['Tecnologia']}, 'compat', ('id',), lote=1))) == [1, 3]
+    assert sorted(povoado.valores_distintos('area_top')) == ['Dados', 'Tecnologia']
+    assert sorted(povoado.valores_distintos('skills_normalizadas')) == ['go', 'python', 'sql']
+
+def test_contar_skills(povoado):
+    assert povoado.contar_skills({}) == {'python': 2, 'sql': 2, 'go': 1}
+    assert povoado.contar_skills({'cargo': ['Dev']}) == {'python': 2, 'sql': 1, 'go': 1}
+
+def test_atualizacoes_de_funcionarios(povoado):
+    assert povoado.atualizar_funcionarios([(4, {'skills_normalizadas': ['excel'], 'melhor_compatibilidade': 90, 'area_top': 'Dados'})]) == 1
+    assert list(povoado.funcionarios_sem_derivados()) == []
+    assert ids(povoado.pagina_funcionarios({'skills': [['excel']]})) == [4]
+    assert ids(povoado.pagina_funcionarios({}, 'compat', limite=1)) == [4]
+    item = {'skill': 'Docker', 'origem': 'NLP', 'data': '2025-01-01'}
+    assert povoado.adicionar_descobertas([(1, [item]), (2, [item])]) == 2
+    assert povoado.adicionar_descobertas([(1, [item])]) == 0
+    assert povoado.funcionario(1)['habilidades_descobertas'] == [item]
+
+def test_agregados(repositorio):
+    assert repositorio.agregado_total() is None
+    repositorio.substituir_agregados([
+        {'_id': 'total', 'tipo': 'total', 'count': 2},
+        {'_id': 'skill:sql', 'tipo': 'skill', 'chave': 'sql', 'display': 'SQL', 'count': 1, 'ordem': 0},
+        {'_id': 'skill:go', 'tipo': 'skill', 'chave': 'go', 'display': 'Go', 'count': 0, 'ordem': 1},
+        {'_id': 'faixa:0', 'tipo': 'faixa', 'indice': 0, 'count': 2},
+    ])
+    definicoes = {'total': {'tipo': 'total'}, 'skill:py': {'tipo': 'skill', 'chave': 'py', 'display': 'Python', 'ordem': 5}}
+    repositorio.incrementar_agregados({'total': 1, 'skill:py': 3}, definicoes)
+    assert repositorio.agregado_total() == 3
+    assert repositorio.agregados('skill') == [
+        {'tipo': 'skill', 'chave': 'sql', 'display': 'SQL', 'count': 1, 'ordem': 0},
+        {'tipo': 'skill', 'chave': 'py', 'display': 'Python', 'count': 3, 'ordem': 5},
+    ]
+    assert [d['chave'] for d in repositorio.agregados('skill', 1, por_contagem=True)] == ['py']
+    repositorio.substituir_agregados([{'_id': 'total', 'tipo': 'total', 'count': 0}])
+    assert repositorio.agregado_total() == 0
+    assert repositorio.agregados('skill') == []
+
+def test_contadores_versao_e_meta(repositorio):
+    assert repositorio.versao_dados() == 0
+    repositorio.incrementar_versao()
+    repositorio.incrementar_versao()
+    assert repositorio.versao_dados() == 2
+    assert repositorio.incrementar_contador('funcionarios', 1) is None
+    repositorio.garantir_contador('funcionarios', 10)
+    repositorio.garantir_contador('funcionarios', 3)
+    assert repositorio.incrementar_contador('funcionarios', 5) == 15
+    assert repositorio.incrementar_contador('outro', 2, criar=True) == 2
+    assert repositorio.ler_meta('taxonomia') is None
+    repositorio.gravar_meta('taxonomia', {'assinatura': 'a'})
+    repositorio.gravar_meta('taxonomia', {'extra': 1})
+    assert repositorio.ler_meta('taxonomia') == {'assinatura': 'a', 'extra': 1}
+
+def test_marcas_planos_e_taxonomia(repositorio):
+    repositorio.gravar_marcas_descoberta({5: 'h1', '5#2': 'h2'}, '2025-01-01')
+    repositorio.gravar_marcas_descoberta({5: 'h3'}, '2025-01-02')
+    assert repositorio.marcas_descoberta() == {5: 'h3', '5#2': 'h2'}
+    assert repositorio.ler_plano('k') is None
+    repositorio.gravar_plano('k', {'status': 'pendente', 'atualizado_em': 1.5})
+    repositorio.gravar_plano('k', {'status': 'pronto', 'plano': 'texto'})
+    assert repositorio.ler_plano('k') == {'status': 'pronto', 'plano': 'texto', 'atualizado_em': 1.5}
+    entradas = [{'chave': 'python', 'nome': 'Python', 'aliases': ['py']}, {'chave': 'sql', 'nome': 'SQL', 'aliases': []}]
+    repositorio.gravar_taxonomia(entradas)
+    assert repositorio.ler_taxonomia() == entradas
+
+def test_reivindicar_plano(repositorio):
+    pendente = {'status': 'pendente', 'atualizado_em': 100.0}
+    assert repositorio.reivindicar_plano('k', pendente, 50.0)
+    assert not repositorio.reivindicar_plano('k', dict(pendente, atualizado_em=120.0), 50.0)
+    assert repositorio.ler_plano('k')['atualizado_em'] == 100.0
+    # Pendente antigo (worker caído) e erro podem ser reivindicados; concluído nunca.
+    assert repositorio.reivindicar_plano('k', dict(pendente, atualizado_em=200.0), 150.0)
+    repositorio.gravar_plano('k', {'status': 'erro', 'erro': 'falhou'})
+    assert repositorio.reivindicar_plano('k', dict(pendente, atualizado_em=210.0), 0.0)
+    repositorio.gravar_plano('k', {'status': 'concluido', 'plano': 'texto'})
+    assert not repositorio.reivindicar_plano('k', dict(pendente, atualizado_em=300.0), 1000.0)
+    assert repositorio.ler_plano('k')['status'] == 'concluido'
+
+def test_limpar(povoado):
+    povoado.incrementar_versao()
+    povoado.limpar('funcionarios', 'meta')
+    assert povoado.listar('funcionarios') == []
+    assert povoado.funcionario(1) is None
+    assert povoado.versao_dados() == 0
+    assert len(povoado.listar('vagas')) == 1
+    with pytest.raises(ValueError):
+        povoado.limpar('outra')
+
+@pytest.mark.parametrize('backend', ['json', 'sqlite'])
+def test_reabrir_mantem_dados_e_indices(backend, tmp_path):
+    repositorio = abrir_repositorio(backend, tmp_path)
+    repositorio.inserir('funcionarios', [funcionario(1, 'Ana', skills=['SQL'], compat=10)])
+    repositorio.garantir_indices()
+    repositorio.incrementar_versao()
+    repositorio.fechar()
+
+    reaberto = abrir_repositorio(backend, tmp_path)
+    assert reaberto.email_unico()
+    assert reaberto.versao_dados() == 1
+    assert reaberto.funcionario(1)['nome'] == 'Ana'
+    assert reaberto.contar_funcionarios({'skills': [['sql']]}) == 1
+    assert reaberto.inserir_funcionarios([funcionario(2, 'Bia', email='f1@x.com')]) == [0]
+    reaberto.fechar()
+
+def test_sqlite_consulta_por_id_usa_indice(tmp_path):
+    repositorio = armazenamento.RepositorioSQLite(str(tmp_path / 'talentflow.sqlite3'))
+    plano = repositorio._ler("EXPLAIN QUERY PLAN SELECT doc FROM funcionarios WHERE id = ? ORDER BY pos LIMIT 1", (1,))
+    assert any('funcionarios_id' in linha[-1] for linha in plano)
+    plano = repositorio._ler("EXPLAIN QUERY PLAN SELECT skill, COUNT(*) FROM funcionario_skills WHERE skill = ? GROUP BY skill", ('sql',))
+    assert any('funcionario_skills_skill' in linha[-1] for linha in plano)
+
+def test_json_segundo_repositorio_na_mesma_pasta_falha(tmp_path):
+    repositorio = armazenamento.RepositorioJSON(str(tmp_path))
+    with pytest.raises(RuntimeError):
+        armazenamento.RepositorioJSON(str(tmp_path))
+    somente_leitura = armazenamento.RepositorioJSON(str(tmp_path), somente_leitura=True)
+    with pytest.raises(RuntimeError):
+        somente_leitura.incrementar_versao()
+    repositorio.fechar()
+
+def test_copiar_entre_backends(povoado, tmp_path):
+    destino = armazenamento.RepositorioSQLite(':memory:')
+    assert armazenamento.copiar(povoado, destino) == {'funcionarios': 4, 'vagas': 1, 'projetos': 1}
+    assert destino.listar('funcionarios') == povoado.listar('funcionarios')
@@ -0,0 +1,27 @@
+from app.recommendation.recommender import IndiceSemantico, ModeloSemantico
+
+VAGAS = [
+    {'id': 1, 'titulo': 'Engenheiro de dados', 'descricao': 'Pipelines de dados', 'habilidades_requeridas': ['Python', 'SQL']},
+    {'id': 2, 'titulo': 'Designer', 'descricao': 'Interfaces', 'habilidades_requeridas': ['Figma']},
+]
+
+def perfil(modelo):
+    return modelo.vetor_perfil({'id': 10, 'habilidades_declaradas': [], 'habilidades_descobertas': []})
+
+def test_projetos_com_o_mesmo_id_contam_separados():
+    projetos = [
+        {'id_projeto': 3, 'participantes': [10], 'tarefas': [{'descricao': 'Pipelines em Python e SQL'}]},
+        {'id_projeto': 3, 'participantes': [11], 'tarefas': [{'descricao': 'Protótipos no Figma'}]},
+    ]
+    modelo = IndiceSemantico().atualizar(VAGAS, projetos)
+    assert isinstance(modelo, ModeloSemantico)
+    similaridades = modelo.similaridades(perfil(modelo))
+    assert similaridades.get(0, 0) > 0
+    assert similaridades.get(1, 0) == 0
+
+def test_vagas_com_o_mesmo_id_nao_retokenizam():
+    indice = IndiceSemantico()
+    vagas = VAGAS + [dict(VAGAS[1], id=1)]
+    indice.atualizar(vagas, [])
+    indice.atualizar(vagas, [])
+    assert indice.estatisticas() == {'documentos': 3, 'tokenizacoes': 3}